@@ -0,0 +1,214 @@
+"""
+Incremental alert engine.
+
+Low stock is a property of a SKU row (`stock_level <= reorder_threshold`) and
+is materialized by the partial index `inventory_sku_low_stock_idx`, so every
+writer only re-evaluates the SKUs it touched and per-tenant counts are read
+from the SKU/Batch indexes instead of the Alert table.
+
+SKUs with counter shards (see shards.py) are judged on their live level,
+stock_level plus the deltas parked in their shards, which the partial index
+cannot see; they are read through `inventory_sku_sharded_idx` instead.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import SKU, Batch, Alert, live_stock_level
+from .notifications import enqueue_notifications
+
+EXPIRY_WINDOW_DAYS = 30
+SWEEP_PAGE_SIZE = 2000
+
+
+def low_stock_skus(tenant_id):
+    """
+    SKUs at or below their reorder threshold: the unsharded ones served by
+    the partial index, united with the sharded ones compared on their live
+    level.
+    """
+    skus = SKU.objects.filter(tenant_id=tenant_id)
+    indexed = skus.filter(stock_level__lte=F("reorder_threshold"), counter_shards=0)
+    sharded = skus.filter(counter_shards__gt=0).alias(
+        live_stock_level=live_stock_level()
+    )
+    return indexed.union(
+        sharded.filter(live_stock_level__lte=F("reorder_threshold")), all=True
+    )
+
+
+def expiry_cutoff(today=None):
+    return (today or timezone.now().date()) + timedelta(days=EXPIRY_WINDOW_DAYS)
+
+
+def _create_alerts(alerts):
+    """
+    INSERT the alerts, skipping SKUs that already have an open alert of the
+    same type, and queue notifications for the ones created.
+    """
+    with transaction.atomic():
+        created = Alert.objects.bulk_create(alerts, ignore_conflicts=True)
+        enqueue_notifications(alert.pk for alert in created)
+    return created
+
+
+def raise_low_stock_alerts(levels):
+    """
+    One set-based low-stock pass over {sku_id: {stock_level, reorder_threshold,
+    name, tenant_id}}. Missing LOW_STOCK alerts are created with a single
+    INSERT that skips SKUs which already have an open alert of that type.
+    """
+    alerts = [
+        Alert(
+            tenant_id=row["tenant_id"],
+            sku_id=sku_id,
+            type=Alert.Type.LOW_STOCK,
+            sku_name=row["name"],
+            current_stock=row["stock_level"],
+            threshold=row["reorder_threshold"],
+        )
+        for sku_id, row in levels.items()
+        if row["reorder_threshold"] is not None
+        and row["stock_level"] <= row["reorder_threshold"]
+    ]
+    if not alerts:
+        return []
+    return _create_alerts(alerts)
+
+
+def evaluate_low_stock(sku_ids):
+    """
+    Recompute low-stock alerts for the given SKUs only, e.g. after a bulk
+    threshold change or an import that bypassed model signals. `sku_ids`
+    may be a list of primary keys or a `values("pk")` queryset.
+    """
+    if not isinstance(sku_ids, QuerySet) and not sku_ids:
+        return []
+    # the shard sum is only computed for sharded SKUs
+    rows = (
+        SKU.objects.with_live_stock()
+        .filter(
+            Q(counter_shards=0, stock_level__lte=F("reorder_threshold"))
+            | Q(counter_shards__gt=0, live_stock_level__lte=F("reorder_threshold")),
+            pk__in=sku_ids,
+        )
+        .values_list(
+            "sku_id", "tenant_id", "name", "live_stock_level", "reorder_threshold"
+        )
+    )
+    return raise_low_stock_alerts(
+        {
+            sku_id: {
+                "tenant_id": tenant_id,
+                "name": name,
+                "stock_level": stock_level,
+                "reorder_threshold": reorder_threshold,
+            }
+            for sku_id, tenant_id, name, stock_level, reorder_threshold in rows
+        }
+    )
+
+
+def sweep_expiring_batches(today=None, page_size=SWEEP_PAGE_SIZE):
+    """
+    Raise BATCH_EXPIRY alerts for every tenant's batches that still hold stock
+    and expire within the window, or expired less than a window ago.
+
+    Walks the partial `(expiry_date, batch_id)` index of non-empty batches in
+    keyset-paged chunks so memory stays bounded, and writes each page with one
+    INSERT that skips SKUs which already have an open expiry alert. A batch is
+    only alerted on once: SKUs with an expiry alert, acknowledged or not,
+    raised since the batch entered the window are skipped. Pages are ordered
+    by expiry date, so the alert records the soonest-expiring batch of each
+    SKU.
+
+    Returns (batches_scanned, pages).
+    """
+    today = today or timezone.now().date()
+    window = timedelta(days=EXPIRY_WINDOW_DAYS)
+    candidates = (
+        Batch.objects.filter(
+            expiry_date__gte=today - window,
+            expiry_date__lte=expiry_cutoff(today),
+            remaining_quantity__gt=0,
+        )
+        .order_by("expiry_date", "batch_id")
+        .values_list(
+            "expiry_date",
+            "batch_id",
+            "tenant_id",
+            "sku_id",
+            "sku__name",
+            "remaining_quantity",
+        )
+    )
+
+    scanned = pages = 0
+    page = list(candidates[:page_size])
+    while page:
+        # newest expiry alert of each SKU on the page, one query per page
+        alerted = dict(
+            Alert.objects.filter(
+                type=Alert.Type.BATCH_EXPIRY,
+                sku_id__in={row[3] for row in page},
+            )
+            .values("sku_id")
+            .annotate(last=Max("created_at"))
+            .values_list("sku_id", "last")
+        )
+        alerts = {}
+        for expiry_date, _, tenant_id, sku_id, sku_name, remaining_quantity in page:
+            last = alerted.get(sku_id)
+            if last is not None and timezone.localdate(last) >= expiry_date - window:
+                continue
+            alerts.setdefault(
+                sku_id,
+                Alert(
+                    tenant_id=tenant_id,
+                    sku_id=sku_id,
+                    type=Alert.Type.BATCH_EXPIRY,
+                    sku_name=sku_name,
+                    current_stock=remaining_quantity,
+                ),
+            )
+        if alerts:
+            _create_alerts(list(alerts.values()))
+        scanned += len(page)
+        pages += 1
+        if len(page) < page_size:
+            break
+        last_date, last_id = page[-1][:2]
+        page = list(
+            candidates.filter(
+                Q(expiry_date__gt=last_date)
+                | Q(expiry_date=last_date, batch_id__gt=last_id)
+            )[:page_size]
+        )
+    return scanned, pages
+
+
+def acknowledge_alerts(alerts, user):
+    """
+    Acknowledge every open alert in `alerts` (a tenant-scoped Alert
+    queryset) with one UPDATE. Returns the number of alerts acknowledged.
+    """
+    return alerts.filter(acknowledged=False).update(
+        acknowledged=True,
+        acknowledged_by=user if user and user.is_authenticated else None,
+        acknowledged_at=timezone.now(),
+    )
+
+
+def alert_summary(tenant_id, today=None):
+    """Per-tenant alert counts answered from the SKU and Batch indexes."""
+    today = today or timezone.now().date()
+    batches = Batch.objects.filter(tenant_id=tenant_id, remaining_quantity__gt=0)
+    return {
+        "low_stock": low_stock_skus(tenant_id).count(),
+        "expiring_batches": batches.filter(
+            expiry_date__gte=today, expiry_date__lte=expiry_cutoff(today)
+        ).count(),
+        "expired_batches": batches.filter(expiry_date__lt=today).count(),
+    }
@@ -0,0 +1,139 @@
+"""
+Tenant-scoped barcode lookup cache for POS scanners.
+
+Entries hold the scan-stable fields of a SKU (no stock_level, which changes
+through UPDATEs that never send post_save) and are keyed by
+(tenant, version, barcode). SKU save/delete drops the affected keys once the
+write commits (a lookup racing the open transaction would otherwise cache
+the old row again); bulk writers that bypass signals bump the tenant
+version instead.
+
+Invalidation only reaches every worker through a shared cache (Redis, see
+settings.CACHES). A per-process LocMemCache never hears of another
+worker's writes, so there entries live BARCODE_LOCAL_CACHE_TTL seconds and
+a stale scan heals within that. Hit/miss counters are kept per tenant in
+the same cache.
+
+The tenant version is an ordinary cache key, so LocMemCache's culling
+(MAX_ENTRIES, 300 by default) can evict it like any entry. A missing
+version is therefore recreated from the clock rather than from 1, so an
+evicted version never makes older entries reachable again.
+"""
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import SKU
+
+BARCODE_CACHE_TTL = 60 * 60
+BARCODE_LOCAL_CACHE_TTL = 30
+# unknown barcodes are remembered briefly so a bad label cannot hammer the DB
+BARCODE_MISS_TTL = 60
+LOOKUP_FIELDS = (
+    "sku_id",
+    "name",
+    "sku_code",
+    "barcode",
+    "category",
+    "price",
+    "attributes",
+    "track_batches",
+)
+STAT_NAMES = ("hits", "misses")
+
+_NOT_FOUND = "__missing__"
+
+
+def entry_ttl():
+    """How long a found SKU stays cached under the configured backend."""
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return BARCODE_LOCAL_CACHE_TTL
+    return BARCODE_CACHE_TTL
+
+
+def _stats_key(tenant_id, name):
+    return f"inventory:barcode:{tenant_id}:stats:{name}"
+
+
+def _count(tenant_id, name):
+    key = _stats_key(tenant_id, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # first count (or evicted); a racing count lost here is harmless
+        cache.add(key, 1, timeout=None)
+
+
+def cache_stats(tenant_id):
+    """Hit/miss counters of the tenant's lookups, across workers."""
+    counts = cache.get_many([_stats_key(tenant_id, name) for name in STAT_NAMES])
+    hits, misses = (counts.get(_stats_key(tenant_id, name), 0) for name in STAT_NAMES)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats(tenant_id):
+    cache.delete_many([_stats_key(tenant_id, name) for name in STAT_NAMES])
+
+
+def _version_key(tenant_id):
+    return f"inventory:barcode:{tenant_id}:version"
+
+
+def _sku_key(tenant_id, sku_id):
+    return f"inventory:barcode:{tenant_id}:sku:{sku_id}"
+
+
+def _barcode_key(tenant_id, version, barcode):
+    return f"inventory:barcode:{tenant_id}:v{version}:{barcode}"
+
+
+def lookup_barcode(tenant_id, barcode):
+    """Scan-stable SKU fields for `barcode` in the tenant, or None."""
+    version = cache.get_or_set(_version_key(tenant_id), time.time_ns, timeout=None)
+    key = _barcode_key(tenant_id, version, barcode)
+    payload = cache.get(key)
+    if payload is not None:
+        _count(tenant_id, "hits")
+        return None if payload == _NOT_FOUND else payload
+
+    _count(tenant_id, "misses")
+    row = (
+        SKU.objects.filter(tenant_id=tenant_id, barcode=barcode)
+        .values(*LOOKUP_FIELDS)
+        .first()
+    )
+    if row is None:
+        cache.set(key, _NOT_FOUND, min(BARCODE_MISS_TTL, entry_ttl()))
+        return None
+
+    payload = dict(row, sku_id=str(row["sku_id"]), price=str(row["price"]))
+    cache.set_many(
+        {key: payload, _sku_key(tenant_id, row["sku_id"]): barcode}, entry_ttl()
+    )
+    return payload
+
+
+def invalidate_sku(tenant_id, sku_id, barcode):
+    """Drop the entries for the SKU's current and previously cached barcode."""
+    version = cache.get(_version_key(tenant_id))
+    if version is None:
+        return
+    barcodes = {barcode, cache.get(_sku_key(tenant_id, sku_id))}
+    cache.delete_many(
+        [_barcode_key(tenant_id, version, code) for code in barcodes if code]
+        + [_sku_key(tenant_id, sku_id)]
+    )
+
+
+def invalidate_tenant(tenant_id):
+    """Orphan every cached barcode of the tenant, e.g. after a bulk import."""
+    try:
+        cache.incr(_version_key(tenant_id))
+    except ValueError:
+        pass
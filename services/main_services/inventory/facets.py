@@ -0,0 +1,152 @@
+"""
+Attribute filters and facet counts over an extracted attribute index.
+
+SKU.attributes is free-form JSON, so every SKU's attributes are copied out
+as SKUAttribute (key, value) rows: nested objects flatten to dotted keys
+("dims.width") and lists fan out into one row per item. Filtering on
+color=red AND size in (M, L) starts from whatever narrowed the SKUs
+already (typically the `(tenant_id, category)` index) and probes the
+`(sku, key, value)` index once per key and SKU; the facet counts of the
+result are a single UNION ALL of GROUP BYs over those same index entries.
+
+The rows are refreshed by the SKU post_save signal and by the importer;
+`rebuild_attribute_index` repairs them after writes that bypassed both.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from .models import SKU, SKUAttribute
+
+MAX_KEY_LENGTH = 64
+MAX_VALUE_LENGTH = 128
+MAX_FACET_VALUES = 50
+INDEX_CHUNK_SIZE = 2000
+
+
+def _facet_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip()
+
+
+def _flatten(key, value):
+    if isinstance(value, dict):
+        for sub_key, item in value.items():
+            yield from _flatten(f"{key}.{sub_key}", item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten(key, item)
+    elif value is not None:
+        yield key, _facet_value(value)
+
+
+def attribute_pairs(attributes):
+    """
+    Set of (key, value) strings for one SKU's attributes. Pairs too long
+    for the index columns are left out rather than truncated, so a filter
+    never matches a value the SKU does not have.
+    """
+    if not isinstance(attributes, dict):
+        return set()
+    return {
+        (key, value)
+        for top_key, top_value in attributes.items()
+        for key, value in _flatten(str(top_key), top_value)
+        if value and len(key) <= MAX_KEY_LENGTH and len(value) <= MAX_VALUE_LENGTH
+    }
+
+
+def index_attributes(skus):
+    """Rewrite the attribute rows of `skus` (SKU instances or a queryset)."""
+    if hasattr(skus, "values_list"):
+        rows = skus.values_list("pk", "attributes")
+    else:
+        rows = [(sku.pk, sku.attributes) for sku in skus]
+
+    pairs, sku_ids = [], []
+    for sku_id, attributes in rows:
+        sku_ids.append(sku_id)
+        for key, value in attribute_pairs(attributes):
+            pairs.append(SKUAttribute(sku_id=sku_id, key=key, value=value))
+    if not sku_ids:
+        return 0
+
+    with transaction.atomic():
+        SKUAttribute.objects.filter(sku_id__in=sku_ids).delete()
+        SKUAttribute.objects.bulk_create(pairs, batch_size=INDEX_CHUNK_SIZE)
+    return len(pairs)
+
+
+def rebuild_attribute_index(tenant_id=None, chunk_size=INDEX_CHUNK_SIZE):
+    """
+    Re-index every SKU (of one tenant), `chunk_size` SKUs at a time.
+    Returns the number of attribute rows written.
+    """
+    skus = SKU.objects.order_by("pk")
+    if tenant_id:
+        skus = skus.filter(tenant_id=tenant_id)
+    ids = list(skus.values_list("pk", flat=True))
+    written = 0
+    for start in range(0, len(ids), chunk_size):
+        written += index_attributes(
+            SKU.objects.filter(pk__in=ids[start : start + chunk_size])
+        )
+    return written
+
+
+def filter_by_attributes(skus, filters):
+    """
+    Narrow `skus` to those having, for every key of `filters`, at least one
+    of the listed values: values of a key are ORed, keys are ANDed.
+    """
+    for key, values in filters.items():
+        skus = skus.filter(
+            Exists(
+                SKUAttribute.objects.filter(
+                    sku=OuterRef("pk"), key=key, value__in=values
+                )
+            )
+        )
+    return skus
+
+
+def facet_counts(skus, filters, keys=None, size=MAX_FACET_VALUES):
+    """
+    {key: {value: sku_count}} over `skus` narrowed by `filters`, the `size`
+    most common values per key. A filtered key is counted without its own
+    filter, so the alternatives to a selected value keep their counts.
+    `keys` limits the facets returned; all keys are counted by default.
+    """
+    rows = SKUAttribute.objects.all()
+    if keys is not None:
+        rows = rows.filter(key__in=keys)
+
+    parts = [
+        rows.exclude(key__in=list(filters)).filter(
+            sku__in=filter_by_attributes(skus, filters).values("pk")
+        )
+    ]
+    for key in filters:
+        if keys is None or key in keys:
+            others = {k: v for k, v in filters.items() if k != key}
+            parts.append(
+                rows.filter(
+                    key=key, sku__in=filter_by_attributes(skus, others).values("pk")
+                )
+            )
+    grouped = [
+        part.order_by().values("key", "value").annotate(skus=Count("sku"))
+        for part in parts
+    ]
+    counts = (
+        grouped[0].union(*grouped[1:], all=True) if len(grouped) > 1 else grouped[0]
+    )
+
+    facets = defaultdict(dict)
+    for row in sorted(counts, key=lambda row: (row["key"], -row["skus"], row["value"])):
+        values = facets[row["key"]]
+        if len(values) < size:
+            values[row["value"]] = row["skus"]
+    return dict(facets)
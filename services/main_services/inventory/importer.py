@@ -0,0 +1,157 @@
+"""
+Bulk SKU import: CSV / NDJSON in, chunked validation, upsert on
+(tenant_id, sku_code).
+
+Rows are validated with the model fields' own `clean()` rather than a
+serializer per row, written with `bulk_create(update_conflicts=True)` (so no
+per-row signals fire), re-indexed for search and attribute facets chunk by
+chunk and followed by one set-based low-stock alert pass.
+"""
+import csv
+import functools
+import io
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .alerts import evaluate_low_stock
+from .barcodes import invalidate_tenant
+from .facets import index_attributes
+from .models import SKU
+from .search import index_skus
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_FIELDS = (
+    "sku_code",
+    "name",
+    "category",
+    "barcode",
+    "price",
+    "stock_level",
+    "reorder_threshold",
+    "track_batches",
+    "supplier_id",
+    "attributes",
+)
+REQUIRED_FIELDS = ("sku_code", "name", "category")
+# stock only changes through the adjustment ledger, so an import sets the
+# opening level of new SKUs but never overwrites it on existing ones
+INSERT_ONLY_FIELDS = ("stock_level",)
+
+
+@functools.cache
+def _import_fields():
+    return tuple((name, SKU._meta.get_field(name)) for name in IMPORT_FIELDS)
+
+
+def read_rows(stream, input_format):
+    """Yield one dict per record from a binary CSV or NDJSON stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if input_format == "csv":
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def clean_row(row):
+    """
+    Validate one raw record. Returns (values, errors); blank CSV cells become
+    NULL for nullable fields and are otherwise left to the model default.
+    """
+    if not isinstance(row, dict):
+        return None, {"non_field_errors": ["Not a valid record."]}
+
+    values, errors = {}, {}
+    for name, field in _import_fields():
+        if name not in row:
+            continue
+        raw = row[name]
+        if raw == "" or raw is None:
+            if not field.null:
+                continue
+            raw = None
+        elif name == "attributes" and isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                errors[name] = ["Enter valid JSON."]
+                continue
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+
+    for name in REQUIRED_FIELDS:
+        if values.get(name) in (None, "") and name not in errors:
+            errors[name] = ["This field is required."]
+    return values, errors
+
+
+def _upsert(tenant_id, rows):
+    # group by column set so a partial NDJSON record never blanks out the
+    # columns it did not mention
+    groups = {}
+    for values in rows:
+        groups.setdefault(frozenset(values), []).append(values)
+    for columns, group in groups.items():
+        SKU.objects.bulk_create(
+            [SKU(tenant_id=tenant_id, **values) for values in group],
+            update_conflicts=True,
+            unique_fields=["tenant_id", "sku_code"],
+            update_fields=[
+                name
+                for name in columns
+                if name != "sku_code" and name not in INSERT_ONLY_FIELDS
+            ]
+            + ["updated_at"],
+        )
+
+
+def import_skus(tenant_id, records, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Upsert SKUs for one tenant from an iterable of raw records.
+
+    Each chunk is validated, de-duplicated on sku_code (last record wins) and
+    written in its own transaction; invalid records are reported and skipped.
+    Returns {"imported": n, "low_stock": n, "errors": [{row, errors}]}.
+    """
+    started = timezone.now()
+    imported, report = 0, []
+    records = iter(records)
+    row_number = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        valid = {}
+        for row in chunk:
+            row_number += 1
+            values, errors = clean_row(row)
+            if errors:
+                report.append({"row": row_number, "errors": errors})
+            else:
+                valid[values["sku_code"]] = values
+        if valid:
+            with transaction.atomic():
+                _upsert(tenant_id, valid.values())
+                written = SKU.objects.filter(tenant_id=tenant_id, sku_code__in=valid)
+                index_skus(written)
+                index_attributes(written)
+            imported += len(valid)
+
+    if imported:
+        transaction.on_commit(lambda: invalidate_tenant(tenant_id))
+    # one set-based alert pass over everything this import touched
+    low_stock = evaluate_low_stock(
+        SKU.objects.filter(tenant_id=tenant_id, updated_at__gte=started).values("pk")
+    )
+    return {"imported": imported, "low_stock": len(low_stock), "errors": report}
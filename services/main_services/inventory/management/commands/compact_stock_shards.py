@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.shards import compact_stock_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the pending deltas of sharded SKU counters into stock_level. "
+        "Meant to run every minute or so."
+    )
+
+    def handle(self, *args, **options):
+        compacted = compact_stock_shards()
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} SKU(s)."))
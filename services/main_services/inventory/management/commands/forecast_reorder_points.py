@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main_services.inventory.forecast import (
+    DEFAULT_LEAD_TIME_DAYS,
+    DEFAULT_SERVICE_LEVEL,
+    FORECAST_WINDOW_DAYS,
+    forecast_reorder_points,
+    tenants_with_sales,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Suggest reorder thresholds from recent sales (demand rate, variability "
+        "and lead time). Writes SKU.suggested_reorder_threshold; --apply also "
+        "replaces reorder_threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Limit to one tenant.")
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            default=None,
+            help="Forecast as of this date (YYYY-MM-DD), defaults to today.",
+        )
+        parser.add_argument("--window-days", type=int, default=FORECAST_WINDOW_DAYS)
+        parser.add_argument(
+            "--lead-time-days", type=float, default=DEFAULT_LEAD_TIME_DAYS
+        )
+        parser.add_argument(
+            "--service-level",
+            type=float,
+            default=DEFAULT_SERVICE_LEVEL,
+            help="Target probability of not stocking out during lead time.",
+        )
+        parser.add_argument("--apply", action="store_true")
+
+    def handle(self, *args, **options):
+        today = options["today"] or timezone.localdate()
+        tenants = (
+            [options["tenant"]]
+            if options["tenant"]
+            else tenants_with_sales(today - timedelta(days=options["window_days"]))
+        )
+        for tenant_id in tenants:
+            updated = forecast_reorder_points(
+                tenant_id,
+                today=today,
+                window_days=options["window_days"],
+                lead_time_days=options["lead_time_days"],
+                service_level=options["service_level"],
+                apply=options["apply"],
+            )
+            self.stdout.write(f"{tenant_id}: {updated} SKU(s)")
+        self.stdout.write(self.style.SUCCESS("Reorder points forecast."))
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main_services.inventory.importer import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    import_skus,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Upsert a tenant's SKUs from a CSV or NDJSON file, keyed on sku_code."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument("--tenant", required=True, help="Tenant UUID.")
+        parser.add_argument(
+            "--input",
+            choices=IMPORT_FORMATS,
+            default=None,
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["input"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        try:
+            stream = open(path, "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with stream:
+            report = import_skus(
+                options["tenant"],
+                read_rows(stream, input_format),
+                chunk_size=options["chunk_size"],
+            )
+
+        for error in report["errors"]:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} SKU(s), "
+                f"{len(report['errors'])} row(s) rejected, "
+                f"{report['low_stock']} at or below reorder threshold."
+            )
+        )
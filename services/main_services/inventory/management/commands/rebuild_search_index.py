@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.search import INDEX_CHUNK_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the SKU search terms and trigram vocabulary. Only needed "
+        "after writes that bypassed the model layer and the importer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Limit to one tenant.")
+        parser.add_argument("--chunk-size", type=int, default=INDEX_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(options["tenant"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} search term(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.valuation import VALUATION_CHUNK_SIZE, rebuild_valuation
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-SKU cost layer rollups (SKUValuation) from batches. "
+        "Only needed after writes that bypassed the model layer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Limit to one tenant.")
+        parser.add_argument("--chunk-size", type=int, default=VALUATION_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        written = rebuild_valuation(options["tenant"], options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt valuation for {written} SKU(s).")
+        )
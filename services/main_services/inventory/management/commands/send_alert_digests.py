@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.notifications import (
+    NOTIFY_BATCH_SIZE,
+    send_alert_digests,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Email per-tenant digests of newly raised inventory alerts from the "
+        "notification outbox. Meant to run every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=NOTIFY_BATCH_SIZE,
+            help="Outbox entries drained per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        alerts, digests = send_alert_digests(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Notified {alerts} alert(s) in {digests} digest(s).")
+        )
@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main_services.inventory.ledger import snapshot_day
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the stock adjustment ledger into daily per-SKU closing snapshots. "
+        "Meant to run shortly after midnight; defaults to yesterday."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--day",
+            type=date.fromisoformat,
+            default=None,
+            help="Last day to snapshot (YYYY-MM-DD), defaults to yesterday.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="Number of days ending at --day to (re)build, oldest first.",
+        )
+
+    def handle(self, *args, **options):
+        last = options["day"] or timezone.localdate() - timedelta(days=1)
+        for offset in range(options["days"] - 1, -1, -1):
+            day = last - timedelta(days=offset)
+            written = snapshot_day(day)
+            self.stdout.write(f"{day}: {written} snapshot(s)")
+        self.stdout.write(self.style.SUCCESS("Stock snapshots up to date."))
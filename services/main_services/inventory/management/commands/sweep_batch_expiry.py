@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.alerts import SWEEP_PAGE_SIZE, sweep_expiring_batches
+
+
+class Command(BaseCommand):
+    help = (
+        "Raise batch expiry alerts for all tenants' batches expiring within the "
+        "alert window. Meant to run daily from cron or a scheduler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=SWEEP_PAGE_SIZE,
+            help="Batches fetched per keyset page.",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            default=None,
+            help="Override the sweep date (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        scanned, pages = sweep_expiring_batches(
+            today=options["today"], page_size=options["page_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Swept {scanned} batches in {pages} page(s).")
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from main_services.inventory.reservations import (
+    RESERVATION_SWEEP_PAGE_SIZE,
+    sweep_expired_reservations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Release expired stock reservations and return their units to "
+        "available-to-promise. Meant to run every minute or so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=RESERVATION_SWEEP_PAGE_SIZE,
+            help="Reservations released per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        released, pages = sweep_expired_reservations(page_size=options["page_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Released {released} reservation(s) in {pages} page(s)."
+            )
+        )
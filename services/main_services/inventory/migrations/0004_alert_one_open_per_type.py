@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def dedupe_open_alerts(apps, schema_editor):
+    # get_or_create was racy, so keep only the oldest open alert per key
+    Alert = apps.get_model("inventory", "Alert")
+    seen = set()
+    duplicates = []
+    open_alerts = (
+        Alert.objects.filter(acknowledged=False)
+        .order_by("created_at")
+        .values_list("alert_id", "tenant_id", "sku_id", "type")
+    )
+    for alert_id, *key in open_alerts.iterator():
+        key = tuple(key)
+        if key in seen:
+            duplicates.append(alert_id)
+        else:
+            seen.add(key)
+    Alert.objects.filter(alert_id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_remove_batch_inventory_b_tenant__c4c360_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_open_alerts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('acknowledged', False)), fields=('tenant_id', 'sku', 'type'), name='inventory_alert_one_open_per_type'),
+        ),
+    ]
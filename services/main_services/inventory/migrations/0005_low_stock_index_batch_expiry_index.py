@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_alert_one_open_per_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['tenant_id', 'expiry_date'], name='inventory_b_tenant__c4c360_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sku',
+            index=models.Index(condition=models.Q(('stock_level__lte', models.F('reorder_threshold'))), fields=['tenant_id'], name='inventory_sku_low_stock_idx'),
+        ),
+    ]
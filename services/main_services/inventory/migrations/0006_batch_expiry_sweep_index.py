@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_low_stock_index_batch_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['expiry_date', 'batch_id'], name='inventory_b_expiry__89aee8_idx'),
+        ),
+    ]
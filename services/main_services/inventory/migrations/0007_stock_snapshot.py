@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:33
+
+import django.db.models.deletion
+import main_services.inventory.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_batch_expiry_sweep_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('snapshot_id', models.UUIDField(default=main_services.inventory.models.generate_uuid, editable=False, primary_key=True, serialize=False)),
+                ('tenant_id', models.UUIDField(db_index=True)),
+                ('day', models.DateField()),
+                ('closing_at', models.DateTimeField()),
+                ('closing_level', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='stockadjustment',
+            index=models.Index(fields=['created_at'], name='inventory_s_created_8901aa_idx'),
+        ),
+        migrations.AddField(
+            model_name='stocksnapshot',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.sku'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('sku', 'day'), name='inventory_snapshot_one_per_day'),
+        ),
+    ]
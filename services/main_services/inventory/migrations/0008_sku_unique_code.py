@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:36
+
+from django.db import migrations, models
+
+
+def normalise_sku_codes(apps, schema_editor):
+    # blank codes become NULL (never unique-checked); real duplicates within a
+    # tenant get a "~n" suffix so the constraint can be created
+    SKU = apps.get_model("inventory", "SKU")
+    SKU.objects.filter(sku_code="").update(sku_code=None)
+    seen = {}
+    codes = (
+        SKU.objects.exclude(sku_code=None)
+        .order_by("created_at")
+        .values_list("sku_id", "tenant_id", "sku_code")
+    )
+    for sku_id, tenant_id, sku_code in codes.iterator():
+        count = seen.get((tenant_id, sku_code), 0)
+        seen[(tenant_id, sku_code)] = count + 1
+        if count:
+            SKU.objects.filter(pk=sku_id).update(sku_code=f"{sku_code}~{count + 1}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stock_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalise_sku_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='sku',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'sku_code'), name='inventory_sku_unique_code'),
+        ),
+    ]
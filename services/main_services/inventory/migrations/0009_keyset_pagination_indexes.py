@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_sku_unique_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['tenant_id', 'created_at', 'alert_id'], name='inventory_a_tenant__4075cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockadjustment',
+            index=models.Index(fields=['tenant_id', 'created_at', 'adjustment_id'], name='inventory_s_tenant__97480c_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:48
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+
+def backfill_valuation(apps, schema_editor):
+    # one grouped pass over existing batches; later writes keep rows current
+    Batch = apps.get_model("inventory", "Batch")
+    SKUValuation = apps.get_model("inventory", "SKUValuation")
+    money = DecimalField(max_digits=20, decimal_places=2)
+    layers = (
+        Batch.objects.order_by()
+        .values("sku_id", "tenant_id")
+        .annotate(
+            layer_value=Sum(
+                ExpressionWrapper(
+                    F("remaining_quantity") * F("cost_price"), output_field=money
+                )
+            ),
+            received_units=Sum("quantity"),
+            received_value=Sum(
+                ExpressionWrapper(F("quantity") * F("cost_price"), output_field=money)
+            ),
+        )
+    )
+    rows = []
+    for layer in layers.iterator():
+        units = layer["received_units"] or 0
+        received_value = Decimal(layer["received_value"] or 0).quantize(Decimal("0.01"))
+        rows.append(
+            SKUValuation(
+                sku_id=layer["sku_id"],
+                tenant_id=layer["tenant_id"],
+                layer_value=Decimal(layer["layer_value"] or 0).quantize(Decimal("0.01")),
+                received_units=units,
+                received_value=received_value,
+                average_cost=(received_value / units).quantize(Decimal("0.0001"))
+                if units > 0
+                else Decimal(0),
+            )
+        )
+    SKUValuation.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SKUValuation',
+            fields=[
+                ('sku', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='valuation', serialize=False, to='inventory.sku')),
+                ('tenant_id', models.UUIDField(db_index=True)),
+                ('layer_value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('received_units', models.IntegerField(default=0)),
+                ('received_value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('average_cost', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_valuation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_sku_valuation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sku',
+            name='suggested_reorder_threshold',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
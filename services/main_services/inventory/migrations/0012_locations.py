@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:13
+
+import django.db.models.deletion
+import main_services.inventory.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_sku_suggested_reorder_threshold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('location_id', models.UUIDField(default=main_services.inventory.models.generate_uuid, editable=False, primary_key=True, serialize=False)),
+                ('tenant_id', models.UUIDField(db_index=True)),
+                ('name', models.CharField(max_length=255)),
+                ('code', models.CharField(max_length=64)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tenant_id', 'code'), name='inventory_location_unique_code')],
+            },
+        ),
+        migrations.AddField(
+            model_name='stockadjustment',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.location'),
+        ),
+        migrations.CreateModel(
+            name='LocationStock',
+            fields=[
+                ('id', models.UUIDField(default=main_services.inventory.models.generate_uuid, editable=False, primary_key=True, serialize=False)),
+                ('tenant_id', models.UUIDField(db_index=True)),
+                ('quantity', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock', to='inventory.location')),
+                ('sku', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_stock', to='inventory.sku')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['location', 'sku'], name='inventory_l_locatio_40fd04_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sku', 'location'), name='inventory_location_stock_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:16
+
+import django.db.models.deletion
+import main_services.inventory.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_locations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="batch",
+            name="reserved_quantity",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="sku",
+            name="reserved_quantity",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="Reservation",
+            fields=[
+                (
+                    "reservation_id",
+                    models.UUIDField(
+                        default=main_services.inventory.models.generate_uuid,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True)),
+                ("quantity", models.IntegerField()),
+                ("reference", models.CharField(blank=True, max_length=255, null=True)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "batch",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reservations",
+                        to="inventory.batch",
+                    ),
+                ),
+                (
+                    "sku",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="inventory.sku",
+                    ),
+                ),
+            ],
+        ),
+    ]
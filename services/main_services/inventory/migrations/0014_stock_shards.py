@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:18
+
+import django.db.models.deletion
+import main_services.inventory.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0013_reservations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sku",
+            name="counter_shards",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="StockShard",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=main_services.inventory.models.generate_uuid,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("delta", models.IntegerField(default=0)),
+                (
+                    "sku",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shards",
+                        to="inventory.sku",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sku", "shard"), name="inventory_stock_shard_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0014_stock_shards"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertNotification",
+            fields=[
+                (
+                    "alert",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification",
+                        serialize=False,
+                        to="inventory.alert",
+                    ),
+                ),
+                ("tenant_id", models.UUIDField()),
+                ("enqueued_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["enqueued_at", "alert"],
+                        name="inventory_a_enqueue_d44426_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,195 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:28
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import DatabaseError, migrations, models, transaction
+
+# Frozen copy of the search.py tokenizer as of this migration, so later
+# changes to it cannot alter what the backfill writes. rebuild_search_index
+# re-tokenizes with the current code.
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_TERM_LENGTH = 64
+FUZZY_MIN_LENGTH = 4
+FIELD_WEIGHTS = {"sku_code": 8, "barcode": 8, "name": 4, "attributes": 1}
+
+
+def tokenize(text):
+    folded = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore")
+    return [
+        token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(folded.decode().lower())
+    ]
+
+
+def trigrams(term):
+    padded = f"${term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def is_word(term):
+    return len(term) >= FUZZY_MIN_LENGTH and term.isalpha()
+
+
+def attribute_values(attributes):
+    if isinstance(attributes, dict):
+        for value in attributes.values():
+            yield from attribute_values(value)
+    elif isinstance(attributes, list):
+        for value in attributes:
+            yield from attribute_values(value)
+    elif attributes is not None and not isinstance(attributes, bool):
+        yield attributes
+
+
+def sku_terms(name, sku_code, barcode, attributes):
+    terms = {}
+
+    def add(tokens, weight):
+        for token in tokens:
+            if terms.get(token, 0) < weight:
+                terms[token] = weight
+
+    add(tokenize(name or ""), FIELD_WEIGHTS["name"])
+    for value in attribute_values(attributes):
+        add(tokenize(value), FIELD_WEIGHTS["attributes"])
+    for field, value in (("sku_code", sku_code), ("barcode", barcode)):
+        tokens = tokenize(value or "")
+        if len(tokens) > 1:
+            tokens.append("".join(tokens)[:MAX_TERM_LENGTH])
+        add(tokens, FIELD_WEIGHTS[field])
+    return terms
+
+
+def trigram_index(apps, schema_editor):
+    # optional: with pg_trgm, fuzzy search reads a GIN index on the terms
+    # instead of the portable SearchTrigram vocabulary
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic():
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            schema_editor.execute(
+                "CREATE INDEX inventory_search_term_trgm "
+                "ON inventory_skusearchterm USING gin (term gin_trgm_ops)"
+            )
+    except DatabaseError:
+        pass
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS inventory_search_term_trgm")
+
+
+def backfill_search_index(apps, schema_editor):
+    SKU = apps.get_model("inventory", "SKU")
+    SKUSearchTerm = apps.get_model("inventory", "SKUSearchTerm")
+    SearchTrigram = apps.get_model("inventory", "SearchTrigram")
+    rows = SKU.objects.values_list(
+        "pk", "tenant_id", "name", "sku_code", "barcode", "attributes"
+    )
+    terms, vocabulary = [], set()
+    for sku_id, tenant_id, *fields in rows.iterator(chunk_size=2000):
+        for term, weight in sku_terms(*fields).items():
+            terms.append(
+                SKUSearchTerm(
+                    tenant_id=tenant_id, sku_id=sku_id, term=term, weight=weight
+                )
+            )
+            if is_word(term):
+                vocabulary.add((tenant_id, term))
+        if len(terms) >= 2000:
+            SKUSearchTerm.objects.bulk_create(terms)
+            terms = []
+    SKUSearchTerm.objects.bulk_create(terms)
+    SearchTrigram.objects.bulk_create(
+        [
+            SearchTrigram(tenant_id=tenant_id, trigram=gram, term=term)
+            for tenant_id, term in vocabulary
+            for gram in trigrams(term)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0015_alert_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchTrigram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tenant_id", models.UUIDField()),
+                ("trigram", models.CharField(max_length=3)),
+                ("term", models.CharField(max_length=64)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tenant_id", "trigram", "term"),
+                        name="inventory_search_trigram_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SKUSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tenant_id", models.UUIDField()),
+                ("term", models.CharField(max_length=64)),
+                ("weight", models.PositiveSmallIntegerField()),
+                (
+                    "sku",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="inventory.sku",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["tenant_id", "term", "sku", "weight"],
+                        name="inventory_search_term_idx",
+                        opclasses=[
+                            "uuid_ops",
+                            "varchar_pattern_ops",
+                            "uuid_ops",
+                            "int2_ops",
+                        ],
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sku", "term"), name="inventory_search_term_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(trigram_index, drop_trigram_index),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of facets.attribute_pairs as of this migration, so later
+# changes to it cannot alter what the backfill writes.
+# rebuild_attribute_index re-extracts with the current code.
+MAX_KEY_LENGTH = 64
+MAX_VALUE_LENGTH = 128
+
+
+def facet_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip()
+
+
+def flatten(key, value):
+    if isinstance(value, dict):
+        for sub_key, item in value.items():
+            yield from flatten(f"{key}.{sub_key}", item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from flatten(key, item)
+    elif value is not None:
+        yield key, facet_value(value)
+
+
+def attribute_pairs(attributes):
+    if not isinstance(attributes, dict):
+        return set()
+    return {
+        (key, value)
+        for top_key, top_value in attributes.items()
+        for key, value in flatten(str(top_key), top_value)
+        if value and len(key) <= MAX_KEY_LENGTH and len(value) <= MAX_VALUE_LENGTH
+    }
+
+
+def backfill_attribute_index(apps, schema_editor):
+    SKU = apps.get_model("inventory", "SKU")
+    SKUAttribute = apps.get_model("inventory", "SKUAttribute")
+    pairs = []
+    rows = SKU.objects.values_list("pk", "attributes")
+    for sku_id, attributes in rows.iterator(chunk_size=2000):
+        for key, value in attribute_pairs(attributes):
+            pairs.append(SKUAttribute(sku_id=sku_id, key=key, value=value))
+        if len(pairs) >= 2000:
+            SKUAttribute.objects.bulk_create(pairs)
+            pairs = []
+    SKUAttribute.objects.bulk_create(pairs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0016_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SKUAttribute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("value", models.CharField(max_length=128)),
+                (
+                    "sku",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attribute_index",
+                        to="inventory.sku",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sku", "key", "value"),
+                        name="inventory_sku_attribute_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_attribute_index, migrations.RunPython.noop),
+    ]
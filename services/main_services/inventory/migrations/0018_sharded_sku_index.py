@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0017_attribute_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sku",
+            index=models.Index(
+                condition=models.Q(("counter_shards__gt", 0)),
+                fields=["tenant_id"],
+                name="inventory_sku_sharded_idx",
+            ),
+        ),
+    ]
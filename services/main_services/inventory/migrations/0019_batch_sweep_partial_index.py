@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0018_sharded_sku_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="batch",
+            name="inventory_b_expiry__89aee8_idx",
+        ),
+        migrations.AddIndex(
+            model_name="batch",
+            index=models.Index(
+                condition=models.Q(("remaining_quantity__gt", 0)),
+                fields=["expiry_date", "batch_id"],
+                name="inventory_batch_sweep_idx",
+            ),
+        ),
+    ]
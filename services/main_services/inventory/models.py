@@ -1,5 +1,6 @@
 import uuid
 from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
 
@@ -8,6 +9,27 @@ def generate_uuid():
     return uuid.uuid4()
 
 
+def live_stock_level():
+    """
+    stock_level plus the deltas still parked in the SKU's counter shards,
+    summed along the shard unique index.
+    """
+    pending = (
+        StockShard.objects.filter(sku=models.OuterRef("pk"))
+        .order_by()
+        .values("sku")
+        .annotate(total=models.Sum("delta"))
+        .values("total")
+    )
+    return models.F("stock_level") + Coalesce(models.Subquery(pending), 0)
+
+
+class SKUQuerySet(models.QuerySet):
+    def with_live_stock(self):
+        """Annotate `live_stock_level` (see live_stock_level())."""
+        return self.annotate(live_stock_level=live_stock_level())
+
+
 class SKU(models.Model):
     sku_id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
     tenant_id = models.UUIDField(db_index=True)
@@ -19,22 +41,54 @@ class SKU(models.Model):
     barcode = models.CharField(max_length=128, blank=True, null=True, db_index=True)
     price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     stock_level = models.IntegerField(default=0)
+    # units held by unexpired Reservations; see available_to_promise
+    reserved_quantity = models.IntegerField(default=0)
     supplier_id = models.UUIDField(blank=True, null=True)
     track_batches = models.BooleanField(default=False)
     reorder_threshold = models.IntegerField(blank=True, null=True)
+    # > 0 spreads adjust_stock writes over this many StockShard rows
+    counter_shards = models.PositiveSmallIntegerField(default=0)
+    # written by the forecast_reorder_points job from recent sales
+    suggested_reorder_threshold = models.IntegerField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SKUQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["tenant_id", "category"]),
             models.Index(fields=["tenant_id", "stock_level"]),
+            # materialized low-stock set: only SKUs at or below their threshold
+            models.Index(
+                fields=["tenant_id"],
+                condition=models.Q(stock_level__lte=models.F("reorder_threshold")),
+                name="inventory_sku_low_stock_idx",
+            ),
+            # the few sharded SKUs, whose live level the index above misses
+            models.Index(
+                fields=["tenant_id"],
+                condition=models.Q(counter_shards__gt=0),
+                name="inventory_sku_sharded_idx",
+            ),
+        ]
+        constraints = [
+            # upsert key for bulk imports; NULL codes never collide
+            models.UniqueConstraint(
+                fields=["tenant_id", "sku_code"], name="inventory_sku_unique_code"
+            )
         ]
 
     def __str__(self):
         return f"{self.name} ({self.sku_code or self.sku_id})"
 
+    @property
+    def available_to_promise(self):
+        # sharded SKUs read through SKU.objects.with_live_stock()
+        level = getattr(self, "live_stock_level", self.stock_level)
+        return level - self.reserved_quantity
+
     def adjust_stock(
         self,
         delta: int,
@@ -42,29 +96,80 @@ class SKU(models.Model):
         reason: str,
         user=None,
         batch=None,
+        location=None,
         reference=None,
         note=None,
     ):
         """
         Adjust SKU stock atomically and log adjustment.
         If `batch` is provided, update batch.remaining_quantity as well.
-        Uses F() expressions for atomic DB updates and refreshes instances
-        from DB so callers see the final numeric values.
+        Each counter is bumped with one UPDATE ... RETURNING so callers see
+        the final numeric values without a refresh, and the low-stock alert
+        is evaluated exactly once, here (no post_save signal is sent).
+        Batch moves also shift the SKU's FIFO layer value (SKUValuation), and
+        a `location` moves the SKU's stock held there (LocationStock).
+
+        SKUs with `counter_shards` park the delta on a random StockShard row
+        instead of updating the SKU row; the result is then exposed as
+        `live_stock_level` and stock_level is left to the compactor. Sales
+        still lock the SKU row so their check sees every earlier sale.
+
+        A SALE may only take available-to-promise units, and a decrement at
+        a `location` only the units held there: InsufficientStock is raised,
+        and nothing written, otherwise.
         """
+        from .alerts import raise_low_stock_alerts
+        from .shards import add_to_shard
+        from .stock import (
+            check_promised,
+            increment_returning,
+            layer_value_deltas,
+            move_location_stock,
+        )
+
+        if batch and not self.track_batches:
+            raise ValueError("SKU not configured for batch tracking")
+
         with transaction.atomic():
             if batch:
-                if not self.track_batches:
-                    raise ValueError("SKU not configured for batch tracking")
-                # atomic DB update using F()
-                batch.remaining_quantity = models.F("remaining_quantity") + delta
-                batch.save(update_fields=["remaining_quantity"])
-                # important: refresh from db to get concrete integer value
-                batch.refresh_from_db(fields=["remaining_quantity"])
-
-            # update SKU stock atomically and refresh to get concrete value
-            self.stock_level = models.F("stock_level") + delta
-            self.save(update_fields=["stock_level"])
-            self.refresh_from_db(fields=["stock_level"])
+                batches = increment_returning(
+                    Batch,
+                    "remaining_quantity",
+                    {batch.pk: delta},
+                    returning=("sku_id", "cost_price"),
+                )
+                increment_returning(
+                    SKUValuation,
+                    "layer_value",
+                    layer_value_deltas(batches, {batch.pk: delta}),
+                )
+
+            if location:
+                move_location_stock(self.tenant_id, {(self.pk, location.pk): delta})
+
+            checked = reason == StockAdjustment.Reason.SALE and delta < 0
+            row = (
+                add_to_shard(self, delta, lock=checked) if self.counter_shards else None
+            )
+            sharded = row is not None
+            if not sharded:
+                row = increment_returning(
+                    SKU,
+                    "stock_level",
+                    {self.pk: delta},
+                    returning=("reorder_threshold", "name", "reserved_quantity"),
+                )[self.pk]
+            if checked:
+                check_promised(self.pk, row, delta)
+
+            if batch:
+                batch.remaining_quantity = batches[batch.pk]["remaining_quantity"]
+            if sharded:
+                self.live_stock_level = row["stock_level"]
+            else:
+                self.stock_level = row["stock_level"]
+            self.reorder_threshold = row["reorder_threshold"]
+            self.reserved_quantity = row["reserved_quantity"]
 
             adj = StockAdjustment.objects.create(
                 adjustment_id=uuid.uuid4(),
@@ -73,28 +178,110 @@ class SKU(models.Model):
                 quantity=delta,
                 reason=reason,
                 batch=batch,
+                location=location,
                 reference=reference,
                 note=note,
                 created_by=user,
             )
 
-            if (
-                self.reorder_threshold is not None
-                and self.stock_level <= self.reorder_threshold
-            ):
-                Alert.objects.get_or_create(
-                    tenant_id=self.tenant_id,
-                    sku=self,
-                    type=Alert.Type.LOW_STOCK,
-                    defaults={
-                        "sku_name": self.name,
-                        "current_stock": self.stock_level,
-                        "threshold": self.reorder_threshold,
-                    },
-                )
+            raise_low_stock_alerts({self.pk: dict(row, tenant_id=self.tenant_id)})
             return self, adj
 
 
+class SKUSearchTerm(models.Model):
+    """
+    One search token of a SKU (see search.py), weighted by the field it was
+    taken from. Derived data: rewritten whenever the SKU's text changes.
+    """
+
+    tenant_id = models.UUIDField()
+    # the (sku, term) unique constraint already indexes sku first
+    sku = models.ForeignKey(
+        SKU, on_delete=models.CASCADE, related_name="search_terms", db_index=False
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            # prefix range scans per tenant; the pattern opclass lets
+            # Postgres serve LIKE 'abc%' under any database collation
+            models.Index(
+                fields=["tenant_id", "term", "sku", "weight"],
+                name="inventory_search_term_idx",
+                opclasses=["uuid_ops", "varchar_pattern_ops", "uuid_ops", "int2_ops"],
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sku", "term"], name="inventory_search_term_unique"
+            )
+        ]
+
+
+class SearchTrigram(models.Model):
+    """
+    Trigram -> term map over a tenant's search vocabulary, used to find
+    near-miss spellings without pg_trgm. Terms are only ever added; stale
+    ones match no SKUSearchTerm and are dropped by a rebuild.
+    """
+
+    tenant_id = models.UUIDField()
+    trigram = models.CharField(max_length=3)
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_id", "trigram", "term"],
+                name="inventory_search_trigram_unique",
+            )
+        ]
+
+
+class SKUAttribute(models.Model):
+    """
+    One (key, value) pair extracted from SKU.attributes (see facets.py), so
+    attribute filters and facet counts read an index instead of the JSON.
+    Derived data: rewritten whenever the SKU's attributes change.
+    """
+
+    # the (sku, key, value) unique constraint is the index every lookup uses
+    sku = models.ForeignKey(
+        SKU, on_delete=models.CASCADE, related_name="attribute_index", db_index=False
+    )
+    key = models.CharField(max_length=64)
+    value = models.CharField(max_length=128)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sku", "key", "value"], name="inventory_sku_attribute_unique"
+            )
+        ]
+
+
+class StockShard(models.Model):
+    """
+    One of a hot SKU's `counter_shards` delta rows. Writers add to a random
+    shard so they do not queue on the SKU row lock; the compactor folds the
+    deltas back into SKU.stock_level. stock_level + SUM(delta) is the live
+    level at all times.
+    """
+
+    id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
+    sku = models.ForeignKey(SKU, on_delete=models.CASCADE, related_name="shards")
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sku", "shard"], name="inventory_stock_shard_unique"
+            )
+        ]
+
+
 class Batch(models.Model):
     batch_id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
     tenant_id = models.UUIDField(db_index=True)
@@ -103,17 +290,84 @@ class Batch(models.Model):
     batch_number = models.CharField(max_length=255)
     quantity = models.IntegerField()
     remaining_quantity = models.IntegerField(default=0)  # default set
+    reserved_quantity = models.IntegerField(default=0)
     received_at = models.DateField(blank=True, null=True)
     expiry_date = models.DateField(blank=True, null=True)
     cost_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant_id", "expiry_date"]),
+            # cross-tenant keyset walk used by the expiry sweeper, over the
+            # batches that still hold stock
+            models.Index(
+                fields=["expiry_date", "batch_id"],
+                condition=models.Q(remaining_quantity__gt=0),
+                name="inventory_batch_sweep_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if self._state.adding and not self.remaining_quantity:
             self.remaining_quantity = self.quantity
         super().save(*args, **kwargs)
 
 
+class Location(models.Model):
+    """A warehouse, store or other place a tenant keeps stock."""
+
+    location_id = models.UUIDField(
+        primary_key=True, default=generate_uuid, editable=False
+    )
+    tenant_id = models.UUIDField(db_index=True)
+
+    name = models.CharField(max_length=255)
+    code = models.CharField(max_length=64)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_id", "code"], name="inventory_location_unique_code"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+
+class LocationStock(models.Model):
+    """
+    Units of a SKU held at one location. SKU.stock_level stays the tenant-wide
+    total: every location-tagged adjustment moves both in the same
+    transaction, and transfers net to zero on the SKU.
+    """
+
+    id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
+    tenant_id = models.UUIDField(db_index=True)
+
+    sku = models.ForeignKey(
+        SKU, on_delete=models.CASCADE, related_name="location_stock"
+    )
+    location = models.ForeignKey(
+        Location, on_delete=models.CASCADE, related_name="stock"
+    )
+    quantity = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sku", "location"], name="inventory_location_stock_unique"
+            )
+        ]
+        indexes = [models.Index(fields=["location", "sku"])]
+
+
 class StockAdjustment(models.Model):
     class Reason(models.TextChoices):
         PURCHASE = "purchase", "Purchase"
@@ -131,6 +385,9 @@ class StockAdjustment(models.Model):
     quantity = models.IntegerField()
     reason = models.CharField(max_length=32, choices=Reason.choices)
     batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, blank=True, null=True)
+    location = models.ForeignKey(
+        Location, on_delete=models.SET_NULL, blank=True, null=True
+    )
     reference = models.CharField(max_length=255, blank=True, null=True)
     note = models.TextField(blank=True, null=True)
 
@@ -140,7 +397,91 @@ class StockAdjustment(models.Model):
     )
 
     class Meta:
-        indexes = [models.Index(fields=["tenant_id", "sku", "created_at"])]
+        indexes = [
+            models.Index(fields=["tenant_id", "sku", "created_at"]),
+            # day-range scans of the whole ledger (daily stock snapshots)
+            models.Index(fields=["created_at"]),
+            # newest-first keyset pages of a tenant's ledger
+            models.Index(fields=["tenant_id", "created_at", "adjustment_id"]),
+        ]
+
+
+class StockSnapshot(models.Model):
+    """
+    Closing stock level of a SKU at the end of `day` (the instant
+    `closing_at`), derived from the StockAdjustment ledger. Rows only exist
+    for days with activity; a SKU's level at any instant is its latest
+    snapshot plus the adjustments logged after `closing_at`.
+    """
+
+    snapshot_id = models.UUIDField(
+        primary_key=True, default=generate_uuid, editable=False
+    )
+    tenant_id = models.UUIDField(db_index=True)
+
+    sku = models.ForeignKey(SKU, on_delete=models.CASCADE, related_name="snapshots")
+    day = models.DateField()
+    closing_at = models.DateTimeField()
+    closing_level = models.IntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sku", "day"], name="inventory_snapshot_one_per_day"
+            )
+        ]
+
+
+class SKUValuation(models.Model):
+    """
+    Per-SKU cost layer rollup over the SKU's batches, kept current by every
+    writer that moves batch stock so tenant valuation is a single aggregate.
+
+    `layer_value` is the FIFO value on hand (sum of remaining_quantity x
+    cost_price); `received_units` / `received_value` cover every batch ever
+    received and give the weighted-average unit cost.
+    """
+
+    sku = models.OneToOneField(
+        SKU, on_delete=models.CASCADE, primary_key=True, related_name="valuation"
+    )
+    tenant_id = models.UUIDField(db_index=True)
+
+    layer_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    received_units = models.IntegerField(default=0)
+    received_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    average_cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Reservation(models.Model):
+    """
+    A hold on SKU (and optionally Batch) stock for an in-flight order. The
+    held units are mirrored in SKU/Batch.reserved_quantity; rows are deleted
+    when released, fulfilled or swept after `expires_at`.
+    """
+
+    reservation_id = models.UUIDField(
+        primary_key=True, default=generate_uuid, editable=False
+    )
+    tenant_id = models.UUIDField(db_index=True)
+
+    sku = models.ForeignKey(SKU, on_delete=models.CASCADE, related_name="reservations")
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="reservations",
+    )
+    quantity = models.IntegerField()
+    reference = models.CharField(max_length=255, blank=True, null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
 
 
 class Alert(models.Model):
@@ -164,8 +505,47 @@ class Alert(models.Model):
     )
     acknowledged_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # newest-first keyset pages of a tenant's alerts
+            models.Index(fields=["tenant_id", "created_at", "alert_id"]),
+        ]
+        constraints = [
+            # at most one open alert per SKU and type; lets alert writers use
+            # INSERT ... ON CONFLICT DO NOTHING instead of get_or_create
+            models.UniqueConstraint(
+                fields=["tenant_id", "sku", "type"],
+                condition=models.Q(acknowledged=False),
+                name="inventory_alert_one_open_per_type",
+            )
+        ]
+
     def acknowledge(self, user):
         self.acknowledged = True
         self.acknowledged_by = user
         self.acknowledged_at = timezone.now()
         self.save(update_fields=["acknowledged", "acknowledged_by", "acknowledged_at"])
+
+
+class AlertNotification(models.Model):
+    """
+    Outbox entry for an Alert nobody has been told about yet. Written in the
+    same transaction as the alert (see notifications.enqueue_notifications)
+    and deleted by the digest worker, committed just before the tenant's
+    email goes out.
+    """
+
+    alert = models.OneToOneField(
+        Alert,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification",
+    )
+    tenant_id = models.UUIDField()
+    enqueued_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # the worker drains the outbox oldest first
+            models.Index(fields=["enqueued_at", "alert"]),
+        ]
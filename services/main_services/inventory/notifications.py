@@ -0,0 +1,155 @@
+"""
+Alert notifications through a transactional outbox.
+
+Whoever inserts Alert rows also inserts one AlertNotification per alert
+actually created, with a single INSERT ... SELECT in the same transaction,
+so an alert burst costs the request path one statement and no email.
+`send_alert_digests` drains the outbox oldest first, a batch per
+transaction, and coalesces each batch into one digest per tenant sent to
+the tenant's active admins and managers through the configured
+EMAIL_BACKEND.
+
+A batch's outbox rows are deleted and committed before its email is sent,
+so a failed commit never leads to a resend. A failed send queues the batch
+again for the next run; a worker that dies between the commit and the send
+loses that batch's digest, while the alerts themselves stay listed.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, router, transaction
+
+from .models import Alert, AlertNotification
+
+NOTIFY_BATCH_SIZE = 500
+ENQUEUE_CHUNK_SIZE = 500
+DIGEST_ROLES = ("Admin", "Manager")
+
+
+def enqueue_notifications(alert_ids):
+    """
+    Queue the alerts among `alert_ids` that exist. Alerts skipped by an
+    ON CONFLICT DO NOTHING insert have no row, so ids generated for them
+    are simply not matched.
+    """
+    alert_ids = list(alert_ids)
+    if not alert_ids:
+        return
+    db = router.db_for_write(AlertNotification)
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    opts = AlertNotification._meta
+    columns = ", ".join(
+        qn(opts.get_field(name).column)
+        for name in ("alert", "tenant_id", "enqueued_at")
+    )
+    insert = f"INSERT INTO {qn(opts.db_table)} ({columns}) "
+
+    for start in range(0, len(alert_ids), ENQUEUE_CHUNK_SIZE):
+        select = (
+            Alert.objects.using(db)
+            .filter(pk__in=alert_ids[start : start + ENQUEUE_CHUNK_SIZE])
+            .order_by()
+            .values_list("alert_id", "tenant_id", "created_at")
+        )
+        sql, params = select.query.get_compiler(db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(insert + sql, params)
+
+
+def _describe(alert):
+    if alert["type"] == Alert.Type.LOW_STOCK:
+        return (
+            f"Low stock: {alert['sku_name']} has {alert['current_stock']} left "
+            f"(reorder at {alert['threshold']})"
+        )
+    return (
+        f"Batch expiry: {alert['sku_name']} has {alert['current_stock']} "
+        f"units in a batch expiring soon"
+    )
+
+
+def digest_message(alerts, recipients):
+    """One EmailMessage summarizing a tenant's `alerts` (dicts)."""
+    lines = [f"- {_describe(alert)}" for alert in alerts]
+    return EmailMessage(
+        subject=f"{len(alerts)} new inventory alert(s)",
+        body="\n".join(["New inventory alerts:", "", *lines]),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+    )
+
+
+def _recipients(tenant_ids):
+    emails = defaultdict(list)
+    users = (
+        get_user_model()
+        .objects.filter(tenant_id__in=tenant_ids, is_active=True, role__in=DIGEST_ROLES)
+        .order_by("email")
+        .values_list("tenant_id", "email")
+    )
+    for tenant_id, email in users:
+        emails[tenant_id].append(email)
+    return emails
+
+
+def _claim_batch(batch_size):
+    """
+    Take one outbox batch off the queue and build its digests, in one
+    transaction. Returns (alert_ids, messages) or None when empty.
+    """
+    with transaction.atomic():
+        batch = list(
+            AlertNotification.objects.select_for_update(skip_locked=True)
+            .order_by("enqueued_at", "alert_id")
+            .values_list("alert_id", flat=True)[:batch_size]
+        )
+        if not batch:
+            return None
+        # alerts acknowledged before the worker got to them are not news
+        pending = defaultdict(list)
+        for alert in (
+            Alert.objects.filter(pk__in=batch, acknowledged=False)
+            .order_by("type", "sku_name")
+            .values("tenant_id", "type", "sku_name", "current_stock", "threshold")
+        ):
+            pending[alert["tenant_id"]].append(alert)
+
+        recipients = _recipients(list(pending))
+        messages = [
+            digest_message(alerts, recipients[tenant_id])
+            for tenant_id, alerts in pending.items()
+            if recipients[tenant_id]
+        ]
+        AlertNotification.objects.filter(pk__in=batch).delete()
+    return batch, messages
+
+
+def send_alert_digests(batch_size=NOTIFY_BATCH_SIZE):
+    """
+    Drain the whole outbox, sending each batch's digests after its claim
+    committed (so call this outside a transaction). Concurrent workers skip
+    each other's locked rows. Returns (alerts, digests) handled.
+    """
+    alerts = digests = 0
+    mail = get_connection(fail_silently=False)
+    with mail:
+        while True:
+            claimed = _claim_batch(batch_size)
+            if claimed is None:
+                break
+            batch, messages = claimed
+            if messages:
+                try:
+                    mail.send_messages(messages)
+                except Exception:
+                    with transaction.atomic():
+                        enqueue_notifications(batch)
+                    raise
+            alerts += len(batch)
+            digests += len(messages)
+            if len(batch) < batch_size:
+                break
+    return alerts, digests
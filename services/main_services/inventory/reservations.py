@@ -0,0 +1,161 @@
+"""
+Stock reservations (holds) for in-flight orders.
+
+A reservation bumps `reserved_quantity` on its SKU (and batch) with the same
+UPDATE ... RETURNING that checks availability, so available-to-promise
+(`stock_level - reserved_quantity`) is maintained incrementally and two
+concurrent holds can never promise the same unit. Expired holds are not
+checked on read; `sweep_expired_reservations` reclaims them in bulk along
+the `expires_at` index.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SKU, Batch, Reservation, StockAdjustment
+from .shards import pending_delta
+from .stock import InsufficientStock, increment_returning
+
+DEFAULT_HOLD_SECONDS = 15 * 60
+MAX_HOLD_SECONDS = 24 * 60 * 60
+RESERVATION_SWEEP_PAGE_SIZE = 2000
+
+
+class ReservationExpired(ValueError):
+    """Raised when fulfilling a reservation that was released or swept."""
+
+
+def reserve_stock(
+    sku, quantity, *, ttl=DEFAULT_HOLD_SECONDS, batch=None, reference=None
+):
+    """
+    Hold `quantity` units of `sku` (and of `batch`, if given) for `ttl`
+    seconds. Raises InsufficientStock, leaving nothing held, when the SKU or
+    batch has less than that available to promise.
+
+    Returns the Reservation; `sku.reserved_quantity` is refreshed in place.
+    """
+    if quantity <= 0:
+        raise ValueError("Reservation quantity must be positive")
+    if batch is not None and not sku.track_batches:
+        raise ValueError("SKU not configured for batch tracking")
+
+    with transaction.atomic():
+        row = increment_returning(
+            SKU, "reserved_quantity", {sku.pk: quantity}, returning=("stock_level",)
+        )[sku.pk]
+        # sharded SKUs still have units parked outside stock_level
+        level = row["stock_level"] + pending_delta(sku)
+        available = level - row["reserved_quantity"]
+        if available < 0:
+            raise InsufficientStock(
+                quantity, available + quantity, "stock to promise", sku_id=sku.pk
+            )
+        if batch is not None:
+            held = increment_returning(
+                Batch,
+                "reserved_quantity",
+                {batch.pk: quantity},
+                returning=("remaining_quantity",),
+            )[batch.pk]
+            batch_available = held["remaining_quantity"] - held["reserved_quantity"]
+            if batch_available < 0:
+                raise InsufficientStock(
+                    quantity,
+                    batch_available + quantity,
+                    "batch stock to promise",
+                    sku_id=sku.pk,
+                )
+            batch.reserved_quantity = held["reserved_quantity"]
+
+        reservation = Reservation.objects.create(
+            tenant_id=sku.tenant_id,
+            sku=sku,
+            batch=batch,
+            quantity=quantity,
+            reference=reference,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+        )
+    sku.stock_level = row["stock_level"]
+    if sku.counter_shards:
+        sku.live_stock_level = level
+    sku.reserved_quantity = row["reserved_quantity"]
+    return reservation
+
+
+def _release(reservations, limit=None):
+    """
+    Delete the given reservations and hand their units back, grouped into
+    one UPDATE per counter table. Rows are locked first (skipping rows a
+    concurrent release already holds) so units are only returned once.
+    Returns the released rows as (pk, sku_id, batch_id, quantity).
+    """
+    rows = reservations.select_for_update(skip_locked=True).values_list(
+        "pk", "sku_id", "batch_id", "quantity"
+    )
+    rows = list(rows[:limit] if limit else rows)
+    if not rows:
+        return rows
+
+    sku_deltas = defaultdict(int)
+    batch_deltas = defaultdict(int)
+    for _, sku_id, batch_id, quantity in rows:
+        sku_deltas[sku_id] -= quantity
+        if batch_id is not None:
+            batch_deltas[batch_id] -= quantity
+    Reservation.objects.filter(pk__in=[row[0] for row in rows]).delete()
+    increment_returning(SKU, "reserved_quantity", sku_deltas)
+    increment_returning(Batch, "reserved_quantity", batch_deltas)
+    return rows
+
+
+def release_reservation(reservation):
+    """Release one hold. Returns False if it was already released or swept."""
+    with transaction.atomic():
+        return bool(_release(Reservation.objects.filter(pk=reservation.pk)))
+
+
+def fulfil_reservation(reservation, *, user=None):
+    """
+    Turn a hold into a SALE: release it and take its units off stock in the
+    same transaction. Raises ReservationExpired if the hold is gone or past
+    `expires_at` (an expired hold is left for the sweep to release).
+    Returns the StockAdjustment.
+    """
+    if reservation.expires_at <= timezone.now():
+        raise ReservationExpired("Reservation has expired or was released")
+    with transaction.atomic():
+        if not _release(Reservation.objects.filter(pk=reservation.pk)):
+            raise ReservationExpired("Reservation has expired or was released")
+        _, adjustment = reservation.sku.adjust_stock(
+            delta=-reservation.quantity,
+            reason=StockAdjustment.Reason.SALE,
+            batch=reservation.batch,
+            reference=reservation.reference,
+            user=user,
+        )
+    return adjustment
+
+
+def sweep_expired_reservations(now=None, page_size=RESERVATION_SWEEP_PAGE_SIZE):
+    """
+    Release every reservation that expired at or before `now`, oldest first,
+    one page per transaction. Returns (released, pages).
+    """
+    now = now or timezone.now()
+    expired = Reservation.objects.filter(expires_at__lte=now).order_by(
+        "expires_at", "pk"
+    )
+    released = pages = 0
+    while True:
+        with transaction.atomic():
+            rows = _release(expired, limit=page_size)
+        if not rows:
+            break
+        released += len(rows)
+        pages += 1
+        if len(rows) < page_size:
+            break
+    return released, pages
@@ -0,0 +1,310 @@
+"""
+SKU search over a maintained token index.
+
+Every SKU's name, sku_code, barcode and attribute values are folded to
+lowercase ASCII tokens and stored as SKUSearchTerm rows weighted by the
+field they came from, so a search is a handful of range scans on the
+`(tenant_id, term)` index instead of a LIKE over the SKU table:
+
+- each query token matches terms it is a prefix of (exact matches rank
+  double), and every token has to match for a SKU to be returned;
+- when that finds too little, tokens are widened to near-miss spellings
+  taken from the tenant's trigram vocabulary (SearchTrigram), or from a
+  `pg_trgm` index on the terms when the extension is installed.
+
+The index is refreshed by the SKU post_save signal and by the importer;
+`rebuild_search_index` repairs it after writes that bypassed both.
+"""
+import functools
+import re
+import unicodedata
+from collections import defaultdict
+from operator import or_
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Max, Q, Value
+
+from .models import SKU, SearchTrigram, SKUSearchTerm
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TOKENS = 5
+# shorter query tokens only match whole terms; "a" would scan every term
+MIN_PREFIX_LENGTH = 2
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_TERMS_PER_TOKEN = 10
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+INDEX_CHUNK_SIZE = 2000
+CANDIDATE_CHUNK_SIZE = 2000
+SEARCH_FIELDS = ("name", "sku_code", "barcode", "attributes")
+FIELD_WEIGHTS = {"sku_code": 8, "barcode": 8, "name": 4, "attributes": 1}
+# score multipliers for how a query token matched a term
+EXACT, PREFIX, NEAR = 4, 2, 1
+
+
+def tokenize(text):
+    """Lowercase ASCII alphanumeric runs of `text`, accents stripped."""
+    folded = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore")
+    return [
+        token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(folded.decode().lower())
+    ]
+
+
+def trigrams(term):
+    padded = f"${term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def is_word(term):
+    """Only words go into the fuzzy vocabulary; codes are typed exactly."""
+    return len(term) >= FUZZY_MIN_LENGTH and term.isalpha()
+
+
+def _attribute_values(attributes):
+    if isinstance(attributes, dict):
+        for value in attributes.values():
+            yield from _attribute_values(value)
+    elif isinstance(attributes, list):
+        for value in attributes:
+            yield from _attribute_values(value)
+    elif attributes is not None and not isinstance(attributes, bool):
+        yield attributes
+
+
+def sku_terms(name, sku_code, barcode, attributes):
+    """{term: weight} for one SKU; a term keeps its best field's weight."""
+    terms = {}
+
+    def add(tokens, weight):
+        for token in tokens:
+            if terms.get(token, 0) < weight:
+                terms[token] = weight
+
+    add(tokenize(name or ""), FIELD_WEIGHTS["name"])
+    for value in _attribute_values(attributes):
+        add(tokenize(value), FIELD_WEIGHTS["attributes"])
+    for field, value in (("sku_code", sku_code), ("barcode", barcode)):
+        tokens = tokenize(value or "")
+        # "ABC-123" is typed as abc, 123 or abc123
+        if len(tokens) > 1:
+            tokens.append("".join(tokens)[:MAX_TERM_LENGTH])
+        add(tokens, FIELD_WEIGHTS[field])
+    return terms
+
+
+def index_skus(skus):
+    """
+    Rewrite the search terms of `skus` (SKU instances or an SKU queryset)
+    and add any new terms to their tenant's trigram vocabulary.
+    """
+    if hasattr(skus, "values_list"):
+        rows = skus.values_list("pk", "tenant_id", *SEARCH_FIELDS)
+    else:
+        rows = [
+            (sku.pk, sku.tenant_id, *(getattr(sku, f) for f in SEARCH_FIELDS))
+            for sku in skus
+        ]
+
+    terms, vocabulary, sku_ids = [], set(), []
+    for sku_id, tenant_id, *fields in rows:
+        sku_ids.append(sku_id)
+        for term, weight in sku_terms(*fields).items():
+            terms.append(
+                SKUSearchTerm(
+                    tenant_id=tenant_id, sku_id=sku_id, term=term, weight=weight
+                )
+            )
+            if is_word(term):
+                vocabulary.add((tenant_id, term))
+    if not sku_ids:
+        return 0
+
+    with transaction.atomic():
+        SKUSearchTerm.objects.filter(sku_id__in=sku_ids).delete()
+        SKUSearchTerm.objects.bulk_create(terms, batch_size=INDEX_CHUNK_SIZE)
+        SearchTrigram.objects.bulk_create(
+            [
+                SearchTrigram(tenant_id=tenant_id, trigram=gram, term=term)
+                for tenant_id, term in vocabulary
+                for gram in trigrams(term)
+            ],
+            batch_size=INDEX_CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+    return len(terms)
+
+
+def rebuild_search_index(tenant_id=None, chunk_size=INDEX_CHUNK_SIZE):
+    """
+    Re-index every SKU (of one tenant), `chunk_size` SKUs at a time, after
+    dropping the vocabulary so terms no SKU uses any more go away.
+    Returns the number of terms written.
+    """
+    skus = SKU.objects.order_by("pk")
+    vocabulary = SearchTrigram.objects.all()
+    if tenant_id:
+        skus = skus.filter(tenant_id=tenant_id)
+        vocabulary = vocabulary.filter(tenant_id=tenant_id)
+    vocabulary.delete()
+    ids = list(skus.values_list("pk", flat=True))
+    written = 0
+    for start in range(0, len(ids), chunk_size):
+        written += index_skus(
+            SKU.objects.filter(pk__in=ids[start : start + chunk_size])
+        )
+    return written
+
+
+@functools.cache
+def _has_pg_trgm(alias):
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def _prefix(token, alias):
+    """Terms starting with `token`, in a form the term index can serve."""
+    if len(token) < MIN_PREFIX_LENGTH:
+        return Q(term=token)
+    if connections[alias].vendor == "postgresql":
+        # served by the varchar_pattern_ops column of the term index
+        return Q(term__startswith=token)
+    # terms are [a-z0-9] only and "{" sorts right after "z", so this is a
+    # prefix match that SQLite answers with a range scan on the index
+    return Q(term__gte=token, term__lt=token + "{")
+
+
+def fuzzy_terms(tenant_id, token, alias=None):
+    """Vocabulary terms spelled like `token`, most similar first."""
+    alias = alias or router.db_for_read(SKUSearchTerm)
+    if not is_word(token):
+        return []
+    if _has_pg_trgm(alias):
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return list(
+            SKUSearchTerm.objects.using(alias)
+            .filter(TrigramSimilar(F("term"), Value(token)), tenant_id=tenant_id)
+            .values("term")
+            .annotate(similarity=Max(TrigramSimilarity("term", token)))
+            .order_by("-similarity", "term")
+            .values_list("term", flat=True)[:FUZZY_TERMS_PER_TOKEN]
+        )
+
+    grams = trigrams(token)
+    shared = (
+        SearchTrigram.objects.using(alias)
+        .filter(tenant_id=tenant_id, trigram__in=grams)
+        .values("term")
+        .annotate(shared=Count("pk"))
+        .filter(shared__gte=2)
+        .values_list("term", "shared")
+    )
+    scored = []
+    for term, count in shared:
+        # Jaccard similarity of the two trigram sets
+        similarity = count / (len(grams) + len(trigrams(term)) - count)
+        if similarity >= FUZZY_MIN_SIMILARITY:
+            scored.append((-similarity, term))
+    return [term for _, term in sorted(scored)[:FUZZY_TERMS_PER_TOKEN]]
+
+
+def _score(token, near, term, weight):
+    """How well `term` (of a given field weight) answers one query token."""
+    if term == token:
+        return weight * EXACT
+    if len(token) >= MIN_PREFIX_LENGTH and term.startswith(token):
+        return weight * PREFIX
+    if term in near:
+        return weight * NEAR
+    return 0
+
+
+def _matching(token, near, alias):
+    q = _prefix(token, alias)
+    return q | Q(term__in=near) if near else q
+
+
+def _ranked(tenant_id, tokens, near, lead, alias):
+    """
+    {sku_id: score} of the SKUs matching every token. Candidates come from
+    one range scan for the `lead` token; the other tokens are then looked
+    up on the (sku, term) index of those candidates only. Both are plain
+    index reads, so the plan does not hinge on the planner's statistics.
+    """
+    terms = SKUSearchTerm.objects.using(alias)
+    best = defaultdict(dict)
+
+    def collect(rows, positions):
+        for sku_id, term, weight in rows:
+            for i in positions:
+                score = _score(tokens[i], near[i], term, weight)
+                if score > best[sku_id].get(i, 0):
+                    best[sku_id][i] = score
+
+    collect(
+        terms.filter(_matching(tokens[lead], near[lead], alias), tenant_id=tenant_id)
+        .values_list("sku_id", "term", "weight")
+        .iterator(),
+        [lead],
+    )
+    others = [i for i in range(len(tokens)) if i != lead]
+    if others:
+        matching = functools.reduce(
+            or_, (_matching(tokens[i], near[i], alias) for i in others)
+        )
+        candidates = list(best)
+        for start in range(0, len(candidates), CANDIDATE_CHUNK_SIZE):
+            collect(
+                terms.filter(
+                    matching,
+                    sku_id__in=candidates[start : start + CANDIDATE_CHUNK_SIZE],
+                ).values_list("sku_id", "term", "weight"),
+                others,
+            )
+    return {
+        sku_id: sum(scores.values())
+        for sku_id, scores in best.items()
+        if len(scores) == len(tokens)
+    }
+
+
+def search_skus(tenant_id, query, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Ranked [(SKU, score)] for a free-text `query` within one tenant. Prefix
+    matches come first; near-miss spellings only fill up a short result.
+    """
+    alias = router.db_for_read(SKUSearchTerm)
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+    # the longest token is the likeliest to be the most selective
+    lead = max(range(len(tokens)), key=lambda i: len(tokens[i]))
+
+    def top(scores, count):
+        return sorted(scores, key=lambda sku_id: (-scores[sku_id], sku_id))[:count]
+
+    scores = _ranked(tenant_id, tokens, [()] * len(tokens), lead, alias)
+    ranked = top(scores, limit)
+    if len(ranked) < limit:
+        near = []
+        for token in tokens:
+            similar = fuzzy_terms(tenant_id, token, alias)
+            # a token found in the vocabulary is spelled right already
+            near.append(() if token in similar else tuple(similar))
+        if any(near):
+            # a near miss never outranks a real prefix match
+            widened = _ranked(tenant_id, tokens, near, lead, alias)
+            for sku_id in ranked:
+                widened.pop(sku_id, None)
+            ranked += top(widened, limit - len(ranked))
+            scores.update(widened)
+
+    skus = SKU.objects.using(alias).with_live_stock().in_bulk(ranked)
+    return [(skus[sku_id], scores[sku_id]) for sku_id in ranked if sku_id in skus]
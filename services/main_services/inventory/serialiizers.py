@@ -1,8 +1,21 @@
 from rest_framework import serializers
-from .models import SKU, Batch, StockAdjustment, Alert
+from .models import (
+    SKU,
+    Batch,
+    Location,
+    LocationStock,
+    Reservation,
+    StockAdjustment,
+    Alert,
+)
+from .reservations import DEFAULT_HOLD_SECONDS, MAX_HOLD_SECONDS
+from .shards import MAX_COUNTER_SHARDS
 
 
 class SKUSerializer(serializers.ModelSerializer):
+    available_to_promise = serializers.IntegerField(read_only=True)
+    live_stock_level = serializers.SerializerMethodField()
+
     class Meta:
         model = SKU
         fields = (
@@ -14,13 +27,43 @@ class SKUSerializer(serializers.ModelSerializer):
             "barcode",
             "price",
             "stock_level",
+            "live_stock_level",
+            "counter_shards",
+            "reserved_quantity",
+            "available_to_promise",
             "supplier_id",
             "track_batches",
             "reorder_threshold",
+            "suggested_reorder_threshold",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = (
+            "sku_id",
+            "stock_level",
+            "counter_shards",
+            "reserved_quantity",
+            "suggested_reorder_threshold",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("sku_id", "stock_level", "created_at", "updated_at")
+
+    def get_live_stock_level(self, obj):
+        # annotated by SKU.objects.with_live_stock() on list and retrieve
+        return getattr(obj, "live_stock_level", obj.stock_level)
+
+    def validate_sku_code(self, value):
+        if not value:
+            return None
+        request = self.context.get("request")
+        tenant_id = request.headers.get("X-Tenant-ID") if request else None
+        if tenant_id:
+            clash = SKU.objects.filter(tenant_id=tenant_id, sku_code=value)
+            if self.instance is not None:
+                clash = clash.exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError("A SKU with this code already exists.")
+        return value
 
 
 class BatchSerializer(serializers.ModelSerializer):
@@ -32,12 +75,45 @@ class BatchSerializer(serializers.ModelSerializer):
             "batch_number",
             "quantity",
             "remaining_quantity",
+            "reserved_quantity",
             "received_at",
             "expiry_date",
             "cost_price",
             "created_at",
         )
-        read_only_fields = ("batch_id", "remaining_quantity", "created_at")
+        read_only_fields = (
+            "batch_id",
+            "remaining_quantity",
+            "reserved_quantity",
+            "created_at",
+        )
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ("location_id", "name", "code", "is_active", "created_at")
+        read_only_fields = ("location_id", "created_at")
+
+    def validate_code(self, value):
+        request = self.context.get("request")
+        tenant_id = request.headers.get("X-Tenant-ID") if request else None
+        if tenant_id:
+            clash = Location.objects.filter(tenant_id=tenant_id, code=value)
+            if self.instance is not None:
+                clash = clash.exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError(
+                    "A location with this code already exists."
+                )
+        return value
+
+
+class LocationStockSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LocationStock
+        fields = ("sku", "location", "quantity", "updated_at")
+        read_only_fields = fields
 
 
 class StockAdjustmentSerializer(serializers.ModelSerializer):
@@ -49,6 +125,7 @@ class StockAdjustmentSerializer(serializers.ModelSerializer):
             "quantity",
             "reason",
             "batch",
+            "location",
             "reference",
             "note",
             "created_at",
@@ -68,10 +145,122 @@ class StockAdjustmentCreateSerializer(serializers.Serializer):
         choices=[c[0] for c in StockAdjustment.Reason.choices]
     )
     batch_id = serializers.UUIDField(required=False, allow_null=True)
+    location_id = serializers.UUIDField(required=False, allow_null=True)
     reference = serializers.CharField(required=False, allow_blank=True)
     note = serializers.CharField(required=False, allow_blank=True)
 
 
+class StockAllocationSerializer(serializers.Serializer):
+    """
+    Used for POST FEFO allocation endpoint.
+    Validates request body before allocate_fefo().
+    """
+
+    quantity = serializers.IntegerField(min_value=1)
+    reason = serializers.ChoiceField(
+        choices=[c[0] for c in StockAdjustment.Reason.choices],
+        default=StockAdjustment.Reason.SALE,
+    )
+    reference = serializers.CharField(required=False, allow_blank=True)
+    note = serializers.CharField(required=False, allow_blank=True)
+
+
+class CounterShardsSerializer(serializers.Serializer):
+    """
+    Used for POST SKU counter-shards endpoint.
+    Validates request body before set_counter_shards().
+    """
+
+    shards = serializers.IntegerField(min_value=0, max_value=MAX_COUNTER_SHARDS)
+
+
+class StockReservationSerializer(serializers.Serializer):
+    """
+    Used for POST SKU reserve endpoint.
+    Validates request body before reserve_stock().
+    """
+
+    quantity = serializers.IntegerField(min_value=1)
+    ttl_seconds = serializers.IntegerField(
+        min_value=1, max_value=MAX_HOLD_SECONDS, default=DEFAULT_HOLD_SECONDS
+    )
+    batch_id = serializers.UUIDField(required=False, allow_null=True)
+    reference = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reservation
+        fields = (
+            "reservation_id",
+            "sku",
+            "batch",
+            "quantity",
+            "reference",
+            "expires_at",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
+class BulkStockAdjustmentItemSerializer(StockAdjustmentCreateSerializer):
+    sku_id = serializers.UUIDField()
+
+
+class BulkStockAdjustmentSerializer(serializers.Serializer):
+    """
+    Used for POST bulk stock adjustments endpoint.
+    Validates every row before bulk_adjust_stock().
+    """
+
+    adjustments = BulkStockAdjustmentItemSerializer(
+        many=True, allow_empty=False, max_length=5000
+    )
+
+
+class StockTransferLineSerializer(serializers.Serializer):
+    sku_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockTransferSerializer(serializers.Serializer):
+    """
+    Used for POST location transfer endpoint.
+    Validates request body before transfer_stock().
+    """
+
+    to_location_id = serializers.UUIDField()
+    lines = StockTransferLineSerializer(many=True, allow_empty=False, max_length=5000)
+    reference = serializers.CharField(required=False, allow_blank=True)
+    note = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkAcknowledgeSerializer(serializers.Serializer):
+    """
+    Used for POST alerts bulk-acknowledge endpoint.
+    Selects alerts by id and/or filters; at least one is required so an
+    empty body cannot acknowledge a tenant's whole backlog.
+    """
+
+    alert_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=5000,
+    )
+    type = serializers.ChoiceField(choices=Alert.Type.choices, required=False)
+    sku = serializers.UUIDField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(
+                "Provide alert_ids or at least one filter."
+            )
+        return attrs
+
+
 class AlertSerializer(serializers.ModelSerializer):
     class Meta:
         model = Alert
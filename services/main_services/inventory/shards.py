@@ -0,0 +1,142 @@
+"""
+Sharded stock counters for hot SKUs.
+
+Every `adjust_stock` on a SKU updates its one `stock_level` row, so during a
+flash sale all writers queue on that row lock. A SKU with `counter_shards`
+set instead adds each delta to one of N StockShard rows picked at random,
+and `compact_stock_shards` later folds the accumulated deltas back into
+`stock_level`. At every instant the live level is
+
+    stock_level + SUM(StockShard.delta)
+
+which `SKU.objects.with_live_stock()` reads in one query along the
+(sku, shard) unique index.
+
+Only unchecked writes (receipts, returns, corrections) stay off the SKU
+row. A SALE is checked against the live level and still queues on the SKU
+row lock, or two concurrent sales could each pass on the other's
+uncommitted units.
+"""
+import random
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import SKU, StockShard
+from .stock import increment_returning
+
+MAX_COUNTER_SHARDS = 64
+
+
+def pending_delta(sku):
+    """Units parked in `sku`'s shards that stock_level does not include yet."""
+    if not sku.counter_shards:
+        return 0
+    total = StockShard.objects.filter(sku_id=sku.pk).aggregate(total=Sum("delta"))
+    return total["total"] or 0
+
+
+def pending_deltas(sku_ids):
+    """{sku_id: units parked in its shards} for the SKUs that have any."""
+    return dict(
+        StockShard.objects.filter(sku_id__in=sku_ids)
+        .values("sku_id")
+        .annotate(total=Sum("delta"))
+        .exclude(total=0)
+        .values_list("sku_id", "total")
+    )
+
+
+def add_to_shard(sku, delta, *, lock=False):
+    """
+    Add `delta` to a random shard of `sku`. Returns the SKU's live
+    stock_level, reorder_threshold, name and reserved_quantity, or None when
+    the shard row is missing (the shard count is being changed) and the
+    caller should fall back to updating stock_level directly.
+
+    Shard writers cannot see each other's uncommitted deltas, so a decrement
+    that is checked against the live level passes `lock` to queue on the
+    SKU row first, as order placement and reservations do.
+    """
+    if lock:
+        SKU.objects.select_for_update().filter(pk=sku.pk).values_list("pk").get()
+    updated = StockShard.objects.filter(
+        sku_id=sku.pk, shard=random.randrange(sku.counter_shards)
+    ).update(delta=F("delta") + delta)
+    if not updated:
+        return None
+    row = (
+        SKU.objects.with_live_stock()
+        .filter(pk=sku.pk)
+        .values("live_stock_level", "reorder_threshold", "name", "reserved_quantity")
+        .get()
+    )
+    row["stock_level"] = row.pop("live_stock_level")
+    return row
+
+
+def compact_stock_shards(sku_ids=None):
+    """
+    Fold pending shard deltas into SKU.stock_level. The deltas read are
+    subtracted from their shards (not zeroed), so writes landing on a shard
+    while the compactor runs are kept for the next pass; both updates commit
+    together, so the live level never moves. Returns the number of SKUs
+    compacted.
+
+    The SKU rows are locked first, in primary key order, and the shard rows
+    after them, the same order set_counter_shards takes, so a shard being
+    dropped is either folded by one of them or already gone.
+    """
+    pending = StockShard.objects.exclude(delta=0)
+    if sku_ids is not None:
+        pending = pending.filter(sku_id__in=sku_ids)
+
+    with transaction.atomic():
+        locked = list(
+            SKU.objects.select_for_update()
+            .filter(pk__in=pending.values("sku_id"))
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        rows = list(
+            pending.filter(sku_id__in=locked)
+            .select_for_update()
+            .order_by("pk")
+            .values_list("pk", "sku_id", "delta")
+        )
+        if not rows:
+            return 0
+        totals = defaultdict(int)
+        for _, sku_id, delta in rows:
+            totals[sku_id] += delta
+        increment_returning(StockShard, "delta", {pk: -delta for pk, _, delta in rows})
+        increment_returning(SKU, "stock_level", totals)
+    return len(totals)
+
+
+def set_counter_shards(sku, shards):
+    """
+    Switch `sku` to `shards` counter shards (0 turns sharding off). Shards
+    dropped by the change are folded into stock_level and deleted under the
+    SKU row lock; writers still aiming at them fall back to the SKU row.
+    """
+    if not 0 <= shards <= MAX_COUNTER_SHARDS:
+        raise ValueError(f"counter_shards must be between 0 and {MAX_COUNTER_SHARDS}")
+
+    with transaction.atomic():
+        SKU.objects.select_for_update().filter(pk=sku.pk).values_list("pk").get()
+        StockShard.objects.bulk_create(
+            [StockShard(sku_id=sku.pk, shard=shard) for shard in range(shards)],
+            ignore_conflicts=True,
+        )
+        dropped = StockShard.objects.select_for_update().filter(
+            sku_id=sku.pk, shard__gte=shards
+        )
+        folded = sum(dropped.values_list("delta", flat=True))
+        dropped.delete()
+        SKU.objects.filter(pk=sku.pk).update(
+            counter_shards=shards, stock_level=F("stock_level") + folded
+        )
+    sku.refresh_from_db(fields=["counter_shards", "stock_level"])
+    return sku
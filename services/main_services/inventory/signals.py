@@ -1,63 +1,85 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.utils import timezone
-from datetime import timedelta
-from .models import SKU, Batch, Alert
+from .models import SKU, Batch
+from .alerts import raise_low_stock_alerts
+from .barcodes import invalidate_sku
+from .facets import index_attributes
+from .search import SEARCH_FIELDS, index_skus
+from .shards import pending_delta
+from .valuation import refresh_valuation
 
+# Batch expiry alerts are raised by the `sweep_batch_expiry` management
+# command (see alerts.sweep_expiring_batches) rather than on Batch save, so
+# batches that drift into the window later are caught as well.
 
-def create_alert_if_not_exists(tenant_id, sku, alert_type, defaults=None):
-    """Helper to create alert if it doesn't already exist for this tenant + SKU + type"""
-    Alert.objects.get_or_create(
-        tenant_id=tenant_id, sku=sku, type=alert_type, defaults=defaults or {}
+
+# -----------------------
+# Low Stock Alert
+# -----------------------
+@receiver(post_save, sender=SKU)
+def low_stock_alert(sender, instance, update_fields=None, **kwargs):
+    # SKU.adjust_stock evaluates alerts itself and never sends post_save, so
+    # this only covers regular saves (create, threshold edits). Saves that
+    # carry an unresolved F() expression are skipped rather than re-read.
+    if update_fields is not None and not {"stock_level", "reorder_threshold"} & set(
+        update_fields
+    ):
+        return
+    if not isinstance(instance.stock_level, int):
+        return
+
+    raise_low_stock_alerts(
+        {
+            instance.pk: {
+                "tenant_id": instance.tenant_id,
+                "name": instance.name,
+                "stock_level": instance.stock_level + pending_delta(instance),
+                "reorder_threshold": instance.reorder_threshold,
+            }
+        }
     )
 
 
 # -----------------------
-# Batch Expiry Alert
+# Barcode Cache
 # -----------------------
-@receiver(post_save, sender=Batch)
-def batch_expiry_alert(sender, instance, **kwargs):
-    if (
-        instance.expiry_date
-        and instance.expiry_date <= timezone.now().date() + timedelta(days=30)
-    ):
-        create_alert_if_not_exists(
-            tenant_id=instance.tenant_id,
-            sku=instance.sku,
-            alert_type=Alert.Type.BATCH_EXPIRY,
-            defaults={
-                "sku_name": instance.sku.name,
-                "current_stock": instance.remaining_quantity,
-            },
-        )
+@receiver(post_save, sender=SKU)
+@receiver(post_delete, sender=SKU)
+def invalidate_barcode_cache(sender, instance, **kwargs):
+    # after commit, so a lookup racing the write cannot cache the old row
+    # again; the fields are read now, delete() clears the pk
+    key = (instance.tenant_id, instance.pk, instance.barcode)
+    transaction.on_commit(lambda: invalidate_sku(*key))
 
 
 # -----------------------
-# Low Stock Alert
+# Search Index
 # -----------------------
-from django.db.models import F
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from .models import SKU, Alert
+@receiver(post_save, sender=SKU)
+def reindex_search_terms(sender, instance, update_fields=None, **kwargs):
+    # stock and threshold saves leave the searchable text alone
+    if update_fields is not None and not set(SEARCH_FIELDS) & set(update_fields):
+        return
+    index_skus([instance])
 
 
+# -----------------------
+# Attribute Index
+# -----------------------
 @receiver(post_save, sender=SKU)
-def low_stock_alert(sender, instance, **kwargs):
-    # Ensure stock_level is an int (not CombinedExpression from F())
-    if isinstance(instance.stock_level, F) or not isinstance(instance.stock_level, int):
-        instance.refresh_from_db(fields=["stock_level"])
-
-    if (
-        instance.reorder_threshold is not None
-        and instance.stock_level <= instance.reorder_threshold
-    ):
-        Alert.objects.get_or_create(
-            tenant_id=instance.tenant_id,
-            sku=instance,
-            type=Alert.Type.LOW_STOCK,
-            defaults={
-                "sku_name": instance.name,
-                "current_stock": instance.stock_level,
-                "threshold": instance.reorder_threshold,
-            },
-        )
+def reindex_attributes(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "attributes" not in update_fields:
+        return
+    index_attributes([instance])
+
+
+# -----------------------
+# Cost Layers
+# -----------------------
+@receiver(post_save, sender=Batch)
+@receiver(post_delete, sender=Batch)
+def refresh_cost_layers(sender, instance, **kwargs):
+    # receipts and edits change the weighted-average cost, so the SKU's row
+    # is rebuilt from its batches; plain stock moves only nudge layer_value
+    refresh_valuation([instance.sku_id])
@@ -0,0 +1,389 @@
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.sql import UpdateQuery
+
+from .models import SKU, Batch, LocationStock, SKUValuation, StockAdjustment
+from .alerts import raise_low_stock_alerts
+
+# keeps every grouped UPDATE well below SQLite's bound-parameter limit
+UPDATE_CHUNK_SIZE = 500
+
+
+def _supports_update_returning(connection):
+    if connection.vendor == "postgresql":
+        return True
+    # SQLite understands RETURNING from 3.35, same as for INSERT
+    return (
+        connection.vendor == "sqlite"
+        and connection.features.can_return_columns_from_insert
+    )
+
+
+def increment_returning(model, field_name, deltas, returning=()):
+    """
+    Apply `field_name += delta` to every row in `deltas` ({pk: delta}) with a
+    single grouped `UPDATE ... SET field = field + CASE pk WHEN ... END` per
+    chunk, and return the post-update values as
+    {pk: {field_name: value, <returning>: value, ...}}.
+
+    Uses `UPDATE ... RETURNING` where the backend supports it, otherwise
+    falls back to re-selecting the touched rows inside the same transaction.
+    """
+    if not deltas:
+        return {}
+
+    opts = model._meta
+    field = opts.get_field(field_name)
+    pk_name = opts.pk.attname
+    names = [pk_name, field_name, *returning]
+    columns = [opts.get_field(name).column for name in names]
+
+    db = router.db_for_write(model)
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    use_returning = _supports_update_returning(connection)
+
+    results = {}
+    items = list(deltas.items())
+    for start in range(0, len(items), UPDATE_CHUNK_SIZE):
+        chunk = items[start : start + UPDATE_CHUNK_SIZE]
+        keys = [key for key, _ in chunk]
+
+        query = model._default_manager.using(db).filter(pk__in=keys).query
+        query = query.chain(UpdateQuery)
+        query.add_update_values(
+            {
+                field_name: F(field_name)
+                + Case(
+                    *[
+                        When(pk=key, then=Value(field.to_python(delta)))
+                        for key, delta in chunk
+                    ],
+                    default=Value(field.to_python(0)),
+                    output_field=field,
+                )
+            }
+        )
+        sql, params = query.get_compiler(db).as_sql()
+
+        with connection.cursor() as cursor:
+            if use_returning:
+                sql += " RETURNING " + ", ".join(qn(c) for c in columns)
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            else:
+                cursor.execute(sql, params)
+                rows = (
+                    model._default_manager.using(db)
+                    .filter(pk__in=keys)
+                    .values_list(*names)
+                )
+
+        for row in rows:
+            values = dict(zip(names, row))
+            key = opts.pk.to_python(values.pop(pk_name))
+            results[key] = {
+                name: opts.get_field(name).to_python(value)
+                for name, value in values.items()
+            }
+    return results
+
+
+def layer_value_deltas(batches, batch_deltas):
+    """
+    {sku_id: change in FIFO value on hand} for batch rows returned by
+    increment_returning(..., returning=("sku_id", "cost_price")).
+    """
+    deltas = defaultdict(Decimal)
+    for batch_id, row in batches.items():
+        deltas[row["sku_id"]] += batch_deltas[batch_id] * row["cost_price"]
+    return deltas
+
+
+def location_stock_rows(tenant_id, keys, *, lock=False):
+    """
+    {(sku_id, location_id): LocationStock} for `keys`, creating missing rows
+    at zero with one INSERT ... ON CONFLICT DO NOTHING. With `lock`, the rows
+    are read with SELECT ... FOR UPDATE in primary key order, so concurrent
+    transfers touching the same rows always queue in the same order.
+    """
+    keys = set(keys)
+    LocationStock.objects.bulk_create(
+        [
+            LocationStock(tenant_id=tenant_id, sku_id=sku, location_id=location)
+            for sku, location in keys
+        ],
+        ignore_conflicts=True,
+    )
+    rows = LocationStock.objects.filter(
+        sku_id__in={sku_id for sku_id, _ in keys},
+        location_id__in={location_id for _, location_id in keys},
+    )
+    if lock:
+        rows = rows.select_for_update().order_by("pk")
+    found = {(row.sku_id, row.location_id): row for row in rows}
+    return {key: found[key] for key in keys}
+
+
+def move_location_stock(tenant_id, deltas):
+    """
+    Apply {(sku_id, location_id): delta} to the tenant's LocationStock rows
+    with one grouped UPDATE. Raises InsufficientStock if a decrement would
+    take a location below zero; the check runs after the UPDATE, so the
+    rows are locked and the caller's transaction rolls the write back.
+    """
+    rows = location_stock_rows(tenant_id, deltas)
+    held = increment_returning(
+        LocationStock,
+        "quantity",
+        {rows[key].pk: delta for key, delta in deltas.items()},
+    )
+    for (sku_id, location_id), delta in deltas.items():
+        quantity = held[rows[(sku_id, location_id)].pk]["quantity"]
+        if delta < 0 and quantity < 0:
+            raise InsufficientStock(
+                -delta, quantity - delta, "stock at location", sku_id=sku_id
+            )
+
+
+def bulk_adjust_stock(adjustments, *, user=None):
+    """
+    Apply many stock adjustments in one transaction.
+
+    `adjustments` is a list of dicts with `sku` (SKU), `quantity`, `reason`
+    and optional `batch` (Batch), `location` (Location), `reference` and
+    `note`; callers are responsible for tenant scoping and for checking that
+    batches belong to their SKU. Location-tagged rows also move the SKU's
+    stock at that location, which may not go below zero. Deltas are grouped per SKU/batch and written with one
+    UPDATE ... RETURNING each (plus one for the SKUs' FIFO layer value when
+    batches move), the ledger rows with one bulk insert and low-stock alerts
+    with one set-based pass. SALE rows may only take a SKU's
+    available-to-promise units; otherwise InsufficientStock is raised and
+    nothing is written.
+
+    Returns (stock_levels, adjustments) where stock_levels maps sku_id to
+    the resulting live stock level.
+    """
+    from .shards import pending_deltas
+
+    sku_deltas = defaultdict(int)
+    batch_deltas = defaultdict(int)
+    location_deltas = defaultdict(lambda: defaultdict(int))
+    for row in adjustments:
+        sku = row["sku"]
+        sku_deltas[sku.pk] += row["quantity"]
+        if row.get("location") is not None:
+            location_deltas[sku.tenant_id][(sku.pk, row["location"].pk)] += row[
+                "quantity"
+            ]
+        if row.get("batch") is not None:
+            if not sku.track_batches:
+                raise ValueError("SKU not configured for batch tracking")
+            batch_deltas[row["batch"].pk] += row["quantity"]
+
+    with transaction.atomic():
+        batches = increment_returning(
+            Batch,
+            "remaining_quantity",
+            batch_deltas,
+            returning=("sku_id", "cost_price"),
+        )
+        increment_returning(
+            SKUValuation, "layer_value", layer_value_deltas(batches, batch_deltas)
+        )
+        for tenant_id, deltas in location_deltas.items():
+            move_location_stock(tenant_id, deltas)
+        levels = increment_returning(
+            SKU,
+            "stock_level",
+            sku_deltas,
+            returning=("reorder_threshold", "name", "tenant_id", "reserved_quantity"),
+        )
+        sharded = {row["sku"].pk for row in adjustments if row["sku"].counter_shards}
+        if sharded:
+            # stock_level alone misses the units parked in their shards
+            for sku_id, pending in pending_deltas(sharded).items():
+                levels[sku_id]["stock_level"] += pending
+        sold = {
+            row["sku"].pk
+            for row in adjustments
+            if row["reason"] == StockAdjustment.Reason.SALE
+        }
+        for sku_id in sorted(sold, key=str):
+            check_promised(sku_id, levels[sku_id], sku_deltas[sku_id])
+
+        created = StockAdjustment.objects.bulk_create(
+            [
+                StockAdjustment(
+                    tenant_id=row["sku"].tenant_id,
+                    sku=row["sku"],
+                    quantity=row["quantity"],
+                    reason=row["reason"],
+                    batch=row.get("batch"),
+                    location=row.get("location"),
+                    reference=row.get("reference"),
+                    note=row.get("note"),
+                    created_by=user,
+                )
+                for row in adjustments
+            ]
+        )
+
+        raise_low_stock_alerts(levels)
+
+    return {sku_id: row["stock_level"] for sku_id, row in levels.items()}, created
+
+
+class InsufficientStock(ValueError):
+    """Raised when an allocation or transfer asks for more than is held."""
+
+    def __init__(self, requested, available, source="batch stock", sku_id=None):
+        self.requested = requested
+        self.available = available
+        self.sku_id = sku_id
+        super().__init__(
+            f"Insufficient {source}: requested {requested}, available {available}"
+        )
+
+
+def check_promised(sku_id, row, delta):
+    """
+    Raise InsufficientStock if applying `delta` left the SKU `row` (its
+    post-update stock_level and reserved_quantity) with fewer units than
+    its holds promise. Called after the UPDATE, so the row is locked and
+    the caller's transaction rolls the write back.
+    """
+    available = row["stock_level"] - row["reserved_quantity"]
+    if delta < 0 and available < 0:
+        raise InsufficientStock(
+            -delta, available - delta, "stock to promise", sku_id=sku_id
+        )
+
+
+def fefo_batches(sku):
+    """The SKU's batches that still hold stock, first-expiry-first-out."""
+    return sku.batches.filter(remaining_quantity__gt=0).order_by(
+        F("expiry_date").asc(nulls_last=True),
+        F("received_at").asc(nulls_last=True),
+        "created_at",
+        "batch_id",
+    )
+
+
+def allocate_fefo(sku, quantity, *, reason=StockAdjustment.Reason.SALE, **kwargs):
+    """
+    Consume `quantity` units of a batch-tracked SKU, splitting it across its
+    batches in first-expiry-first-out order.
+
+    The candidate batches are read and row-locked with one SELECT ... FOR
+    UPDATE in FEFO order, so concurrent allocations of the same SKU queue on
+    its batch rows (always locked in the same order) while other SKUs of the
+    tenant are untouched. The decrements are then written through
+    bulk_adjust_stock(): one grouped UPDATE per table and one bulk insert of
+    StockAdjustment rows, one per batch used. Units reserved on a batch are
+    left for their holds. Extra keyword arguments (`user`, `reference`,
+    `note`) are passed on to the ledger rows.
+
+    Returns (stock_level, adjustments).
+    """
+    if not sku.track_batches:
+        raise ValueError("SKU not configured for batch tracking")
+    if quantity <= 0:
+        raise ValueError("Allocation quantity must be positive")
+
+    user = kwargs.pop("user", None)
+    with transaction.atomic():
+        plan = []
+        remaining = quantity
+        for batch in fefo_batches(sku).select_for_update():
+            # units held for reservations are not the allocation's to take
+            take = min(batch.remaining_quantity - batch.reserved_quantity, remaining)
+            if take <= 0:
+                continue
+            batch.remaining_quantity -= take
+            plan.append(
+                dict(kwargs, sku=sku, batch=batch, quantity=-take, reason=reason)
+            )
+            remaining -= take
+            if not remaining:
+                break
+        if remaining:
+            raise InsufficientStock(quantity, quantity - remaining)
+
+        stock_levels, adjustments = bulk_adjust_stock(plan, user=user)
+
+    sku.stock_level = stock_levels[sku.pk]
+    return sku.stock_level, adjustments
+
+
+def transfer_stock(source, destination, lines, *, user=None, reference=None, note=None):
+    """
+    Move stock between two locations of the same tenant.
+
+    `lines` is a list of (sku, quantity) pairs. Every line writes a paired
+    TRANSFER entry to the ledger (-quantity at `source`, +quantity at
+    `destination`) sharing one reference, so SKU.stock_level is unchanged.
+    The whole transfer is one transaction: the location rows are locked
+    with one SELECT ... FOR UPDATE, moved with one grouped UPDATE and logged
+    with one bulk insert. Raises InsufficientStock if `source` holds less
+    than a line asks for.
+
+    Returns the created adjustments.
+    """
+    if source.pk == destination.pk:
+        raise ValueError("Source and destination must differ")
+    if source.tenant_id != destination.tenant_id:
+        raise ValueError("Locations belong to different tenants")
+
+    quantities = defaultdict(int)
+    skus = {}
+    for sku, quantity in lines:
+        if quantity <= 0:
+            raise ValueError("Transfer quantity must be positive")
+        if sku.tenant_id != source.tenant_id:
+            raise ValueError("SKU belongs to a different tenant")
+        quantities[sku.pk] += quantity
+        skus[sku.pk] = sku
+
+    reference = reference or f"transfer-{uuid.uuid4().hex[:12]}"
+    with transaction.atomic():
+        rows = location_stock_rows(
+            source.tenant_id,
+            [
+                (sku_id, location.pk)
+                for sku_id in quantities
+                for location in (source, destination)
+            ],
+            lock=True,
+        )
+        deltas = {}
+        for sku_id, quantity in quantities.items():
+            held = rows[(sku_id, source.pk)]
+            if held.quantity < quantity:
+                raise InsufficientStock(
+                    quantity, held.quantity, "stock at location", sku_id=sku_id
+                )
+            deltas[held.pk] = -quantity
+            deltas[rows[(sku_id, destination.pk)].pk] = quantity
+        increment_returning(LocationStock, "quantity", deltas)
+
+        return StockAdjustment.objects.bulk_create(
+            [
+                StockAdjustment(
+                    tenant_id=source.tenant_id,
+                    sku=skus[sku_id],
+                    quantity=sign * quantity,
+                    reason=StockAdjustment.Reason.TRANSFER,
+                    location=location,
+                    reference=reference,
+                    note=note,
+                    created_by=user,
+                )
+                for sku_id, quantity in quantities.items()
+                for sign, location in ((-1, source), (1, destination))
+            ]
+        )
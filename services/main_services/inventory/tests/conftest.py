@@ -0,0 +1,143 @@
+import pytest
+import uuid
+import numpy as np
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from main_services.inventory.ledger import day_start
+from main_services.inventory.models import SKU, Batch, StockAdjustment
+
+User = get_user_model()
+
+
+# --------------------------
+# Fixtures
+# --------------------------
+@pytest.fixture
+def db_client(db):
+    return APIClient()
+
+
+@pytest.fixture
+def tenant_uuid():
+    return uuid.uuid4()
+
+
+@pytest.fixture
+def auth_client(db_client, tenant_uuid):
+    user = User.objects.create_user(email="test@example.com", password="pass")
+    db_client.force_authenticate(user=user)
+    db_client.credentials(HTTP_X_TENANT_ID=str(tenant_uuid))
+    return db_client
+
+
+@pytest.fixture
+def sku(db, tenant_uuid):
+    return SKU.objects.create(
+        name="TestSKU",
+        tenant_id=tenant_uuid,
+        category="Beverage",
+        stock_level=10,
+        reorder_threshold=5,
+        track_batches=True,
+    )
+
+
+@pytest.fixture
+def another_tenant_sku(db):
+    return SKU.objects.create(
+        name="OtherTenantSKU",
+        tenant_id=uuid.uuid4(),
+        category="Other",
+        stock_level=100,
+    )
+
+
+@pytest.fixture
+def batch(sku):
+    # NOTE: don't set remaining_quantity explicitly — model.save() handles it.
+    return Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="B123",
+        quantity=20,
+        received_at=timezone.now().date(),
+        expiry_date=timezone.now().date() + timedelta(days=25),
+        cost_price=5.0,
+    )
+
+
+# --------------------------
+# Benchmark data generators
+# --------------------------
+def _write_sales_history(skus, rows, *, days=90, today=None, seed=0):
+    """
+    Write `rows` SALE adjustments spread over the `days` days before `today`
+    across `skus`, with per-SKU demand rates so forecasts differ.
+
+    Rows go straight into the table as multi-row INSERTs: bulk_create would
+    stamp every row with `auto_now_add`, and the history has to be spread
+    over past days. Timestamps are drawn at minute resolution so each one
+    is converted for the backend only once.
+    """
+    rng = np.random.default_rng(seed)
+    first = day_start((today or timezone.localdate()) - timedelta(days=days))
+    rates = rng.uniform(1, 10, size=len(skus))
+
+    opts = StockAdjustment._meta
+    pk, tenant, sku_fk, created = (
+        opts.get_field(name)
+        for name in ("adjustment_id", "tenant_id", "sku", "created_at")
+    )
+    columns = ", ".join(
+        connection.ops.quote_name(field.column)
+        for field in (pk, tenant, sku_fk, created)
+    )
+    columns += ", quantity, reason"
+    chunk = 1000
+    table = connection.ops.quote_name(opts.db_table)
+    placeholders = "(%s, %s, %s, %s, %s, %s)"
+
+    keys = [
+        (
+            tenant.get_db_prep_value(sku.tenant_id, connection),
+            sku_fk.get_db_prep_value(sku.pk, connection),
+        )
+        for sku in skus
+    ]
+    minutes = [
+        created.get_db_prep_value(first + timedelta(minutes=m), connection)
+        for m in range(days * 1440)
+    ]
+    picks = rng.integers(0, len(skus), size=rows).tolist()
+    stamps = rng.integers(0, days * 1440, size=rows).tolist()
+    quantities = (-np.maximum(rng.poisson(rates[picks] / 2), 1)).tolist()
+
+    with connection.cursor() as cursor:
+        for start in range(0, rows, chunk):
+            stop = min(start + chunk, rows)
+            params = []
+            for i in range(start, stop):
+                params.extend(
+                    (
+                        pk.get_db_prep_value(uuid.uuid4(), connection),
+                        *keys[picks[i]],
+                        minutes[stamps[i]],
+                        quantities[i],
+                        "sale",
+                    )
+                )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES "
+                + ", ".join([placeholders] * (stop - start)),
+                params,
+            )
+    return rows
+
+
+@pytest.fixture
+def sales_history(db):
+    """Factory: sales_history(skus, rows, days=90, today=None, seed=0)."""
+    return _write_sales_history
@@ -0,0 +1,264 @@
+import time
+
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from main_services.inventory.alerts import (
+    acknowledge_alerts,
+    evaluate_low_stock,
+    low_stock_skus,
+    sweep_expiring_batches,
+)
+from main_services.inventory.models import SKU, Batch, Alert, AlertNotification
+
+
+@pytest.mark.django_db
+def test_low_stock_skus_uses_partial_index(sku):
+    SKU.objects.filter(pk=sku.pk).update(stock_level=2)
+    qs = low_stock_skus(sku.tenant_id)
+    assert list(qs) == [sku]
+    assert "inventory_sku_low_stock_idx" in qs.explain()
+
+
+@pytest.mark.django_db
+def test_evaluate_low_stock_after_bulk_threshold_change(sku, tenant_uuid):
+    # queryset.update() sends no signals, the engine picks the SKU up instead
+    SKU.objects.filter(pk=sku.pk).update(reorder_threshold=50)
+    assert not Alert.objects.filter(type=Alert.Type.LOW_STOCK).exists()
+
+    evaluate_low_stock([sku.pk])
+    evaluate_low_stock([sku.pk])
+    alert = Alert.objects.get(sku=sku, type=Alert.Type.LOW_STOCK)
+    assert alert.current_stock == 10
+    assert alert.threshold == 50
+
+
+@pytest.mark.django_db
+def test_evaluate_low_stock_ignores_healthy_skus(sku):
+    assert evaluate_low_stock([sku.pk]) == []
+
+
+@pytest.mark.django_db
+def test_alert_summary(auth_client, sku, batch, another_tenant_sku):
+    SKU.objects.filter(pk=sku.pk).update(stock_level=1)
+    SKU.objects.filter(pk=another_tenant_sku.pk).update(
+        stock_level=0, reorder_threshold=10
+    )
+    Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="OLD",
+        quantity=3,
+        expiry_date=timezone.now().date() - timedelta(days=1),
+    )
+
+    resp = auth_client.get("/api/inventory/alerts/summary/")
+    assert resp.status_code == 200
+    assert resp.data == {"low_stock": 1, "expiring_batches": 1, "expired_batches": 1}
+
+
+@pytest.mark.django_db
+def test_alert_summary_requires_tenant(db_client, django_user_model):
+    db_client.force_authenticate(
+        django_user_model.objects.create_user(email="x@example.com", password="p")
+    )
+    resp = db_client.get("/api/inventory/alerts/summary/")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_sweep_pages_through_all_tenants(sku, another_tenant_sku):
+    today = timezone.now().date()
+    SKU.objects.filter(pk=another_tenant_sku.pk).update(track_batches=True)
+    for i, target in enumerate([sku, another_tenant_sku] * 3):
+        Batch.objects.create(
+            sku=target,
+            tenant_id=target.tenant_id,
+            batch_number=f"S{i}",
+            quantity=10 + i,
+            expiry_date=today + timedelta(days=i),
+        )
+    # outside the window / already consumed batches are not alerted on
+    Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="LATER",
+        quantity=5,
+        expiry_date=today + timedelta(days=90),
+    )
+    Batch.objects.create(
+        sku=another_tenant_sku,
+        tenant_id=another_tenant_sku.tenant_id,
+        batch_number="EMPTY",
+        quantity=5,
+        expiry_date=today,
+    )
+    Batch.objects.filter(batch_number="EMPTY").update(remaining_quantity=0)
+    Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="LONG-GONE",
+        quantity=5,
+        expiry_date=today - timedelta(days=60),
+    )
+
+    scanned, pages = sweep_expiring_batches(today=today, page_size=2)
+    assert (scanned, pages) == (6, 3)
+
+    alerts = Alert.objects.filter(type=Alert.Type.BATCH_EXPIRY)
+    assert alerts.count() == 2
+    # the soonest-expiring batch is the one recorded
+    assert alerts.get(sku=sku).current_stock == 10
+
+    sweep_expiring_batches(today=today, page_size=2)
+    assert alerts.count() == 2
+
+
+@pytest.mark.django_db
+def test_sweep_does_not_realert_acknowledged_batches(sku, django_user_model):
+    today = timezone.now().date()
+    Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="SOON",
+        quantity=5,
+        expiry_date=today + timedelta(days=3),
+    )
+    sweep_expiring_batches(today=today)
+    alert = Alert.objects.get(type=Alert.Type.BATCH_EXPIRY)
+    alert.acknowledge(
+        django_user_model.objects.create_user(email="x@example.com", password="p")
+    )
+
+    sweep_expiring_batches(today=today)
+    sweep_expiring_batches(today=today + timedelta(days=1))
+    assert list(Alert.objects.filter(type=Alert.Type.BATCH_EXPIRY)) == [alert]
+    assert AlertNotification.objects.filter(alert__type=alert.type).count() == 1
+
+    # a batch entering the window after the acknowledgement alerts again
+    Alert.objects.filter(pk=alert.pk).update(
+        created_at=timezone.now() - timedelta(days=20)
+    )
+    Batch.objects.create(
+        sku=sku,
+        tenant_id=sku.tenant_id,
+        batch_number="NEXT",
+        quantity=5,
+        expiry_date=today + timedelta(days=25),
+    )
+    sweep_expiring_batches(today=today)
+    assert Alert.objects.filter(type=Alert.Type.BATCH_EXPIRY).count() == 2
+
+
+def _open_alerts(tenant_id, n, type=Alert.Type.LOW_STOCK):
+    skus = SKU.objects.bulk_create(
+        [SKU(name=f"A-{i}", tenant_id=tenant_id, stock_level=0) for i in range(n)]
+    )
+    return Alert.objects.bulk_create(
+        [
+            Alert(
+                tenant_id=tenant_id,
+                sku=sku,
+                sku_name=sku.name,
+                current_stock=0,
+                threshold=1,
+                type=type,
+            )
+            for sku in skus
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_acknowledge_by_ids_and_filters(
+    auth_client, tenant_uuid, another_tenant_sku
+):
+    url = "/api/inventory/alerts/bulk-acknowledge/"
+    low = _open_alerts(tenant_uuid, 4)
+    expiring = _open_alerts(tenant_uuid, 2, type=Alert.Type.BATCH_EXPIRY)
+    foreign = _open_alerts(another_tenant_sku.tenant_id, 1)
+
+    ids = [str(alert.pk) for alert in low[:2] + foreign]
+    resp = auth_client.post(url, {"alert_ids": ids}, format="json")
+    assert resp.status_code == 200
+    assert resp.data == {"acknowledged": 2}  # the other tenant's alert is untouched
+    assert Alert.objects.get(pk=foreign[0].pk).acknowledged is False
+
+    # already acknowledged alerts are not counted again
+    resp = auth_client.post(url, {"type": "low_stock"}, format="json")
+    assert resp.data == {"acknowledged": 2}
+
+    resp = auth_client.post(
+        url, {"type": "batch_expiry", "sku": str(expiring[0].sku_id)}, format="json"
+    )
+    assert resp.data == {"acknowledged": 1}
+    acked = Alert.objects.get(pk=expiring[0].pk)
+    assert acked.acknowledged_by.email == "test@example.com"
+    assert acked.acknowledged_at is not None
+
+    later = (timezone.now() + timedelta(minutes=1)).isoformat()
+    resp = auth_client.post(url, {"created_after": later}, format="json")
+    assert resp.data == {"acknowledged": 0}
+    resp = auth_client.post(url, {"created_before": later}, format="json")
+    assert resp.data == {"acknowledged": 1}
+
+
+@pytest.mark.django_db
+def test_bulk_acknowledge_requires_a_selection(auth_client, tenant_uuid):
+    _open_alerts(tenant_uuid, 1)
+    resp = auth_client.post(
+        "/api/inventory/alerts/bulk-acknowledge/", {}, format="json"
+    )
+    assert resp.status_code == 400
+    assert not Alert.objects.filter(acknowledged=True).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_acknowledge_is_one_update(auth_client, tenant_uuid):
+    _open_alerts(tenant_uuid, 200)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = auth_client.post(
+            "/api/inventory/alerts/bulk-acknowledge/",
+            {"type": "low_stock"},
+            format="json",
+        )
+    assert resp.data == {"acknowledged": 200}
+    assert sum(q["sql"].startswith("UPDATE") for q in ctx.captured_queries) == 1
+
+
+def _best_of(rounds, setup, run):
+    """Fastest of `rounds` timed runs, each on a fresh `setup()`."""
+    timings = []
+    for _ in range(rounds):
+        args = setup()
+        started = time.perf_counter()
+        run(args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_bulk_acknowledge_beats_the_per_item_path(tenant_uuid):
+    # both paths are timed without request overhead, best of three, so the
+    # margin measures the UPDATEs rather than the runner's noise
+    n = 2000
+    alerts = Alert.objects.filter(tenant_id=tenant_uuid)
+
+    def fresh():
+        alerts.delete()
+        return _open_alerts(tenant_uuid, n)
+
+    def per_item(opened):
+        for alert in opened:
+            alert.acknowledge(user=None)
+
+    per_item_elapsed = _best_of(3, fresh, per_item)
+    bulk_elapsed = _best_of(3, fresh, lambda _: acknowledge_alerts(alerts, None))
+
+    assert alerts.filter(acknowledged=False).count() == 0
+    assert (
+        bulk_elapsed * 10 < per_item_elapsed
+    ), f"bulk {bulk_elapsed:.3f}s vs per item {per_item_elapsed:.3f}s"
@@ -0,0 +1,105 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from main_services.inventory.models import SKU, Batch, StockAdjustment
+from main_services.inventory.stock import InsufficientStock, allocate_fefo
+
+
+@pytest.fixture
+def fefo_batches(sku):
+    today = timezone.now().date()
+
+    def make(number, quantity, expiry):
+        return Batch.objects.create(
+            sku=sku,
+            tenant_id=sku.tenant_id,
+            batch_number=number,
+            quantity=quantity,
+            expiry_date=expiry,
+        )
+
+    return {
+        "late": make("LATE", 10, today + timedelta(days=60)),
+        "none": make("NONE", 10, None),
+        "soon": make("SOON", 4, today + timedelta(days=5)),
+        "mid": make("MID", 3, today + timedelta(days=20)),
+    }
+
+
+@pytest.mark.django_db
+def test_allocate_splits_first_expiry_first_out(sku, fefo_batches):
+    stock_level, adjustments = allocate_fefo(sku, 9, reference="order-1")
+
+    assert stock_level == 1
+    assert [(a.batch.batch_number, a.quantity) for a in adjustments] == [
+        ("SOON", -4),
+        ("MID", -3),
+        ("LATE", -2),
+    ]
+    assert all(a.reference == "order-1" for a in adjustments)
+    remaining = dict(Batch.objects.values_list("batch_number", "remaining_quantity"))
+    assert remaining == {"SOON": 0, "MID": 0, "LATE": 8, "NONE": 10}
+
+
+@pytest.mark.django_db
+def test_allocate_uses_undated_batches_last(sku, fefo_batches):
+    SKU.objects.filter(pk=sku.pk).update(stock_level=100)
+    allocate_fefo(sku, 20)
+    assert Batch.objects.get(batch_number="NONE").remaining_quantity == 7
+
+
+@pytest.mark.django_db
+def test_allocate_insufficient_stock_changes_nothing(sku, fefo_batches):
+    with pytest.raises(InsufficientStock) as exc:
+        allocate_fefo(sku, 28)
+    assert exc.value.available == 27
+
+    sku.refresh_from_db()
+    assert sku.stock_level == 10
+    assert not StockAdjustment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_allocate_endpoint(auth_client, sku, fefo_batches):
+    url = f"/api/inventory/skus/{sku.sku_id}/allocate/"
+    resp = auth_client.post(url, {"quantity": 5}, format="json")
+    assert resp.status_code == 201
+    assert resp.data["stock_level"] == 5
+    assert [a["reason"] for a in resp.data["adjustments"]] == ["sale", "sale"]
+
+    resp = auth_client.post(url, {"quantity": 500}, format="json")
+    assert resp.status_code == 409
+    assert resp.data["available"] == 22
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="needs row-level locking"
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_allocations_never_oversell(sku, fefo_batches):
+    SKU.objects.filter(pk=sku.pk).update(stock_level=27)
+    results = []
+
+    def worker():
+        try:
+            allocate_fefo(SKU.objects.get(pk=sku.pk), 2)
+            results.append("ok")
+        except InsufficientStock:
+            results.append("short")
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 27 units across the batches: 13 allocations of 2 fit, 7 do not
+    assert results.count("ok") == 13
+    assert results.count("short") == 7
+    assert Batch.objects.filter(remaining_quantity__lt=0).count() == 0
+    assert sum(Batch.objects.values_list("remaining_quantity", flat=True)) == 1
@@ -0,0 +1,142 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from main_services.inventory.barcodes import (
+    BARCODE_CACHE_TTL,
+    BARCODE_LOCAL_CACHE_TTL,
+    cache_stats,
+    entry_ttl,
+    lookup_barcode,
+    reset_cache_stats,
+)
+from main_services.inventory.importer import import_skus
+from main_services.inventory.models import SKU
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def scanned(sku):
+    SKU.objects.filter(pk=sku.pk).update(barcode="5000112637922", sku_code="COKE")
+    sku.refresh_from_db()
+    return sku
+
+
+@pytest.mark.django_db
+def test_lookup_is_served_from_cache(scanned, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        first = lookup_barcode(scanned.tenant_id, "5000112637922")
+    with django_assert_num_queries(0):
+        second = lookup_barcode(scanned.tenant_id, "5000112637922")
+
+    assert first == second
+    assert first["sku_id"] == str(scanned.sku_id)
+    assert "stock_level" not in first
+    assert cache_stats(scanned.tenant_id) == {
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+    }
+
+
+@pytest.mark.django_db
+def test_lookup_is_tenant_scoped(scanned, another_tenant_sku):
+    assert lookup_barcode(another_tenant_sku.tenant_id, "5000112637922") is None
+    assert lookup_barcode(scanned.tenant_id, "5000112637922") is not None
+    assert cache_stats(another_tenant_sku.tenant_id)["misses"] == 1
+    assert cache_stats(scanned.tenant_id)["misses"] == 1
+
+    reset_cache_stats(scanned.tenant_id)
+    assert cache_stats(scanned.tenant_id)["hit_ratio"] is None
+    assert cache_stats(another_tenant_sku.tenant_id)["misses"] == 1
+
+
+def test_entries_are_short_lived_without_a_shared_cache():
+    assert entry_ttl() == BARCODE_LOCAL_CACHE_TTL
+    with override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    ):
+        assert entry_ttl() == BARCODE_CACHE_TTL
+
+
+@pytest.mark.django_db
+def test_save_invalidates_old_and_new_barcode(
+    scanned, django_capture_on_commit_callbacks
+):
+    lookup_barcode(scanned.tenant_id, "5000112637922")
+    scanned.name = "Renamed"
+    scanned.barcode = "111"
+    with django_capture_on_commit_callbacks(execute=True):
+        scanned.save()
+        # a lookup before the commit still sees, and caches, the old row
+        assert lookup_barcode(scanned.tenant_id, "5000112637922") is not None
+
+    assert lookup_barcode(scanned.tenant_id, "5000112637922") is None
+    assert lookup_barcode(scanned.tenant_id, "111")["name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_delete_and_negative_cache(scanned, django_capture_on_commit_callbacks):
+    assert lookup_barcode(scanned.tenant_id, "nope") is None
+    lookup_barcode(scanned.tenant_id, "5000112637922")
+    with django_capture_on_commit_callbacks(execute=True):
+        scanned.delete()
+    assert lookup_barcode(scanned.tenant_id, "5000112637922") is None
+
+
+@pytest.mark.django_db
+def test_import_invalidates_tenant(scanned, django_capture_on_commit_callbacks):
+    lookup_barcode(scanned.tenant_id, "5000112637922")
+    with django_capture_on_commit_callbacks(execute=True):
+        import_skus(
+            scanned.tenant_id,
+            [{"sku_code": "COKE", "name": "Imported", "category": "Beverage"}],
+        )
+    assert lookup_barcode(scanned.tenant_id, "5000112637922")["name"] == "Imported"
+
+
+@pytest.mark.django_db
+def test_evicted_version_does_not_revive_old_entries(scanned):
+    lookup_barcode(scanned.tenant_id, "5000112637922")
+    SKU.objects.filter(pk=scanned.pk).update(name="Renamed")
+    # LocMemCache culling can drop the version key like any other entry
+    cache.delete(f"inventory:barcode:{scanned.tenant_id}:version")
+    assert lookup_barcode(scanned.tenant_id, "5000112637922")["name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_by_barcode_endpoint(auth_client, scanned):
+    resp = auth_client.get("/api/inventory/skus/by-barcode/5000112637922/")
+    assert resp.status_code == 200
+    assert resp.data["sku_code"] == "COKE"
+
+    resp = auth_client.get("/api/inventory/skus/by-barcode/000/")
+    assert resp.status_code == 404
+
+    stats = auth_client.get("/api/inventory/skus/barcode-cache-stats/").data
+    assert stats["misses"] == 2
+
+    auth_client.credentials()  # no X-Tenant-ID
+    resp = auth_client.get("/api/inventory/skus/barcode-cache-stats/")
+    assert resp.status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_warm_cache_latency(scanned):
+    lookup_barcode(scanned.tenant_id, "5000112637922")
+    samples = []
+    for _ in range(2000):
+        started = time.perf_counter()
+        lookup_barcode(scanned.tenant_id, "5000112637922")
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99)]
+    assert p99 < 0.005, f"p99={p99 * 1000:.2f}ms"
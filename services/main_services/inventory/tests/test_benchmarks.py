@@ -0,0 +1,237 @@
+"""
+Query-count and latency budgets for the hot inventory endpoints.
+
+Each scale seeds a tenant with that many SKUs (plus batches and alerts,
+and a neighbouring tenant a tenth the size) and replays the SKU list,
+adjust_stock, nested batch list and alert filter requests against it.
+Queries per request and p50/p95 latency are compared with the recorded
+baseline for the database vendor in benchmark_baseline.json:
+
+- a request may not issue more queries than its baseline;
+- its p95 may not exceed LATENCY_TOLERANCE times the baseline p95 (plus
+  LATENCY_SLACK_MS, so millisecond-scale baselines do not flap).
+
+The query budgets alone are also checked on a small tenant in the default
+suite; the latency budgets only run under the benchmark marker. Only the
+10k scale runs by default. Select others with
+INVENTORY_BENCH_SCALES=10k,100k,1m and re-record the baseline after an
+intended change, or for a new vendor, with INVENTORY_BENCH_RECORD=1.
+"""
+
+import gc
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from main_services.inventory.models import SKU, Alert, Batch
+
+BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+REPEAT = 30
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK_MS = 5.0
+SEED_CHUNK_SIZE = 5000
+# every 10th SKU tracks batches and has an alert
+SPARSE = 10
+HOT_SKU_BATCHES = 60
+
+
+def _selected_scales():
+    return os.environ.get("INVENTORY_BENCH_SCALES", "10k").split(",")
+
+
+def _seed_tenant(tenant_id, rows):
+    """`rows` SKUs in 20 categories; every SPARSE-th with 2 batches and an alert."""
+    today = timezone.now().date()
+    skus = []
+    for start in range(0, rows, SEED_CHUNK_SIZE):
+        chunk = SKU.objects.bulk_create(
+            [
+                SKU(
+                    tenant_id=tenant_id,
+                    name=f"Bench {i}",
+                    sku_code=f"B-{i}",
+                    category=f"C{i % 20}",
+                    stock_level=1_000_000,
+                    reorder_threshold=10,
+                    track_batches=i % SPARSE == 0,
+                )
+                for i in range(start, min(start + SEED_CHUNK_SIZE, rows))
+            ]
+        )
+        sparse = [sku for sku in chunk if sku.track_batches]
+        Batch.objects.bulk_create(
+            [
+                Batch(
+                    tenant_id=tenant_id,
+                    sku=sku,
+                    batch_number=f"L{n}",
+                    quantity=100,
+                    remaining_quantity=100,
+                    expiry_date=today + timedelta(days=30 * (n + 1)),
+                    cost_price=5,
+                )
+                for sku in sparse
+                for n in range(2)
+            ]
+        )
+        Alert.objects.bulk_create(
+            [
+                Alert(
+                    tenant_id=tenant_id,
+                    sku=sku,
+                    sku_name=sku.name,
+                    current_stock=3,
+                    threshold=10,
+                    type=Alert.Type.LOW_STOCK if n % 2 else Alert.Type.BATCH_EXPIRY,
+                    acknowledged=n % 4 == 0,
+                )
+                for n, sku in enumerate(sparse)
+            ]
+        )
+        skus.extend(chunk)
+    return skus
+
+
+def _measure(request, repeat=REPEAT):
+    """Replay `request(i)` and return its query count and p50/p95 in ms."""
+    request(repeat)  # warm-up: first-call compilation is not the budget
+    queries, timings = 0, []
+    # as timeit does: a collector pause would land on a random request
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                resp = request(i)
+                timings.append(time.perf_counter() - started)
+            assert resp.status_code in (200, 201), resp.data
+            queries = max(queries, len(ctx.captured_queries))
+    finally:
+        gc.enable()
+    cuts = statistics.quantiles(timings, n=20)
+    return {
+        "queries": queries,
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(cuts[-1] * 1000, 2),
+    }
+
+
+def _over_budget(name, measured, budget):
+    if budget is None:
+        return [f"{name}: no baseline; record one with INVENTORY_BENCH_RECORD=1"]
+    over = []
+    if measured["queries"] > budget["queries"]:
+        over.append(
+            f"{name}: {measured['queries']} queries, budget {budget['queries']}"
+        )
+    ceiling = budget["p95_ms"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+    if measured["p95_ms"] > ceiling:
+        over.append(f"{name}: p95 {measured['p95_ms']} ms, budget {ceiling:.1f} ms")
+    return over
+
+
+def _requests(auth_client, tenant_id, rows):
+    """Seed the tenant and its neighbour; {name: request(i)} to replay."""
+    skus = _seed_tenant(tenant_id, rows)
+    _seed_tenant(uuid.uuid4(), rows // SPARSE)
+
+    hot = skus[0]
+    Batch.objects.bulk_create(
+        [
+            Batch(
+                tenant_id=tenant_id,
+                sku=hot,
+                batch_number=f"H{n}",
+                quantity=10,
+                remaining_quantity=10,
+                cost_price=5,
+            )
+            for n in range(HOT_SKU_BATCHES)
+        ]
+    )
+    # spread the writes so no single row gets hot
+    targets = skus[1 :: max(1, rows // (REPEAT + 1))]
+
+    return {
+        "sku_list": lambda i: auth_client.get("/api/inventory/skus/"),
+        "sku_list_by_category": lambda i: auth_client.get(
+            "/api/inventory/skus/", {"category": f"C{i % 20}", "page": 2}
+        ),
+        "adjust_stock": lambda i: auth_client.post(
+            f"/api/inventory/skus/{targets[i].pk}/adjust_stock/",
+            {"quantity": -1, "reason": "sale"},
+            format="json",
+        ),
+        "sku_batches": lambda i: auth_client.get(
+            f"/api/inventory/skus/{hot.pk}/batches/"
+        ),
+        "alerts_by_type": lambda i: auth_client.get(
+            "/api/inventory/alerts/", {"type": "low_stock", "acknowledged": "false"}
+        ),
+        "alerts_by_sku": lambda i: auth_client.get(
+            "/api/inventory/alerts/", {"sku": str(skus[SPARSE * (i + 1)].pk)}
+        ),
+    }
+
+
+def _recorded():
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    return baseline, baseline.setdefault(connection.vendor, {})
+
+
+@pytest.mark.django_db
+def test_inventory_request_query_budgets(auth_client, tenant_uuid):
+    # the query counts do not depend on the scale, so the default suite
+    # holds every request to its 10k budget on a small tenant
+    _, recorded = _recorded()
+    if "10k" not in recorded:
+        pytest.skip(f"no {connection.vendor} baseline yet")
+    requests = _requests(auth_client, tenant_uuid, 1000)
+
+    over = []
+    for name, request in requests.items():
+        for i in range(3):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = request(i)
+            assert resp.status_code in (200, 201), resp.data
+            budget = recorded["10k"][name]["queries"]
+            if len(ctx.captured_queries) > budget:
+                over.append(
+                    f"{name}: {len(ctx.captured_queries)} queries, budget {budget}"
+                )
+    assert not over, "\n".join(over)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize("scale", list(SCALES))
+def test_inventory_request_budgets(scale, auth_client, tenant_uuid):
+    if scale not in _selected_scales():
+        pytest.skip(f"set INVENTORY_BENCH_SCALES to include {scale}")
+    requests = _requests(auth_client, tenant_uuid, SCALES[scale])
+    measured = {name: _measure(request) for name, request in requests.items()}
+
+    baseline, recorded = _recorded()
+    if os.environ.get("INVENTORY_BENCH_RECORD"):
+        recorded[scale] = measured
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        return
+    if scale not in recorded:
+        pytest.skip(f"no {connection.vendor} baseline for {scale} yet")
+
+    over = [
+        message
+        for name, result in measured.items()
+        for message in _over_budget(name, result, recorded[scale].get(name))
+    ]
+    assert not over, "\n".join(over)
@@ -0,0 +1,221 @@
+import time
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from main_services.inventory.models import SKU, Batch, StockAdjustment, Alert
+
+URL = "/api/inventory/skus/bulk-adjust/"
+
+
+@pytest.fixture
+def skus(tenant_uuid):
+    return [
+        SKU.objects.create(
+            name=f"SKU-{i}",
+            tenant_id=tenant_uuid,
+            category="Beverage",
+            stock_level=100,
+            reorder_threshold=10,
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_groups_deltas_per_sku(auth_client, skus):
+    payload = {
+        "adjustments": [
+            {"sku_id": str(skus[0].sku_id), "quantity": -5, "reason": "sale"},
+            {"sku_id": str(skus[0].sku_id), "quantity": -10, "reason": "sale"},
+            {"sku_id": str(skus[1].sku_id), "quantity": 20, "reason": "purchase"},
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 201
+    assert resp.data["count"] == 3
+    assert resp.data["stock_levels"][str(skus[0].sku_id)] == 85
+    assert resp.data["stock_levels"][str(skus[1].sku_id)] == 120
+
+    skus[0].refresh_from_db()
+    skus[2].refresh_from_db()
+    assert skus[0].stock_level == 85
+    assert skus[2].stock_level == 100
+    assert StockAdjustment.objects.filter(sku=skus[0]).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_updates_batches(auth_client, sku, batch):
+    payload = {
+        "adjustments": [
+            {
+                "sku_id": str(sku.sku_id),
+                "batch_id": str(batch.batch_id),
+                "quantity": -3,
+                "reason": "sale",
+            },
+            {
+                "sku_id": str(sku.sku_id),
+                "batch_id": str(batch.batch_id),
+                "quantity": -2,
+                "reason": "sale",
+            },
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 201
+    batch.refresh_from_db()
+    assert batch.remaining_quantity == 15
+    assert StockAdjustment.objects.filter(batch=batch).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_raises_low_stock_alert_once(auth_client, skus):
+    payload = {
+        "adjustments": [
+            {"sku_id": str(skus[0].sku_id), "quantity": -50, "reason": "sale"},
+            {"sku_id": str(skus[0].sku_id), "quantity": -45, "reason": "sale"},
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 201
+
+    alerts = Alert.objects.filter(sku=skus[0], type=Alert.Type.LOW_STOCK)
+    assert alerts.count() == 1
+    assert alerts.get().current_stock == 5
+
+    # a second low-stock batch does not duplicate the alert
+    auth_client.post(URL, payload, format="json")
+    assert alerts.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_is_all_or_nothing(auth_client, skus, another_tenant_sku):
+    payload = {
+        "adjustments": [
+            {"sku_id": str(skus[0].sku_id), "quantity": -5, "reason": "sale"},
+            {
+                "sku_id": str(another_tenant_sku.sku_id),
+                "quantity": -5,
+                "reason": "sale",
+            },
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 400
+    assert 1 in resp.data["adjustments"]
+
+    skus[0].refresh_from_db()
+    assert skus[0].stock_level == 100
+    assert not StockAdjustment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_rejects_foreign_batch(auth_client, sku, skus):
+    other = Batch.objects.create(
+        sku=skus[0], tenant_id=skus[0].tenant_id, batch_number="X1", quantity=5
+    )
+    payload = {
+        "adjustments": [
+            {
+                "sku_id": str(sku.sku_id),
+                "batch_id": str(other.batch_id),
+                "quantity": -1,
+                "reason": "sale",
+            }
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 400
+    assert "batch_id" in resp.data["adjustments"][0]
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_requires_tenant(auth_client, another_tenant_sku):
+    auth_client.credentials()
+    payload = {
+        "adjustments": [
+            {
+                "sku_id": str(another_tenant_sku.sku_id),
+                "quantity": -5,
+                "reason": "sale",
+            }
+        ]
+    }
+    resp = auth_client.post(URL, payload, format="json")
+    assert resp.status_code == 400
+
+    another_tenant_sku.refresh_from_db()
+    assert another_tenant_sku.stock_level == 100
+    assert not StockAdjustment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_adjust_queries_do_not_grow_with_rows(auth_client, tenant_uuid):
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(name=f"Q-{i}", tenant_id=tenant_uuid, category="Q", stock_level=1000)
+            for i in range(50)
+        ]
+    )
+
+    def queries(n):
+        rows = [
+            {
+                "sku_id": str(skus[i % len(skus)].sku_id),
+                "quantity": -1,
+                "reason": "sale",
+            }
+            for i in range(n)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = auth_client.post(URL, {"adjustments": rows}, format="json")
+        assert resp.status_code == 201
+        return len(ctx.captured_queries)
+
+    assert queries(5) == queries(50)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_bulk_adjust_throughput_vs_individual_calls(auth_client, tenant_uuid):
+    n = 500
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(
+                name=f"Bench-{i}",
+                tenant_id=tenant_uuid,
+                category="Bench",
+                stock_level=1000,
+                reorder_threshold=5,
+            )
+            for i in range(50)
+        ]
+    )
+    rows = [
+        {
+            "sku_id": str(skus[i % len(skus)].sku_id),
+            "quantity": -1,
+            "reason": "sale",
+            "reference": str(uuid.uuid4()),
+        }
+        for i in range(n)
+    ]
+
+    started = time.perf_counter()
+    for row in rows:
+        resp = auth_client.post(
+            f"/api/inventory/skus/{row['sku_id']}/adjust_stock/", row, format="json"
+        )
+        assert resp.status_code == 201
+    individual = time.perf_counter() - started
+
+    started = time.perf_counter()
+    resp = auth_client.post(URL, {"adjustments": rows}, format="json")
+    bulk = time.perf_counter() - started
+    assert resp.status_code == 201
+
+    assert StockAdjustment.objects.count() == 2 * n
+    assert SKU.objects.get(pk=skus[0].pk).stock_level == 1000 - 2 * (n // len(skus))
+    assert individual / bulk >= 10, f"individual={individual:.3f}s bulk={bulk:.3f}s"
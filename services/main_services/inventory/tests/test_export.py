@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import time
+
+import pytest
+from main_services.inventory.models import SKU, Alert
+
+
+def content(resp):
+    return b"".join(resp.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_sku_csv_export_is_tenant_scoped(auth_client, sku, another_tenant_sku):
+    SKU.objects.filter(pk=sku.pk).update(attributes={"size": "1L"})
+    resp = auth_client.get("/api/inventory/skus/export/", HTTP_ACCEPT="text/csv")
+    assert resp.status_code == 200
+    assert resp.streaming
+    assert resp["Content-Type"] == "text/csv"
+    assert 'filename="skus.csv"' in resp["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(content(resp))))
+    assert len(rows) == 1
+    assert rows[0]["sku_id"] == str(sku.sku_id)
+    assert rows[0]["stock_level"] == "10"
+    assert json.loads(rows[0]["attributes"]) == {"size": "1L"}
+    assert rows[0]["sku_code"] == ""
+
+
+@pytest.mark.django_db
+def test_adjustment_ndjson_export_honours_filters(auth_client, sku, tenant_uuid):
+    other = SKU.objects.create(name="Other", tenant_id=tenant_uuid, category="X")
+    sku.adjust_stock(delta=3, reason="purchase")
+    sku.adjust_stock(delta=-1, reason="sale")
+    other.adjust_stock(delta=7, reason="purchase")
+
+    resp = auth_client.get(
+        "/api/inventory/stock-adjustments/export/",
+        {"output": "ndjson", "sku": str(sku.sku_id)},
+    )
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in content(resp).splitlines()]
+    assert [line["quantity"] for line in lines] == [3, -1]
+    assert lines[0]["sku_id"] == str(sku.sku_id)
+
+
+@pytest.mark.django_db
+def test_alert_export_and_bad_format(auth_client, sku):
+    sku.adjust_stock(delta=-8, reason="sale")
+    resp = auth_client.get("/api/inventory/alerts/export/", {"type": "low_stock"})
+    rows = list(csv.DictReader(io.StringIO(content(resp))))
+    assert [row["type"] for row in rows] == [Alert.Type.LOW_STOCK]
+
+    resp = auth_client.get("/api/inventory/alerts/export/", {"output": "xml"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("listing", ["skus", "alerts", "stock-adjustments"])
+def test_export_requires_tenant(db_client, sku, listing):
+    sku.adjust_stock(delta=-8, reason="sale")
+    resp = db_client.get(f"/api/inventory/{listing}/export/")
+    assert resp.status_code == 400
+    assert resp.data["detail"] == "X-Tenant-ID header required"
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_export_throughput(auth_client, tenant_uuid):
+    n = 20000
+    SKU.objects.bulk_create(
+        [
+            SKU(name=f"Bulk-{i}", tenant_id=tenant_uuid, category="Bulk")
+            for i in range(n)
+        ],
+        batch_size=2000,
+    )
+    started = time.perf_counter()
+    resp = auth_client.get("/api/inventory/skus/export/")
+    lines = content(resp).count("\n")
+    elapsed = time.perf_counter() - started
+
+    assert lines == n + 1
+    assert n / elapsed >= 10000, f"{n / elapsed:.0f} rows/s"
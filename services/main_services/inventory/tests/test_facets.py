@@ -0,0 +1,186 @@
+import random
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from main_services.inventory.facets import (
+    attribute_pairs,
+    facet_counts,
+    filter_by_attributes,
+    index_attributes,
+)
+from main_services.inventory.importer import import_skus
+from main_services.inventory.models import SKU, SKUAttribute
+
+URL = "/api/inventory/skus/facets/"
+
+
+@pytest.fixture
+def shirts(tenant_uuid, another_tenant_sku):
+    rows = [
+        ("Tee red M", "Shirts", {"color": "red", "size": "M"}),
+        ("Tee red L", "Shirts", {"color": "red", "size": "L"}),
+        ("Tee blue M", "Shirts", {"color": "blue", "size": "M"}),
+        ("Polo red M", "Shirts", {"color": "red", "size": "M", "tags": ["sale"]}),
+        ("Cap red", "Hats", {"color": "red"}),
+    ]
+    for name, category, attributes in rows:
+        SKU.objects.create(
+            tenant_id=tenant_uuid, name=name, category=category, attributes=attributes
+        )
+    another_tenant_sku.attributes = {"color": "red", "size": "M"}
+    another_tenant_sku.save()
+
+
+def _names(resp):
+    return [sku["name"] for sku in resp.data["results"]]
+
+
+def test_attribute_pairs_flatten_nested_values():
+    pairs = attribute_pairs(
+        {
+            "color": " Red ",
+            "tags": ["sale", "new", None],
+            "dims": {"width": 10, "depth": 2.5},
+            "organic": False,
+            "notes": "x" * 200,
+            "empty": "",
+        }
+    )
+    assert pairs == {
+        ("color", "Red"),
+        ("tags", "sale"),
+        ("tags", "new"),
+        ("dims.width", "10"),
+        ("dims.depth", "2.5"),
+        ("organic", "false"),
+    }
+    assert attribute_pairs(["not", "a", "dict"]) == set()
+
+
+@pytest.mark.django_db
+def test_index_follows_saves_and_imports(tenant_uuid):
+    sku = SKU.objects.create(
+        tenant_id=tenant_uuid, name="Tee", category="Shirts", attributes={"size": "M"}
+    )
+    assert set(sku.attribute_index.values_list("key", "value")) == {("size", "M")}
+
+    sku.attributes = {"size": "L", "color": "red"}
+    sku.save()
+    assert set(sku.attribute_index.values_list("key", "value")) == {
+        ("size", "L"),
+        ("color", "red"),
+    }
+
+    # stock-only saves leave the index alone
+    with CaptureQueriesContext(connection) as ctx:
+        sku.save(update_fields=["stock_level"])
+    assert not [q for q in ctx.captured_queries if "skuattribute" in q["sql"]]
+
+    import_skus(
+        tenant_uuid,
+        [
+            {"sku_code": "T-1", "name": "Tee", "category": "Shirts"},
+            {
+                "sku_code": "T-2",
+                "name": "Tee",
+                "category": "Shirts",
+                "attributes": '{"size": "S"}',
+            },
+        ],
+    )
+    imported = SKU.objects.get(sku_code="T-2")
+    assert list(imported.attribute_index.values_list("key", "value")) == [("size", "S")]
+
+    SKUAttribute.objects.all().delete()
+    call_command("rebuild_attribute_index", "--tenant", str(tenant_uuid))
+    assert SKUAttribute.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_filters_and_disjunctive_counts(shirts, tenant_uuid):
+    skus = SKU.objects.filter(tenant_id=tenant_uuid, category="Shirts")
+    filters = {"color": ["red"], "size": ["M", "S"]}
+    assert sorted(
+        filter_by_attributes(skus, filters).values_list("name", flat=True)
+    ) == ["Polo red M", "Tee red M"]
+
+    facets = facet_counts(skus, filters)
+    # each filtered key is counted under the other keys' filters only
+    assert facets["color"] == {"red": 2, "blue": 1}
+    assert facets["size"] == {"M": 2, "L": 1}
+    assert facets["tags"] == {"sale": 1}
+
+    assert facet_counts(skus, {}, keys=["size"], size=1) == {"size": {"M": 3}}
+
+
+@pytest.mark.django_db
+def test_facets_endpoint(auth_client, shirts):
+    resp = auth_client.get(URL, {"category": "Shirts", "attr": ["color:red", "size:M"]})
+    assert resp.status_code == 200
+    assert _names(resp) == ["Polo red M", "Tee red M"]
+    assert resp.data["count"] == 2
+    assert resp.data["facets"]["size"] == {"M": 2, "L": 1}
+    assert resp.data["facets"]["color"] == {"red": 2, "blue": 1}
+
+    # the other tenant's identical SKU is never counted
+    resp = auth_client.get(URL, {"attr": "color:red", "facets": "color"})
+    assert resp.data["count"] == 4
+    assert resp.data["facets"] == {"color": {"red": 4, "blue": 1}}
+
+    assert auth_client.get(URL, {"attr": "color"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_facets_endpoint_query_count(auth_client, shirts):
+    # page count, page rows, facet counts; independent of filters given
+    with CaptureQueriesContext(connection) as ctx:
+        auth_client.get(
+            URL, {"category": "Shirts", "attr": ["color:red", "size:M", "tags:sale"]}
+        )
+    statements = [q for q in ctx.captured_queries if "inventory_" in q["sql"]]
+    assert len(statements) == 3
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_faceted_filter_latency(tenant_uuid):
+    rng = random.Random(3)
+    colors = ["red", "blue", "green", "black", "white"]
+    sizes = ["XS", "S", "M", "L", "XL"]
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(
+                tenant_id=tenant_uuid,
+                name=f"F-{i}",
+                category=f"C{i % 20}",
+                attributes={
+                    "color": rng.choice(colors),
+                    "size": rng.choice(sizes),
+                    "material": rng.choice(["cotton", "wool", "linen"]),
+                },
+            )
+            for i in range(50_000)
+        ],
+        batch_size=5000,
+    )
+    index_attributes(skus)
+
+    # work follows the 2,500 SKUs of the category, not the 50k of the tenant
+    skus = SKU.objects.filter(tenant_id=tenant_uuid, category="C7")
+    filters = {"color": ["red", "blue"], "size": ["M"]}
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        list(filter_by_attributes(skus, filters)[:50])
+        facets = facet_counts(skus, filters)
+        timings.append(time.perf_counter() - started)
+
+    assert sum(facets["size"].values()) == sum(
+        1 for sku in skus if sku.attributes["color"] in ("red", "blue")
+    )
+    timings.sort()
+    median = timings[len(timings) // 2]
+    assert median < 0.100, f"median {median * 1000:.1f} ms"
@@ -0,0 +1,138 @@
+import json
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from main_services.inventory.importer import import_skus, read_rows
+from main_services.inventory.models import SKU, Alert
+
+URL = "/api/inventory/skus/import/"
+
+CSV = (
+    "sku_code,name,category,price,stock_level,reorder_threshold,attributes\n"
+    'C-1,Cola,Drinks,1.50,3,5,"{""size"": ""1L""}"\n'
+    "C-2,Crisps,Snacks,0.99,40,,\n"
+    "C-3,,Snacks,abc,1,,\n"
+)
+
+
+@pytest.mark.django_db
+def test_csv_import_upserts_and_reports_errors(auth_client, tenant_uuid):
+    upload = SimpleUploadedFile("skus.csv", CSV.encode(), content_type="text/csv")
+    resp = auth_client.post(URL, {"file": upload}, format="multipart")
+    assert resp.status_code == 200
+    assert resp.data["imported"] == 2
+    assert resp.data["low_stock"] == 1
+    assert resp.data["errors"] == [
+        {
+            "row": 3,
+            "errors": {
+                "price": ["“abc” value must be a decimal number."],
+                "name": ["This field is required."],
+            },
+        }
+    ]
+
+    cola = SKU.objects.get(tenant_id=tenant_uuid, sku_code="C-1")
+    assert cola.attributes == {"size": "1L"}
+    assert cola.stock_level == 3
+    assert Alert.objects.filter(sku=cola, type=Alert.Type.LOW_STOCK).count() == 1
+
+
+@pytest.mark.django_db
+def test_ndjson_import_updates_existing_without_touching_stock(tenant_uuid):
+    existing = SKU.objects.create(
+        tenant_id=tenant_uuid,
+        sku_code="N-1",
+        name="Old name",
+        category="Old",
+        barcode="123",
+        stock_level=50,
+    )
+    lines = [
+        {"sku_code": "N-1", "name": "New name", "category": "New", "stock_level": 1},
+        {"sku_code": "N-2", "name": "Fresh", "category": "New", "track_batches": True},
+        {"sku_code": "N-2", "name": "Fresher", "category": "New"},
+    ]
+    body = "".join(json.dumps(line) + "\n" for line in lines) + "nope\n"
+    stream = BytesIO(body.encode())
+    report = import_skus(tenant_uuid, read_rows(stream, "ndjson"), chunk_size=2)
+
+    assert report["imported"] == 3
+    assert report["errors"] == [
+        {"row": 4, "errors": {"non_field_errors": ["Not a valid record."]}}
+    ]
+    existing.refresh_from_db()
+    assert (existing.name, existing.category, existing.barcode) == (
+        "New name",
+        "New",
+        "123",
+    )
+    assert existing.stock_level == 50
+    assert SKU.objects.get(sku_code="N-2").name == "Fresher"
+
+
+@pytest.mark.django_db
+def test_import_is_tenant_scoped(tenant_uuid, another_tenant_sku):
+    SKU.objects.filter(pk=another_tenant_sku.pk).update(sku_code="SHARED")
+    import_skus(tenant_uuid, [{"sku_code": "SHARED", "name": "Mine", "category": "A"}])
+    another_tenant_sku.refresh_from_db()
+    assert another_tenant_sku.name == "OtherTenantSKU"
+    assert SKU.objects.filter(sku_code="SHARED").count() == 2
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path, tenant_uuid):
+    path = tmp_path / "skus.csv"
+    path.write_text(CSV)
+    out, err = StringIO(), StringIO()
+    call_command(
+        "import_skus", str(path), "--tenant", str(tenant_uuid), stdout=out, stderr=err
+    )
+    assert "Imported 2 SKU(s), 1 row(s) rejected" in out.getvalue()
+    assert '"row": 3' in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_duplicate_sku_code_rejected_by_api(auth_client, sku):
+    SKU.objects.filter(pk=sku.pk).update(sku_code="DUP")
+    resp = auth_client.post(
+        "/api/inventory/skus/",
+        {"name": "Again", "category": "Beverage", "sku_code": "DUP"},
+        format="json",
+    )
+    assert resp.status_code == 400
+    assert "sku_code" in resp.data
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_import_throughput_vs_per_row_api(auth_client, tenant_uuid):
+    def row(i):
+        return {
+            "sku_code": f"B-{i}",
+            "name": f"Bench {i}",
+            "category": "Bench",
+            "price": "2.50",
+            "reorder_threshold": "5",
+        }
+
+    sample = 200
+    started = time.perf_counter()
+    for i in range(sample):
+        resp = auth_client.post("/api/inventory/skus/", row(i), format="json")
+        assert resp.status_code == 201
+    per_row_rate = sample / (time.perf_counter() - started)
+
+    n = 10000
+    rows = [row(i) for i in range(sample, sample + n)]
+    started = time.perf_counter()
+    report = import_skus(tenant_uuid, rows)
+    import_rate = n / (time.perf_counter() - started)
+
+    assert report["imported"] == n
+    assert import_rate >= 10 * per_row_rate, (
+        f"import {import_rate:.0f} rows/s, per-row API {per_row_rate:.0f} rows/s"
+    )
@@ -1,69 +1,21 @@
 import pytest
-import uuid
-from datetime import timedelta
-from django.utils import timezone
-from rest_framework.test import APIClient
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from main_services.inventory.models import SKU, Batch, StockAdjustment, Alert
 
 User = get_user_model()
 
 
-# --------------------------
-# Fixtures
-# --------------------------
-@pytest.fixture
-def db_client(db):
-    return APIClient()
-
-
-@pytest.fixture
-def tenant_uuid():
-    return uuid.uuid4()
-
-
-@pytest.fixture
-def auth_client(db_client, tenant_uuid):
-    user = User.objects.create_user(email="test@example.com", password="pass")
-    db_client.force_authenticate(user=user)
-    db_client.credentials(HTTP_X_TENANT_ID=str(tenant_uuid))
-    return db_client
-
-
-@pytest.fixture
-def sku(db, tenant_uuid):
-    return SKU.objects.create(
-        name="TestSKU",
-        tenant_id=tenant_uuid,
-        category="Beverage",
-        stock_level=10,
-        reorder_threshold=5,
-        track_batches=True,
-    )
-
-
-@pytest.fixture
-def another_tenant_sku(db):
-    return SKU.objects.create(
-        name="OtherTenantSKU",
-        tenant_id=uuid.uuid4(),
-        category="Other",
-        stock_level=100,
-    )
-
-
-@pytest.fixture
-def batch(sku):
-    # NOTE: don't set remaining_quantity explicitly — model.save() handles it.
-    return Batch.objects.create(
-        sku=sku,
-        tenant_id=sku.tenant_id,
-        batch_number="B123",
-        quantity=20,
-        received_at=timezone.now().date(),
-        expiry_date=timezone.now().date() + timedelta(days=25),
-        cost_price=5.0,
-    )
+def _statements(ctx):
+    """Captured SQL minus the savepoint bookkeeping of atomic()."""
+    return [
+        q["sql"]
+        for q in ctx.captured_queries
+        if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
 
 
 # --------------------------
@@ -105,6 +57,49 @@ def test_adjust_stock_with_batch(sku, batch):
     assert sku.stock_level == 5
 
 
+@pytest.mark.django_db
+def test_adjust_stock_query_budget(sku):
+    with CaptureQueriesContext(connection) as ctx:
+        adjusted_sku, _ = sku.adjust_stock(delta=-6, reason="sale")
+    # UPDATE ... RETURNING, INSERT adjustment, INSERT alert, INSERT outbox
+    assert len(_statements(ctx)) <= 4
+    assert adjusted_sku.stock_level == 4
+    assert Alert.objects.filter(sku=sku, type=Alert.Type.LOW_STOCK).count() == 1
+
+
+@pytest.mark.django_db
+def test_adjust_stock_with_batch_query_budget(sku, batch):
+    with CaptureQueriesContext(connection) as ctx:
+        sku.adjust_stock(delta=-1, reason="sale", batch=batch)
+    # extra UPDATEs for the batch and the SKU's FIFO layer value
+    assert len(_statements(ctx)) <= 5
+    assert batch.remaining_quantity == 19
+
+
+@pytest.mark.django_db
+def test_adjust_stock_evaluates_low_stock_alert_once(sku):
+    sku.adjust_stock(delta=-6, reason="sale")
+    sku.adjust_stock(delta=-1, reason="sale")
+    assert Alert.objects.filter(sku=sku, type=Alert.Type.LOW_STOCK).count() == 1
+
+
+@pytest.mark.django_db
+def test_low_stock_alert_reopens_after_acknowledge(sku):
+    sku.adjust_stock(delta=-6, reason="sale")
+    Alert.objects.get(sku=sku, type=Alert.Type.LOW_STOCK).acknowledge(user=None)
+    sku.adjust_stock(delta=-1, reason="sale")
+    alerts = Alert.objects.filter(sku=sku, type=Alert.Type.LOW_STOCK)
+    assert alerts.count() == 2
+    assert alerts.filter(acknowledged=False).get().current_stock == 3
+
+
+@pytest.mark.django_db
+def test_threshold_edit_raises_low_stock_alert(sku):
+    sku.reorder_threshold = 10
+    sku.save(update_fields=["reorder_threshold"])
+    assert Alert.objects.filter(sku=sku, type=Alert.Type.LOW_STOCK).exists()
+
+
 @pytest.mark.django_db
 def test_tenant_isolation(auth_client, another_tenant_sku):
     resp = auth_client.get(f"/api/inventory/skus/{another_tenant_sku.sku_id}/")
@@ -128,8 +123,9 @@ def test_batch_defaults_remaining_quantity(sku):
 
 @pytest.mark.django_db
 def test_batch_expiry_alert_created(batch):
-    # refresh from DB to ensure signal committed
-    batch.refresh_from_db()
+    # expiry alerts come from the scheduled sweeper, not from Batch.save()
+    assert not Alert.objects.filter(type=Alert.Type.BATCH_EXPIRY).exists()
+    call_command("sweep_batch_expiry", stdout=StringIO())
     alert = Alert.objects.filter(sku=batch.sku, type=Alert.Type.BATCH_EXPIRY).first()
     assert alert is not None
     assert alert.current_stock == batch.remaining_quantity
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, time, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from main_services.inventory.ledger import snapshot_day, stock_at
+from main_services.inventory.models import StockAdjustment, StockSnapshot
+
+
+def at(day, hour):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+@pytest.fixture
+def history(sku):
+    """Opening stock 10, then +5/-3 on day 1, -4 on day 3 and +1 today."""
+    today = timezone.localdate()
+    day1, day3 = today - timedelta(days=5), today - timedelta(days=3)
+    for delta, created_at in [
+        (5, at(day1, 10)),
+        (-3, at(day1, 15)),
+        (-4, at(day3, 9)),
+        (1, None),
+    ]:
+        _, adj = sku.adjust_stock(delta=delta, reason="correction")
+        if created_at:
+            StockAdjustment.objects.filter(pk=adj.pk).update(created_at=created_at)
+    sku.refresh_from_db()
+    assert sku.stock_level == 9
+    return day1, day3
+
+
+@pytest.mark.django_db
+def test_snapshots_build_on_previous_day(sku, history):
+    day1, day3 = history
+    assert snapshot_day(day1) == 1
+    assert snapshot_day(day1 + timedelta(days=1)) == 0
+    assert snapshot_day(day3) == 1
+
+    levels = dict(StockSnapshot.objects.values_list("day", "closing_level"))
+    assert levels == {day1: 12, day3: 8}
+
+
+@pytest.mark.django_db
+def test_snapshot_anchors_when_earlier_days_were_missed(sku, history):
+    _, day3 = history
+    snapshot_day(day3)
+    assert StockSnapshot.objects.get(day=day3).closing_level == 8
+
+
+@pytest.mark.django_db
+def test_snapshot_backfills_active_days_the_scheduler_missed(sku, history):
+    day1, day3 = history
+    snapshot_day(day1)
+    # day 3 was never run; the next run folds it in before its own day
+    assert snapshot_day(day3 + timedelta(days=1)) == 1
+    levels = dict(StockSnapshot.objects.values_list("day", "closing_level"))
+    assert levels == {day1: 12, day3: 8}
+
+
+@pytest.mark.django_db
+def test_stock_at_before_the_first_snapshot_is_bounded(
+    sku, history, django_assert_num_queries
+):
+    day1, day3 = history
+    snapshot_day(day3)
+    # walked back from the day 3 snapshot, not from today's stock_level
+    sku.stock_level = 1000
+    with django_assert_num_queries(3):
+        assert stock_at(sku, at(day1, 12)) == (15, None)
+
+
+@pytest.mark.django_db
+def test_stock_at_uses_nearest_snapshot_and_tail(sku, history):
+    day1, day3 = history
+    snapshot_day(day1)
+    snapshot_day(day3)
+
+    assert stock_at(sku, at(day1, 12)) == (15, None)
+    assert stock_at(sku, at(day1 + timedelta(days=1), 12)) == (12, day1)
+    assert stock_at(sku, at(day3, 12)) == (8, day1)
+    assert stock_at(sku, at(day3 + timedelta(days=1), 12)) == (8, day3)
+
+
+@pytest.mark.django_db
+def test_stock_at_query_count_is_constant(sku, history, django_assert_num_queries):
+    day1, day3 = history
+    snapshot_day(day1)
+    snapshot_day(day3)
+    with django_assert_num_queries(2):
+        stock_at(sku, at(day3 + timedelta(days=1), 12))
+
+
+@pytest.mark.django_db
+def test_snapshot_command_backfills_oldest_first(sku, history):
+    day1, day3 = history
+    out = StringIO()
+    call_command("snapshot_stock", "--day", day3.isoformat(), "--days", "3", stdout=out)
+    assert f"{day1}: 1 snapshot(s)" in out.getvalue()
+    assert StockSnapshot.objects.get(day=day3).closing_level == 8
+
+
+@pytest.mark.django_db
+def test_stock_at_endpoint(auth_client, sku, history):
+    day1, _ = history
+    snapshot_day(day1)
+    url = f"/api/inventory/skus/{sku.sku_id}/stock-at/"
+
+    resp = auth_client.get(url, {"ts": at(day1, 23).isoformat()})
+    assert resp.status_code == 200
+    assert resp.data["stock_level"] == 12
+
+    resp = auth_client.get(url, {"ts": "yesterday"})
+    assert resp.status_code == 400
@@ -0,0 +1,179 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from main_services.inventory.models import SKU, Location, LocationStock
+from main_services.inventory.stock import (
+    InsufficientStock,
+    bulk_adjust_stock,
+    transfer_stock,
+)
+
+
+@pytest.fixture
+def warehouse(tenant_uuid):
+    return Location.objects.create(tenant_id=tenant_uuid, name="Warehouse", code="WH")
+
+
+@pytest.fixture
+def store(tenant_uuid):
+    return Location.objects.create(tenant_id=tenant_uuid, name="Store", code="ST")
+
+
+def _held(sku, location):
+    return LocationStock.objects.get(sku=sku, location=location).quantity
+
+
+@pytest.mark.django_db
+def test_location_adjustments_roll_up_into_stock_level(sku, warehouse, store):
+    sku.adjust_stock(delta=30, reason="purchase", location=warehouse)
+    sku.adjust_stock(delta=-4, reason="sale", location=warehouse)
+
+    sku.refresh_from_db()
+    assert sku.stock_level == 36  # 10 unlocated + 26 at the warehouse
+    assert _held(sku, warehouse) == 26
+
+
+@pytest.mark.django_db
+def test_transfer_writes_paired_ledger_entries(sku, warehouse, store):
+    other = SKU.objects.create(name="Other", tenant_id=sku.tenant_id, category="X")
+    sku.adjust_stock(delta=20, reason="purchase", location=warehouse)
+    other.adjust_stock(delta=5, reason="purchase", location=warehouse)
+
+    with CaptureQueriesContext(connection) as ctx:
+        adjustments = transfer_stock(
+            warehouse, store, [(sku, 8), (other, 5), (sku, 2)], reference="T-1"
+        )
+    writes = [
+        q["sql"]
+        for q in ctx.captured_queries
+        if q["sql"].startswith(("UPDATE", "INSERT"))
+    ]
+    # ensure location rows, one grouped UPDATE, one ledger INSERT
+    assert len(writes) == 3
+
+    assert _held(sku, warehouse) == 10 and _held(sku, store) == 10
+    assert _held(other, warehouse) == 0 and _held(other, store) == 5
+    assert sorted((a.sku_id, a.location_id, a.quantity) for a in adjustments) == sorted(
+        [
+            (sku.pk, warehouse.pk, -10),
+            (sku.pk, store.pk, 10),
+            (other.pk, warehouse.pk, -5),
+            (other.pk, store.pk, 5),
+        ]
+    )
+    assert {a.reference for a in adjustments} == {"T-1"}
+    sku.refresh_from_db()
+    assert sku.stock_level == 30
+
+
+@pytest.mark.django_db
+def test_short_transfer_rolls_back(sku, warehouse, store):
+    sku.adjust_stock(delta=3, reason="purchase", location=warehouse)
+    with pytest.raises(InsufficientStock) as exc:
+        transfer_stock(warehouse, store, [(sku, 5)])
+    assert (exc.value.requested, exc.value.available) == (5, 3)
+    assert _held(sku, warehouse) == 3
+    assert not sku.adjustments.filter(reason="transfer").exists()
+
+
+@pytest.mark.django_db
+def test_location_sale_cannot_exceed_stock_held_there(sku, warehouse, store):
+    sku.adjust_stock(delta=2, reason="purchase", location=warehouse)
+    with pytest.raises(InsufficientStock) as exc:
+        sku.adjust_stock(delta=-5, reason="sale", location=warehouse)
+    assert (exc.value.requested, exc.value.available) == (5, 2)
+    assert _held(sku, warehouse) == 2
+
+    # the bulk path checks the net move per location, all or nothing
+    rows = [
+        {"sku": sku, "quantity": 1, "reason": "purchase", "location": store},
+        {"sku": sku, "quantity": -2, "reason": "sale", "location": warehouse},
+        {"sku": sku, "quantity": -2, "reason": "sale", "location": store},
+    ]
+    with pytest.raises(InsufficientStock):
+        bulk_adjust_stock(rows)
+    assert _held(sku, warehouse) == 2
+    assert not LocationStock.objects.filter(location=store).exists()
+    sku.refresh_from_db()
+    assert sku.stock_level == 12
+    assert sku.adjustments.count() == 1
+
+
+@pytest.mark.django_db
+def test_transfer_endpoint(auth_client, sku, warehouse, store, another_tenant_sku):
+    auth_client.post(
+        f"/api/inventory/skus/{sku.sku_id}/adjust_stock/",
+        {"quantity": 6, "reason": "purchase", "location_id": str(warehouse.pk)},
+        format="json",
+    )
+    url = f"/api/inventory/locations/{warehouse.pk}/transfer/"
+
+    resp = auth_client.post(
+        url,
+        {
+            "to_location_id": str(store.pk),
+            "lines": [{"sku_id": str(sku.pk), "quantity": 4}],
+        },
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert len(resp.data["adjustments"]) == 2
+
+    resp = auth_client.post(
+        url,
+        {
+            "to_location_id": str(store.pk),
+            "lines": [{"sku_id": str(sku.pk), "quantity": 9}],
+        },
+        format="json",
+    )
+    assert resp.status_code == 409
+    assert resp.data["available"] == 2
+
+    resp = auth_client.post(
+        url,
+        {
+            "to_location_id": str(store.pk),
+            "lines": [{"sku_id": str(another_tenant_sku.pk), "quantity": 1}],
+        },
+        format="json",
+    )
+    assert resp.status_code == 400
+
+    resp = auth_client.get("/api/inventory/location-stock/", {"sku": str(sku.pk)})
+    held = {row["location"]: row["quantity"] for row in resp.data["results"]}
+    assert held == {warehouse.pk: 2, store.pk: 4}
+
+    assert (
+        auth_client.delete(f"/api/inventory/locations/{store.pk}/").status_code == 400
+    )
+
+    auth_client.credentials()  # no X-Tenant-ID
+    resp = auth_client.post(
+        url,
+        {
+            "to_location_id": str(store.pk),
+            "lines": [{"sku_id": str(sku.pk), "quantity": 1}],
+        },
+        format="json",
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_location_codes_are_unique_per_tenant(auth_client, warehouse):
+    url = "/api/inventory/locations/"
+    resp = auth_client.post(url, {"name": "Annex", "code": "WH"}, format="json")
+    assert resp.status_code == 400
+    assert "code" in resp.data
+
+    # the same code is free in another tenant, and a location keeps its own
+    Location.objects.create(tenant_id=uuid.uuid4(), name="Elsewhere", code="EL")
+    resp = auth_client.post(url, {"name": "Annex", "code": "EL"}, format="json")
+    assert resp.status_code == 201
+    resp = auth_client.patch(
+        f"{url}{warehouse.pk}/", {"name": "Main", "code": "WH"}, format="json"
+    )
+    assert resp.status_code == 200
@@ -0,0 +1,135 @@
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from main_services.inventory.alerts import sweep_expiring_batches
+from main_services.inventory.models import SKU, Alert, AlertNotification
+from main_services.inventory.notifications import send_alert_digests
+from main_services.inventory.stock import bulk_adjust_stock
+
+User = get_user_model()
+
+
+def _staff(tenant_id, email, role="Manager", is_active=True):
+    return User.objects.create_user(
+        email=email, tenant_id=tenant_id, role=role, is_active=is_active
+    )
+
+
+@pytest.mark.django_db
+def test_alerts_are_queued_with_their_insert(sku, batch):
+    sku.adjust_stock(delta=-6, reason="sale")
+    alert = Alert.objects.get(sku=sku)
+    assert AlertNotification.objects.get().alert == alert
+
+    # an alert skipped as a duplicate queues nothing
+    sku.adjust_stock(delta=-1, reason="sale")
+    assert AlertNotification.objects.count() == 1
+
+    sweep_expiring_batches()
+    assert AlertNotification.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_alert_burst_costs_one_statement(tenant_uuid, mailoutbox):
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(
+                name=f"B-{i}",
+                tenant_id=tenant_uuid,
+                stock_level=10,
+                reorder_threshold=5,
+            )
+            for i in range(300)
+        ]
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        bulk_adjust_stock(
+            [{"sku": sku, "quantity": -8, "reason": "sale"} for sku in skus]
+        )
+    outbox = [
+        q for q in ctx.captured_queries if "inventory_alertnotification" in q["sql"]
+    ]
+    assert len(outbox) == 1
+    assert AlertNotification.objects.count() == 300
+    assert mailoutbox == []
+
+
+@pytest.mark.django_db
+def test_worker_sends_one_digest_per_tenant(sku, another_tenant_sku, mailoutbox):
+    _staff(sku.tenant_id, "manager@a.test")
+    _staff(sku.tenant_id, "admin@a.test", role="Admin")
+    _staff(sku.tenant_id, "viewer@a.test", role="Viewer")
+    _staff(another_tenant_sku.tenant_id, "manager@b.test")
+
+    for i in range(3):
+        SKU.objects.create(
+            name=f"Low-{i}", tenant_id=sku.tenant_id, stock_level=0, reorder_threshold=1
+        )
+    another_tenant_sku.reorder_threshold = 500
+    another_tenant_sku.save()
+    sku.adjust_stock(delta=-6, reason="sale")
+    Alert.objects.filter(sku=sku).get().acknowledge(user=None)
+
+    assert send_alert_digests(batch_size=2) == (5, 3)
+    assert not AlertNotification.objects.exists()
+
+    by_recipients = {tuple(message.to): message for message in mailoutbox}
+    assert set(by_recipients) == {
+        ("admin@a.test", "manager@a.test"),
+        ("manager@b.test",),
+    }
+    first_tenant = [m for m in mailoutbox if m.to == ["admin@a.test", "manager@a.test"]]
+    body = "".join(message.body for message in first_tenant)
+    assert "Low-0" in body and "Low-2" in body
+    assert "TestSKU" not in body  # acknowledged before the worker ran
+
+    call_command("send_alert_digests")
+    assert len(mailoutbox) == 3
+
+
+@pytest.mark.django_db
+def test_failed_send_keeps_the_batch(sku, monkeypatch, mailoutbox):
+    _staff(sku.tenant_id, "manager@a.test")
+    sku.adjust_stock(delta=-6, reason="sale")
+
+    def unreachable(self, messages):
+        raise ConnectionError("SMTP server unreachable")
+
+    monkeypatch.setattr(locmem.EmailBackend, "send_messages", unreachable)
+    with pytest.raises(ConnectionError):
+        send_alert_digests()
+    assert AlertNotification.objects.count() == 1
+
+    monkeypatch.undo()
+    assert send_alert_digests() == (1, 1)
+    assert mailoutbox[0].subject == "1 new inventory alert(s)"
+
+
+@pytest.mark.django_db
+def test_batch_is_claimed_before_the_send(sku, monkeypatch):
+    _staff(sku.tenant_id, "manager@a.test")
+    sku.adjust_stock(delta=-6, reason="sale")
+    queued_at_send = []
+
+    def send(self, messages):
+        queued_at_send.append(AlertNotification.objects.count())
+        return len(messages)
+
+    monkeypatch.setattr(locmem.EmailBackend, "send_messages", send)
+    assert send_alert_digests() == (1, 1)
+    assert queued_at_send == [0]
+
+
+@pytest.mark.django_db
+def test_tenants_without_recipients_are_drained(tenant_uuid, mailoutbox):
+    SKU.objects.create(
+        name="Nobody", tenant_id=uuid.uuid4(), stock_level=0, reorder_threshold=1
+    )
+    assert send_alert_digests() == (1, 0)
+    assert not AlertNotification.objects.exists()
+    assert mailoutbox == []
@@ -0,0 +1,92 @@
+import base64
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from main_services.inventory.models import StockAdjustment
+
+
+def _ledger(sku, n, same_instant=False):
+    now = timezone.now()
+    StockAdjustment.objects.bulk_create(
+        [
+            StockAdjustment(
+                tenant_id=sku.tenant_id, sku=sku, quantity=i + 1, reason="purchase"
+            )
+            for i in range(n)
+        ]
+    )
+    # auto_now_add ignores explicit values, so spread the timestamps afterwards
+    for i, pk in enumerate(
+        StockAdjustment.objects.filter(sku=sku).values_list("pk", flat=True)
+    ):
+        when = now if same_instant else now - timedelta(seconds=i)
+        StockAdjustment.objects.filter(pk=pk).update(created_at=when)
+
+
+def _walk(client, url, params):
+    seen, pages = [], 0
+    resp = client.get(url, params)
+    while True:
+        assert resp.status_code == 200
+        seen.extend(resp.data["results"])
+        pages += 1
+        if not resp.data["next"]:
+            return seen, pages
+        resp = client.get(resp.data["next"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("same_instant", [False, True])
+def test_cursor_walk_is_complete_and_ordered(auth_client, sku, same_instant):
+    _ledger(sku, 23, same_instant=same_instant)
+    seen, pages = _walk(
+        auth_client,
+        "/api/inventory/stock-adjustments/",
+        {"pagination": "cursor", "page_size": 5},
+    )
+
+    assert pages == 5
+    ids = [row["adjustment_id"] for row in seen]
+    assert len(ids) == len(set(ids)) == 23
+    keys = [(row["created_at"], row["adjustment_id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.django_db
+def test_deep_page_is_a_single_query(
+    auth_client, sku, django_assert_max_num_queries
+):
+    _ledger(sku, 30)
+    resp = auth_client.get(
+        "/api/inventory/stock-adjustments/", {"pagination": "cursor", "page_size": 10}
+    )
+    next_url = auth_client.get(resp.data["next"]).data["next"]
+
+    # auth + the page itself; never a COUNT(*)
+    with django_assert_max_num_queries(2) as ctx:
+        resp = auth_client.get(next_url)
+    assert len(resp.data["results"]) == 10
+    assert resp.data["next"] is None
+    assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+    assert not any("OFFSET" in q["sql"].upper() for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_page_number_stays_default_and_bad_cursor(auth_client, sku):
+    sku.adjust_stock(delta=-6, reason="sale")
+    resp = auth_client.get("/api/inventory/alerts/")
+    assert resp.data["count"] == 1
+
+    resp = auth_client.get("/api/inventory/alerts/", {"pagination": "cursor"})
+    assert "count" not in resp.data
+    assert len(resp.data["results"]) == 1
+
+    resp = auth_client.get("/api/inventory/alerts/", {"cursor": "not-a-cursor"})
+    assert resp.status_code == 404
+
+    # a valid timestamp with a key that is not a UUID
+    cursor = base64.urlsafe_b64encode(b"2026-01-01T00:00:00+00:00|nope").decode()
+    resp = auth_client.get("/api/inventory/alerts/", {"cursor": cursor})
+    assert resp.status_code == 404
+    assert resp.data["detail"] == "Invalid cursor"
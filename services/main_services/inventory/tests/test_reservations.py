@@ -0,0 +1,174 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from main_services.inventory.models import SKU, Reservation, StockAdjustment
+from main_services.inventory.reservations import (
+    ReservationExpired,
+    fulfil_reservation,
+    release_reservation,
+    reserve_stock,
+    sweep_expired_reservations,
+)
+from main_services.inventory.stock import (
+    InsufficientStock,
+    allocate_fefo,
+    bulk_adjust_stock,
+)
+
+
+@pytest.mark.django_db
+def test_reserve_maintains_available_to_promise(sku):
+    reservation = reserve_stock(sku, 4, reference="order-1")
+    assert sku.reserved_quantity == 4
+    assert sku.available_to_promise == 6
+
+    with pytest.raises(InsufficientStock) as exc:
+        reserve_stock(sku, 7)
+    assert exc.value.available == 6
+    sku.refresh_from_db()
+    assert sku.reserved_quantity == 4  # the failed hold left nothing behind
+
+    assert release_reservation(reservation)
+    assert not release_reservation(reservation)
+    sku.refresh_from_db()
+    assert sku.available_to_promise == 10
+
+
+@pytest.mark.django_db
+def test_batch_reservation_and_fulfilment(sku, batch):
+    reservation = reserve_stock(sku, 5, batch=batch, reference="order-2")
+    batch.refresh_from_db()
+    assert batch.reserved_quantity == 5
+
+    adjustment = fulfil_reservation(reservation)
+    assert (adjustment.quantity, adjustment.reference) == (-5, "order-2")
+    sku.refresh_from_db()
+    batch.refresh_from_db()
+    assert (sku.stock_level, sku.reserved_quantity) == (5, 0)
+    assert (batch.remaining_quantity, batch.reserved_quantity) == (15, 0)
+
+    with pytest.raises(ReservationExpired):
+        fulfil_reservation(reservation)
+
+
+@pytest.mark.django_db
+def test_sweeper_reclaims_expired_holds_in_pages(sku, tenant_uuid):
+    other = SKU.objects.create(
+        name="Other", tenant_id=tenant_uuid, category="X", stock_level=50
+    )
+    for _ in range(5):
+        reserve_stock(sku, 1)
+        reserve_stock(other, 2)
+    live = reserve_stock(other, 3)
+    Reservation.objects.exclude(pk=live.pk).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    assert sweep_expired_reservations(page_size=4) == (10, 3)
+    sku.refresh_from_db()
+    other.refresh_from_db()
+    assert sku.reserved_quantity == 0
+    assert other.reserved_quantity == 3
+    assert list(Reservation.objects.all()) == [live]
+
+    call_command("sweep_reservations")
+    assert Reservation.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_reservation_endpoints(auth_client, sku):
+    url = f"/api/inventory/skus/{sku.sku_id}/reserve/"
+    resp = auth_client.post(url, {"quantity": 8, "reference": "o-9"}, format="json")
+    assert resp.status_code == 201
+    assert resp.data["available_to_promise"] == 2
+    reservation_id = resp.data["reservation_id"]
+
+    resp = auth_client.post(url, {"quantity": 3}, format="json")
+    assert resp.status_code == 409
+
+    resp = auth_client.get(f"/api/inventory/skus/{sku.sku_id}/")
+    assert (resp.data["reserved_quantity"], resp.data["available_to_promise"]) == (8, 2)
+
+    resp = auth_client.delete(f"/api/inventory/reservations/{reservation_id}/")
+    assert resp.status_code == 204
+    sku.refresh_from_db()
+    assert sku.reserved_quantity == 0
+
+
+@pytest.mark.django_db
+def test_sales_only_take_available_to_promise(auth_client, sku, batch):
+    SKU.objects.filter(pk=sku.pk).update(stock_level=30)
+    sku.refresh_from_db()
+    reserve_stock(sku, 18, batch=batch)
+
+    with pytest.raises(InsufficientStock) as exc:
+        sku.adjust_stock(delta=-13, reason="sale")
+    assert (exc.value.requested, exc.value.available) == (13, 12)
+    with pytest.raises(InsufficientStock):
+        bulk_adjust_stock([{"sku": sku, "quantity": -13, "reason": "sale"}])
+    # only 2 of the batch's 20 units are not held
+    with pytest.raises(InsufficientStock) as exc:
+        allocate_fefo(sku, 3)
+    assert exc.value.available == 2
+    sku.refresh_from_db()
+    batch.refresh_from_db()
+    assert (sku.stock_level, batch.remaining_quantity) == (30, 20)
+    assert not StockAdjustment.objects.filter(sku=sku).exists()
+
+    allocate_fefo(sku, 2)
+    sku.adjust_stock(delta=-10, reason="sale")
+    # a count correction may still cut into held stock
+    sku.adjust_stock(delta=-1, reason="correction")
+    assert sku.available_to_promise == -1
+
+    resp = auth_client.post(
+        f"/api/inventory/skus/{sku.sku_id}/adjust_stock/",
+        {"quantity": -1, "reason": "sale"},
+        format="json",
+    )
+    assert resp.status_code == 409
+    assert (resp.data["sku_id"], resp.data["available"]) == (sku.pk, -1)
+
+
+@pytest.mark.django_db
+def test_expired_holds_cannot_be_fulfilled(sku):
+    reservation = reserve_stock(sku, 3)
+    Reservation.objects.filter(pk=reservation.pk).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+    reservation.refresh_from_db()
+
+    with pytest.raises(ReservationExpired):
+        fulfil_reservation(reservation)
+    sku.refresh_from_db()
+    assert (sku.stock_level, sku.reserved_quantity) == (10, 3)
+    assert sweep_expired_reservations() == (1, 1)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="needs row-level locking")
+def test_concurrent_holds_never_oversell(sku):
+    results = []
+
+    def hold():
+        try:
+            reserve_stock(SKU.objects.get(pk=sku.pk), 3)
+            results.append(True)
+        except InsufficientStock:
+            results.append(False)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=hold) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sku.refresh_from_db()
+    assert results.count(True) == 3
+    assert sku.reserved_quantity == 9
@@ -0,0 +1,192 @@
+import random
+import statistics
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from main_services.inventory.importer import import_skus
+from main_services.inventory.models import SKU, SearchTrigram, SKUSearchTerm
+from main_services.inventory.search import (
+    fuzzy_terms,
+    index_skus,
+    search_skus,
+    sku_terms,
+    tokenize,
+)
+
+
+def _names(results):
+    return [sku.name for sku, _ in results]
+
+
+@pytest.fixture
+def catalog(tenant_uuid, another_tenant_sku):
+    rows = [
+        ("Coca Cola 500ml", "CC-500", "5000112637922", {"flavour": "Original"}),
+        ("Coconut Water", "CW-1", None, {"size": "1L"}),
+        ("Cola Zero", "CZ-330", None, {}),
+        ("Crème Brûlée", "CB-1", None, {"tags": ["dessert", "chilled"]}),
+    ]
+    for name, code, barcode, attributes in rows:
+        SKU.objects.create(
+            tenant_id=tenant_uuid,
+            name=name,
+            sku_code=code,
+            barcode=barcode,
+            attributes=attributes,
+            category="Drinks",
+        )
+
+
+def test_terms_are_folded_and_weighted():
+    assert tokenize("Crème Brûlée, 1.5L") == ["creme", "brulee", "1", "5l"]
+    terms = sku_terms("Cola Zero", "CZ-330", "5000112", {"size": "330ml", "x": True})
+    assert terms == {
+        "cola": 4,
+        "zero": 4,
+        "330ml": 1,
+        "cz": 8,
+        "330": 8,
+        "cz330": 8,
+        "5000112": 8,
+    }
+
+
+@pytest.mark.django_db
+def test_prefix_search_requires_every_token(catalog, tenant_uuid):
+    assert sorted(_names(search_skus(tenant_uuid, "co"))) == [
+        "Coca Cola 500ml",
+        "Coconut Water",
+        "Cola Zero",
+    ]
+    assert _names(search_skus(tenant_uuid, "coca col")) == ["Coca Cola 500ml"]
+    assert _names(search_skus(tenant_uuid, "brulee")) == ["Crème Brûlée"]
+    assert _names(search_skus(tenant_uuid, "chilled")) == ["Crème Brûlée"]
+    # other tenants' SKUs are never matched
+    assert search_skus(tenant_uuid, "othertenant") == []
+
+
+@pytest.mark.django_db
+def test_codes_outrank_names(catalog, tenant_uuid):
+    SKU.objects.create(
+        tenant_id=tenant_uuid, name="CZ adapter", sku_code="AD-1", category="X"
+    )
+    results = search_skus(tenant_uuid, "cz")
+    assert _names(results) == ["Cola Zero", "CZ adapter"]
+    assert results[0][1] > results[1][1]
+
+    assert _names(search_skus(tenant_uuid, "cz330")) == ["Cola Zero"]
+    assert _names(search_skus(tenant_uuid, "50001126")) == ["Coca Cola 500ml"]
+
+
+@pytest.mark.django_db
+def test_fuzzy_fallback_for_misspellings(catalog, tenant_uuid):
+    assert "coconut" in fuzzy_terms(tenant_uuid, "cocnut")
+    assert _names(search_skus(tenant_uuid, "cocnut wat")) == ["Coconut Water"]
+    assert search_skus(tenant_uuid, "xylophone") == []
+
+
+@pytest.mark.django_db
+def test_index_follows_sku_writes(catalog, tenant_uuid):
+    sku = SKU.objects.get(name="Cola Zero")
+    sku.name = "Cola Light"
+    sku.save()
+    assert search_skus(tenant_uuid, "zero") == []
+    assert _names(search_skus(tenant_uuid, "light")) == ["Cola Light"]
+
+    sku.delete()
+    assert search_skus(tenant_uuid, "light") == []
+
+    import_skus(
+        tenant_uuid,
+        [{"sku_code": "CW-1", "name": "Coconut Milk", "category": "Drinks"}],
+    )
+    assert _names(search_skus(tenant_uuid, "coconut milk")) == ["Coconut Milk"]
+    assert search_skus(tenant_uuid, "water") == []
+
+
+@pytest.mark.django_db
+def test_rebuild_drops_stale_vocabulary(catalog, tenant_uuid):
+    SKU.objects.filter(name="Cola Zero").update(name="Tonic")
+    SKUSearchTerm.objects.all().delete()
+    call_command("rebuild_search_index", "--tenant", str(tenant_uuid))
+
+    assert _names(search_skus(tenant_uuid, "tonic")) == ["Tonic"]
+    assert not SearchTrigram.objects.filter(term="zero").exists()
+
+
+@pytest.mark.django_db
+def test_search_endpoint(auth_client, catalog):
+    resp = auth_client.get("/api/inventory/skus/search/", {"q": "coca"})
+    assert resp.status_code == 200
+    (hit,) = resp.data["results"]
+    assert hit["name"] == "Coca Cola 500ml"
+    assert hit["score"] > 0
+
+    assert auth_client.get("/api/inventory/skus/search/").status_code == 400
+    resp = auth_client.get("/api/inventory/skus/search/", {"q": "co", "limit": 0})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_queries_do_not_grow_with_matches(tenant_uuid):
+    def queries(n):
+        SKU.objects.filter(tenant_id=tenant_uuid).delete()
+        skus = SKU.objects.bulk_create(
+            [
+                SKU(tenant_id=tenant_uuid, name=f"Lemon Soda {i}", category="X")
+                for i in range(n)
+            ]
+        )
+        index_skus(skus)
+        with CaptureQueriesContext(connection) as ctx:
+            assert search_skus(tenant_uuid, "lemon so")
+        return len(ctx.captured_queries)
+
+    # enough matches that the fuzzy widening never runs
+    assert queries(30) == queries(300)
+
+
+WORDS = [
+    "".join(random.Random(i).choices("abcdefghijklmnopqrstuvwxyz", k=7))
+    for i in range(3000)
+]
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_search_latency(tenant_uuid):
+    # 50k SKUs keeps the fixture affordable; the lookups are range scans on
+    # the term index, so latency follows matches per query, not tenant size
+    n = 50_000
+    rng = random.Random(7)
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(
+                tenant_id=tenant_uuid,
+                name=" ".join(rng.sample(WORDS, 3)),
+                sku_code=f"S-{i}",
+                category="Bench",
+                attributes={"color": rng.choice(WORDS[:20])},
+            )
+            for i in range(n)
+        ],
+        batch_size=5000,
+    )
+    for start in range(0, n, 10_000):
+        index_skus(skus[start : start + 10_000])
+
+    queries = [
+        rng.choice(WORDS)[:4] if i % 3 else " ".join(rng.sample(WORDS, 2))
+        for i in range(100)
+    ]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search_skus(tenant_uuid, query)
+        timings.append(time.perf_counter() - started)
+
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    assert p95 < 0.020, f"p95 {p95 * 1000:.1f} ms"
@@ -0,0 +1,213 @@
+import csv
+import io
+import threading
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from main_services.inventory.alerts import (
+    alert_summary,
+    evaluate_low_stock,
+    low_stock_skus,
+)
+from main_services.inventory.models import SKU, Alert, StockShard
+from main_services.inventory.reservations import reserve_stock
+from main_services.inventory.shards import (
+    compact_stock_shards,
+    set_counter_shards,
+)
+from main_services.inventory.stock import InsufficientStock, bulk_adjust_stock
+from main_services.inventory.valuation import tenant_valuation
+
+
+def _live(sku):
+    return SKU.objects.with_live_stock().get(pk=sku.pk).live_stock_level
+
+
+@pytest.mark.django_db
+def test_sharded_writes_leave_the_sku_row_alone(sku):
+    set_counter_shards(sku, 4)
+    assert StockShard.objects.filter(sku=sku).count() == 4
+
+    for _ in range(3):
+        sku.adjust_stock(delta=-2, reason="sale")
+    assert sku.live_stock_level == 4
+    # stock_level only moves when the compactor runs
+    assert SKU.objects.get(pk=sku.pk).stock_level == 10
+    assert _live(sku) == 4
+    # the low-stock check runs against the live level
+    assert Alert.objects.filter(sku=sku, type=Alert.Type.LOW_STOCK).exists()
+
+    assert compact_stock_shards() == 1
+    sku.refresh_from_db()
+    assert sku.stock_level == _live(sku) == 4
+    assert not StockShard.objects.filter(sku=sku).exclude(delta=0).exists()
+    assert compact_stock_shards() == 0
+
+
+@pytest.mark.django_db
+def test_changing_the_shard_count_keeps_pending_units(sku):
+    set_counter_shards(sku, 8)
+    for _ in range(40):
+        sku.adjust_stock(delta=1, reason="purchase")
+    assert _live(sku) == 50
+
+    set_counter_shards(sku, 2)
+    assert sorted(sku.shards.values_list("shard", flat=True)) == [0, 1]
+    assert _live(sku) == 50
+
+    set_counter_shards(sku, 0)
+    assert sku.stock_level == 50 and not sku.shards.exists()
+    sku.adjust_stock(delta=-1, reason="sale")
+    assert sku.stock_level == 49
+
+    with pytest.raises(ValueError):
+        set_counter_shards(sku, 1000)
+
+
+@pytest.mark.django_db
+def test_missing_shard_falls_back_to_the_sku_row(sku):
+    set_counter_shards(sku, 2)
+    StockShard.objects.filter(sku=sku).delete()
+    sku.adjust_stock(delta=-3, reason="sale")
+    assert sku.stock_level == 7
+    assert _live(sku) == 7
+
+
+@pytest.mark.django_db
+def test_reservations_see_pending_shard_deltas(sku):
+    set_counter_shards(sku, 4)
+    sku.adjust_stock(delta=-6, reason="sale")
+
+    with pytest.raises(InsufficientStock) as exc:
+        reserve_stock(sku, 5)
+    assert exc.value.available == 4
+    reserve_stock(sku, 4)
+    assert sku.available_to_promise == 0
+
+    call_command("compact_stock_shards")
+    sku.refresh_from_db()
+    assert sku.available_to_promise == 0
+
+
+@pytest.mark.django_db
+def test_counter_shard_endpoints(auth_client, sku):
+    url = f"/api/inventory/skus/{sku.sku_id}/counter-shards/"
+    resp = auth_client.post(url, {"shards": 4}, format="json")
+    assert resp.status_code == 200
+    assert resp.data["counter_shards"] == 4
+
+    resp = auth_client.post(
+        f"/api/inventory/skus/{sku.sku_id}/adjust_stock/",
+        {"quantity": -3, "reason": "sale"},
+        format="json",
+    )
+    assert resp.status_code == 201
+
+    resp = auth_client.get(f"/api/inventory/skus/{sku.sku_id}/")
+    assert (resp.data["stock_level"], resp.data["live_stock_level"]) == (10, 7)
+    assert resp.data["available_to_promise"] == 7
+    resp = auth_client.get("/api/inventory/skus/")
+    assert resp.data["results"][0]["live_stock_level"] == 7
+
+    resp = auth_client.post(url, {"shards": -1}, format="json")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_stock_readers_see_pending_shard_deltas(auth_client, sku, tenant_uuid):
+    set_counter_shards(sku, 4)
+    sku.adjust_stock(delta=-6, reason="sale")
+    assert SKU.objects.get(pk=sku.pk).stock_level == 10
+
+    assert list(low_stock_skus(tenant_uuid)) == [sku]
+    assert alert_summary(tenant_uuid)["low_stock"] == 1
+
+    Alert.objects.all().delete()
+    [alert] = evaluate_low_stock([sku.pk])
+    assert alert.current_stock == 4
+
+    Alert.objects.all().delete()
+    levels, _ = bulk_adjust_stock([{"sku": sku, "quantity": -1, "reason": "sale"}])
+    assert levels == {sku.pk: 3}
+    assert Alert.objects.get(sku=sku).current_stock == 3
+
+    assert tenant_valuation(SKU.objects.filter(tenant_id=tenant_uuid))["units"] == 3
+
+    resp = auth_client.get("/api/inventory/skus/export/")
+    [row] = csv.DictReader(io.StringIO(b"".join(resp.streaming_content).decode()))
+    assert (row["stock_level"], row["live_stock_level"]) == ("9", "3")
+    resp = auth_client.get("/api/inventory/skus/search/", {"q": "testsku"})
+    assert resp.data["results"][0]["live_stock_level"] == 3
+
+
+def _throughput(sku, threads, writes, hold, reason="return", delta=1):
+    """
+    Stock writes per second against `sku` from `threads` writers, each write
+    a transaction that keeps going for `hold` seconds after the stock write,
+    as an order or a return would.
+    """
+    results = []
+
+    def write():
+        try:
+            target = SKU.objects.get(pk=sku.pk)
+            for _ in range(writes):
+                try:
+                    with transaction.atomic():
+                        target.adjust_stock(delta=delta, reason=reason)
+                        time.sleep(hold)
+                    results.append("ok")
+                except InsufficientStock:
+                    results.append("short")
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=write) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * writes / (time.perf_counter() - started), results
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="needs row-level locking")
+def test_concurrent_sharded_sales_never_oversell(tenant_uuid):
+    sku = SKU.objects.create(
+        name="Hot", tenant_id=tenant_uuid, category="H", stock_level=10
+    )
+    set_counter_shards(sku, 4)
+    _, results = _throughput(sku, 6, 3, hold=0.01, reason="sale", delta=-1)
+
+    # each sale waits for the ones before it to commit their shard delta
+    assert results.count("ok") == 10
+    assert results.count("short") == 8
+    assert _live(sku) == 0
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="needs row-level locking")
+def test_sharded_counter_throughput(tenant_uuid):
+    # unchecked writes (returns here) skip the SKU row; sales still lock it
+    threads, writes = 8, 15
+    rates = {}
+    for shards in (0, 2, 8):
+        sku = SKU.objects.create(
+            name=f"Hot-{shards}", tenant_id=tenant_uuid, category="H", stock_level=1000
+        )
+        set_counter_shards(sku, shards)
+        rates[shards], _ = _throughput(sku, threads, writes, hold=0.02)
+
+        assert _live(sku) == 1000 + threads * writes
+        compact_stock_shards()
+        sku.refresh_from_db()
+        assert sku.stock_level == 1000 + threads * writes
+
+    summary = ", ".join(f"{n} shards: {rate:.0f}/s" for n, rate in rates.items())
+    # the unsharded SKU serializes every write on its row lock
+    assert rates[0] < rates[2] < rates[8], summary
+    assert rates[8] > 2 * rates[0], summary
@@ -0,0 +1,151 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from main_services.inventory.models import SKU, Batch, SKUValuation
+from main_services.inventory.stock import allocate_fefo
+from main_services.inventory.valuation import cost_of_goods_sold, tenant_valuation
+
+
+@pytest.fixture
+def layers(sku):
+    # two receipts at different costs, OLD expiring first
+    old = Batch.objects.create(
+        tenant_id=sku.tenant_id,
+        sku=sku,
+        batch_number="OLD",
+        quantity=10,
+        cost_price=Decimal("2.00"),
+        expiry_date=timezone.now().date() + timedelta(days=5),
+    )
+    new = Batch.objects.create(
+        tenant_id=sku.tenant_id,
+        sku=sku,
+        batch_number="NEW",
+        quantity=30,
+        cost_price=Decimal("4.00"),
+        expiry_date=timezone.now().date() + timedelta(days=50),
+    )
+    SKU.objects.filter(pk=sku.pk).update(stock_level=40)
+    sku.refresh_from_db()
+    return old, new
+
+
+@pytest.mark.django_db
+def test_batch_receipts_build_the_layer_rollup(sku, layers):
+    row = SKUValuation.objects.get(sku=sku)
+    assert row.layer_value == Decimal("140.00")
+    assert row.received_units == 40
+    # (10 x 2 + 30 x 4) / 40
+    assert row.average_cost == Decimal("3.5000")
+
+    assert tenant_valuation(SKU.objects.filter(tenant_id=sku.tenant_id)) == {
+        "skus": 1,
+        "units": 40,
+        "fifo_value": Decimal("140.00"),
+        "average_value": Decimal("140.00"),
+    }
+
+
+@pytest.mark.django_db
+def test_stock_moves_keep_fifo_value_current(sku, layers):
+    old, new = layers
+    allocate_fefo(sku, 12)  # all of OLD, 2 of NEW
+    sku.refresh_from_db()
+
+    valuation = tenant_valuation(SKU.objects.filter(tenant_id=sku.tenant_id))
+    assert valuation["units"] == 28
+    assert valuation["fifo_value"] == Decimal("112.00")  # 28 x 4
+    assert valuation["average_value"] == Decimal("98.00")  # 28 x 3.5
+
+    sku.adjust_stock(delta=-3, reason="sale", batch=new)
+    assert SKUValuation.objects.get(sku=sku).layer_value == Decimal("100.00")
+
+    # the incremental value matches a rebuild from the batches
+    call_command("rebuild_valuation")
+    assert SKUValuation.objects.get(sku=sku).layer_value == Decimal("100.00")
+
+
+@pytest.mark.django_db
+def test_cogs_per_period(sku, layers):
+    old, _ = layers
+    allocate_fefo(sku, 12)
+    sku.adjust_stock(delta=1, reason="return", batch=old)
+    sku.adjust_stock(delta=5, reason="purchase")
+
+    start = timezone.now() - timedelta(hours=1)
+    totals = cost_of_goods_sold(sku.tenant_id, start, start + timedelta(days=1))
+    # FIFO: 10 x 2 + 2 x 4 - 1 x 2; average: 11 x 3.5
+    assert totals == {
+        "units": 11,
+        "fifo": Decimal("26.00"),
+        "average": Decimal("38.50"),
+    }
+    assert cost_of_goods_sold(
+        sku.tenant_id, start - timedelta(days=2), start - timedelta(days=1)
+    )["units"] == 0
+
+
+@pytest.mark.django_db
+def test_deleting_the_last_batch_drops_the_rollup(sku, layers):
+    for batch in layers:
+        batch.delete()
+    assert not SKUValuation.objects.filter(sku=sku).exists()
+
+
+@pytest.mark.django_db
+def test_valuation_endpoints(auth_client, sku, layers, another_tenant_sku):
+    resp = auth_client.get("/api/inventory/skus/valuation/")
+    assert resp.status_code == 200
+    assert resp.data["skus"] == 1
+    assert resp.data["fifo_value"] == Decimal("140.00")
+
+    resp = auth_client.get("/api/inventory/skus/valuation/", {"category": "Nope"})
+    assert resp.data["skus"] == 0
+
+    allocate_fefo(sku, 1)
+    today = timezone.localdate().isoformat()
+    resp = auth_client.get("/api/inventory/skus/cogs/", {"start": today, "end": today})
+    assert resp.status_code == 200
+    assert resp.data["fifo"] == Decimal("2.00")
+
+    resp = auth_client.get("/api/inventory/skus/cogs/", {"start": "yesterday"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_valuation_of_100k_skus(tenant_uuid):
+    n = 100_000
+    skus = SKU.objects.bulk_create(
+        [
+            SKU(name=f"V-{i}", tenant_id=tenant_uuid, category="V", stock_level=5)
+            for i in range(n)
+        ],
+        batch_size=5000,
+    )
+    SKUValuation.objects.bulk_create(
+        [
+            SKUValuation(
+                sku=sku,
+                tenant_id=tenant_uuid,
+                layer_value=Decimal("10.00"),
+                received_units=5,
+                received_value=Decimal("10.00"),
+                average_cost=Decimal("2.0000"),
+            )
+            for sku in skus
+        ],
+        batch_size=5000,
+    )
+
+    started = time.perf_counter()
+    valuation = tenant_valuation(SKU.objects.filter(tenant_id=tenant_uuid))
+    elapsed = time.perf_counter() - started
+
+    assert valuation["fifo_value"] == Decimal(n * 10)
+    assert valuation["average_value"] == Decimal(n * 10)
+    assert elapsed < 1.0, f"{elapsed:.2f}s"
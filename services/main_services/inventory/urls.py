@@ -1,9 +1,20 @@
 from rest_framework_nested import routers
-from .views import SKUViewSet, BatchViewSet, StockAdjustmentViewSet, AlertViewSet
+from .views import (
+    SKUViewSet,
+    BatchViewSet,
+    LocationViewSet,
+    LocationStockViewSet,
+    ReservationViewSet,
+    StockAdjustmentViewSet,
+    AlertViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register(r"skus", SKUViewSet, basename="sku")
 router.register(r"batches", BatchViewSet, basename="batch")
+router.register(r"locations", LocationViewSet, basename="location")
+router.register(r"location-stock", LocationStockViewSet, basename="locationstock")
+router.register(r"reservations", ReservationViewSet, basename="reservation")
 router.register(
     r"stock-adjustments", StockAdjustmentViewSet, basename="stockadjustment"
 )
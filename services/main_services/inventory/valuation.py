@@ -0,0 +1,179 @@
+"""
+Inventory valuation over Batch.cost_price.
+
+Batches are the cost layers. Each SKU's layers are rolled up into one
+SKUValuation row, which is refreshed from its batches whenever a batch is
+saved and nudged by `remaining_quantity x cost_price` whenever stock moves
+through a batch. Tenant valuation and period COGS are then single aggregate
+queries, with nothing pulled into Python per SKU or per batch.
+"""
+from decimal import Decimal
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+
+from .models import (
+    SKU,
+    Batch,
+    SKUValuation,
+    StockAdjustment,
+    live_stock_level,
+)
+
+CENT = Decimal("0.01")
+MONEY = DecimalField(max_digits=20, decimal_places=2)
+VALUATION_CHUNK_SIZE = 2000
+COGS_REASONS = (StockAdjustment.Reason.SALE, StockAdjustment.Reason.RETURN)
+
+
+def _money(value):
+    return Decimal(value or 0).quantize(CENT)
+
+
+def _product(left, right):
+    return ExpressionWrapper(F(left) * F(right), output_field=MONEY)
+
+
+def refresh_valuation(sku_ids):
+    """
+    Rebuild the SKUValuation rows of the given SKUs from their batches with
+    one grouped aggregate and one upsert. `sku_ids` may be a list of primary
+    keys or a `values("pk")` queryset. Returns the number of rows written.
+    """
+    if not isinstance(sku_ids, QuerySet):
+        sku_ids = list(sku_ids)
+    layers = (
+        Batch.objects.filter(sku_id__in=sku_ids)
+        .order_by()
+        .values("sku_id", "tenant_id")
+        .annotate(
+            layer_value=Sum(_product("remaining_quantity", "cost_price")),
+            received_units=Sum("quantity"),
+            received_value=Sum(_product("quantity", "cost_price")),
+        )
+    )
+    rows = []
+    for layer in layers:
+        received_value = _money(layer["received_value"])
+        units = layer["received_units"] or 0
+        rows.append(
+            SKUValuation(
+                sku_id=layer["sku_id"],
+                tenant_id=layer["tenant_id"],
+                layer_value=_money(layer["layer_value"]),
+                received_units=units,
+                received_value=received_value,
+                average_cost=(
+                    (received_value / units).quantize(Decimal("0.0001"))
+                    if units > 0
+                    else Decimal(0)
+                ),
+            )
+        )
+    SKUValuation.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["sku"],
+        update_fields=[
+            "layer_value",
+            "received_units",
+            "received_value",
+            "average_cost",
+            "updated_at",
+        ],
+    )
+    # SKUs whose last batch went away carry no cost layers any more
+    SKUValuation.objects.filter(sku_id__in=sku_ids).exclude(
+        sku_id__in=[row.sku_id for row in rows]
+    ).delete()
+    return len(rows)
+
+
+def tenant_valuation(skus):
+    """
+    Value of the SKUs in `skus` (a tenant-scoped, possibly filtered SKU
+    queryset) under both costing methods, in one aggregate query:
+
+    - fifo: the remaining quantity of every batch at its own cost_price.
+    - average: the live stock level (with any units parked in counter
+      shards) at the SKU's weighted-average receipt cost.
+    """
+    units = live_stock_level()
+    totals = skus.order_by().aggregate(
+        skus=Count("pk"),
+        units=Coalesce(Sum(units), 0),
+        fifo=Sum("valuation__layer_value"),
+        average=Sum(
+            ExpressionWrapper(units * F("valuation__average_cost"), output_field=MONEY)
+        ),
+    )
+    return {
+        "skus": totals["skus"],
+        "units": totals["units"],
+        "fifo_value": _money(totals["fifo"]),
+        "average_value": _money(totals["average"]),
+    }
+
+
+def cost_of_goods_sold(tenant_id, start, end):
+    """
+    COGS of the sales (net of returns) logged in [start, end).
+
+    Under FIFO a ledger row is costed at its batch's cost_price, falling back
+    to the SKU's average cost for rows that did not go through a batch;
+    under weighted average every row uses the SKU's average cost.
+    """
+    ledger = StockAdjustment.objects.filter(
+        tenant_id=tenant_id,
+        reason__in=COGS_REASONS,
+        created_at__gte=start,
+        created_at__lt=end,
+    )
+    average_cost = Coalesce(
+        F("sku__valuation__average_cost"), Decimal(0), output_field=MONEY
+    )
+    totals = ledger.order_by().aggregate(
+        units=Sum("quantity"),
+        fifo=Sum(
+            ExpressionWrapper(
+                -F("quantity")
+                * Coalesce(F("batch__cost_price"), average_cost, output_field=MONEY),
+                output_field=MONEY,
+            )
+        ),
+        average=Sum(
+            ExpressionWrapper(-F("quantity") * average_cost, output_field=MONEY)
+        ),
+    )
+    return {
+        "units": -(totals["units"] or 0),
+        "fifo": _money(totals["fifo"]),
+        "average": _money(totals["average"]),
+    }
+
+
+def rebuild_valuation(tenant_id=None, chunk_size=VALUATION_CHUNK_SIZE):
+    """
+    Refresh every SKU that has batches or a stale valuation row, `chunk_size`
+    SKUs at a time. Repairs drift from writes that bypassed the model layer.
+    """
+    skus = (
+        SKU.objects.filter(Q(batches__isnull=False) | Q(valuation__isnull=False))
+        .distinct()
+        .order_by("pk")
+    )
+    if tenant_id:
+        skus = skus.filter(tenant_id=tenant_id)
+    ids = list(skus.values_list("pk", flat=True))
+    written = 0
+    for start in range(0, len(ids), chunk_size):
+        written += refresh_valuation(ids[start : start + chunk_size])
+    return written
@@ -1,27 +1,108 @@
-from rest_framework import viewsets, status
+from datetime import timedelta
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import SKU, Batch, StockAdjustment, Alert
+from .models import (
+    SKU,
+    Batch,
+    Location,
+    LocationStock,
+    Reservation,
+    StockAdjustment,
+    Alert,
+)
 from .serialiizers import (
     SKUSerializer,
     BatchSerializer,
+    LocationSerializer,
+    LocationStockSerializer,
     StockAdjustmentSerializer,
     StockAdjustmentCreateSerializer,
+    BulkStockAdjustmentSerializer,
+    StockAllocationSerializer,
+    CounterShardsSerializer,
+    StockReservationSerializer,
+    ReservationSerializer,
+    StockTransferSerializer,
     AlertSerializer,
+    BulkAcknowledgeSerializer,
+)
+from .stock import (
+    InsufficientStock,
+    allocate_fefo,
+    bulk_adjust_stock,
+    transfer_stock,
+)
+from .alerts import acknowledge_alerts, alert_summary
+from .ledger import day_start, stock_at
+from .export import StreamingExportMixin
+from .pagination import KeysetPaginationMixin
+from .importer import IMPORT_FORMATS, import_skus, read_rows
+from .barcodes import cache_stats, lookup_barcode
+from .valuation import cost_of_goods_sold, tenant_valuation
+from .shards import set_counter_shards
+from .search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_skus
+from .facets import facet_counts, filter_by_attributes
+from .reservations import (
+    ReservationExpired,
+    fulfil_reservation,
+    release_reservation,
+    reserve_stock,
 )
 from main_services.catalog.views import TenantScopedMixin
 
 
+def insufficient_stock_response(exc):
+    return Response(
+        {
+            "detail": str(exc),
+            "sku_id": exc.sku_id,
+            "requested": exc.requested,
+            "available": exc.available,
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
 # -----------------------
 # SKU ViewSet
 # -----------------------
-class SKUViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class SKUViewSet(TenantScopedMixin, StreamingExportMixin, viewsets.ModelViewSet):
     serializer_class = SKUSerializer
     queryset = SKU.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["category", "stock_level", "supplier_id"]
+    export_fields = (
+        "sku_id",
+        "name",
+        "sku_code",
+        "category",
+        "barcode",
+        "price",
+        "stock_level",
+        "live_stock_level",
+        "supplier_id",
+        "track_batches",
+        "reorder_threshold",
+        "attributes",
+        "created_at",
+        "updated_at",
+    )
+    export_ordering = ("sku_id",)
+    export_filename = "skus"
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action in ("list", "retrieve", "facets", "export"):
+            # sharded SKUs report stock_level + their pending shard deltas
+            qs = qs.with_live_stock()
+        return qs
 
     @action(detail=True, methods=["post"])
     def adjust_stock(self, request, pk=None):
@@ -33,19 +114,292 @@ class SKUViewSet(TenantScopedMixin, viewsets.ModelViewSet):
         batch_id = serializer.validated_data.get("batch_id")
         if batch_id:
             batch = get_object_or_404(sku.batches, pk=batch_id)
+        location = None
+        location_id = serializer.validated_data.get("location_id")
+        if location_id:
+            location = get_object_or_404(
+                Location, pk=location_id, tenant_id=sku.tenant_id
+            )
 
-        adjusted_sku, adjustment = sku.adjust_stock(
-            delta=serializer.validated_data["quantity"],
-            reason=serializer.validated_data["reason"],
-            batch=batch,
-            reference=serializer.validated_data.get("reference"),
-            note=serializer.validated_data.get("note"),
-            user=request.user,
-        )
+        try:
+            adjusted_sku, adjustment = sku.adjust_stock(
+                delta=serializer.validated_data["quantity"],
+                reason=serializer.validated_data["reason"],
+                batch=batch,
+                location=location,
+                reference=serializer.validated_data.get("reference"),
+                note=serializer.validated_data.get("note"),
+                user=request.user,
+            )
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
         return Response(
             StockAdjustmentSerializer(adjustment).data, status=status.HTTP_201_CREATED
         )
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": ["Provide a search query."]})
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValidationError({"limit": [f"Must be 1 to {MAX_SEARCH_LIMIT}."]})
+
+        results = [
+            dict(SKUSerializer(sku).data, score=score)
+            for sku, score in search_skus(tenant_id, query, limit=limit)
+        ]
+        return Response({"results": results})
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        SKUs matching the usual list filters (category, supplier_id, ...) and
+        `attr=key:value` attribute filters, plus the facet counts of that
+        result in the same response. Repeating a key ORs its values;
+        `facets=color,size` limits which facets are counted.
+        """
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        filters = {}
+        for pair in request.query_params.getlist("attr"):
+            key, _, value = pair.partition(":")
+            if not key or not value:
+                raise ValidationError({"attr": ["Use key:value."]})
+            filters.setdefault(key, []).append(value)
+        keys = request.query_params.get("facets")
+        keys = [key for key in keys.split(",") if key] if keys else None
+
+        skus = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            filter_by_attributes(skus, filters).order_by("name", "pk")
+        )
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data["facets"] = facet_counts(skus, filters, keys)
+        return response
+
+    @action(detail=False, methods=["get"], url_path=r"by-barcode/(?P<code>[^/]+)")
+    def by_barcode(self, request, code=None):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        payload = lookup_barcode(tenant_id, code)
+        if payload is None:
+            return Response(
+                {"detail": "No SKU with this barcode."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(payload)
+
+    @action(detail=False, methods=["get"], url_path="barcode-cache-stats")
+    def barcode_cache_stats(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        return Response(cache_stats(tenant_id))
+
+    @action(detail=True, methods=["get"], url_path="stock-at")
+    def stock_at(self, request, pk=None):
+        sku = self.get_object()
+        try:
+            ts = parse_datetime(request.query_params.get("ts", ""))
+        except ValueError:
+            ts = None
+        if ts is None:
+            raise ValidationError({"ts": ["Provide an ISO 8601 datetime."]})
+        if timezone.is_naive(ts):
+            ts = timezone.make_aware(ts)
+
+        level, snapshot_day = stock_at(sku, ts)
+        return Response(
+            {
+                "sku_id": sku.sku_id,
+                "ts": ts,
+                "stock_level": level,
+                "snapshot_day": snapshot_day,
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def valuation(self, request):
+        if not request.headers.get("X-Tenant-ID"):
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        return Response(tenant_valuation(self.filter_queryset(self.get_queryset())))
+
+    @action(detail=False, methods=["get"])
+    def cogs(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        period = {}
+        for name in ("start", "end"):
+            try:
+                period[name] = parse_date(request.query_params.get(name, ""))
+            except ValueError:
+                period[name] = None
+            if period[name] is None:
+                raise ValidationError({name: ["Provide a date (YYYY-MM-DD)."]})
+        if period["end"] < period["start"]:
+            raise ValidationError({"end": ["End must not be before start."]})
+
+        totals = cost_of_goods_sold(
+            tenant_id,
+            day_start(period["start"]),
+            day_start(period["end"] + timedelta(days=1)),
+        )
+        return Response(dict(period, **totals))
+
+    @action(detail=True, methods=["post"])
+    def allocate(self, request, pk=None):
+        sku = self.get_object()
+        if not sku.track_batches:
+            raise ValidationError({"detail": "SKU not configured for batch tracking"})
+        serializer = StockAllocationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            stock_level, adjustments = allocate_fefo(
+                sku, user=request.user, **serializer.validated_data
+            )
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+        return Response(
+            {
+                "stock_level": stock_level,
+                "adjustments": StockAdjustmentSerializer(adjustments, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=["post"], url_path="counter-shards")
+    def counter_shards(self, request, pk=None):
+        sku = self.get_object()
+        serializer = CounterShardsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        set_counter_shards(sku, serializer.validated_data["shards"])
+        sku = self.get_queryset().with_live_stock().get(pk=sku.pk)
+        return Response(SKUSerializer(sku).data)
+
+    @action(detail=True, methods=["post"])
+    def reserve(self, request, pk=None):
+        sku = self.get_object()
+        serializer = StockReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        batch = None
+        batch_id = serializer.validated_data.get("batch_id")
+        if batch_id:
+            batch = get_object_or_404(sku.batches, pk=batch_id)
+
+        try:
+            reservation = reserve_stock(
+                sku,
+                serializer.validated_data["quantity"],
+                ttl=serializer.validated_data["ttl_seconds"],
+                batch=batch,
+                reference=serializer.validated_data.get("reference"),
+            )
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+        return Response(
+            dict(
+                ReservationSerializer(reservation).data,
+                available_to_promise=sku.available_to_promise,
+            ),
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_skus(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["Upload a CSV or NDJSON file."]})
+        input_format = request.query_params.get("input") or (
+            "ndjson" if upload.name.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        if input_format not in IMPORT_FORMATS:
+            raise ValidationError(
+                {"input": [f"Choose one of {', '.join(IMPORT_FORMATS)}."]}
+            )
+
+        report = import_skus(tenant_id, read_rows(upload.file, input_format))
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path="bulk-adjust")
+    def bulk_adjust(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        serializer = BulkStockAdjustmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data["adjustments"]
+
+        # resolve every SKU, batch and location with one query each, tenant
+        # scoped
+        skus = self.get_queryset().in_bulk({row["sku_id"] for row in rows})
+        batches = Batch.objects.filter(
+            sku__in=skus.values(),
+            pk__in={row["batch_id"] for row in rows if row.get("batch_id")},
+        ).in_bulk()
+        location_ids = {row["location_id"] for row in rows if row.get("location_id")}
+        locations = (
+            Location.objects.filter(tenant_id=tenant_id, pk__in=location_ids).in_bulk()
+            if location_ids
+            else {}
+        )
+
+        errors = {}
+        for index, row in enumerate(rows):
+            row["sku"] = skus.get(row["sku_id"])
+            if row["sku"] is None:
+                errors[index] = {"sku_id": ["SKU not found."]}
+                continue
+            batch_id = row.get("batch_id")
+            if batch_id:
+                row["batch"] = batches.get(batch_id)
+                if row["batch"] is None or row["batch"].sku_id != row["sku_id"]:
+                    errors[index] = {"batch_id": ["Batch not found for this SKU."]}
+                elif not row["sku"].track_batches:
+                    errors[index] = {
+                        "batch_id": ["SKU not configured for batch tracking."]
+                    }
+            location_id = row.get("location_id")
+            if location_id:
+                row["location"] = locations.get(location_id)
+                if row["location"] is None:
+                    errors.setdefault(index, {})["location_id"] = [
+                        "Location not found."
+                    ]
+        if errors:
+            raise ValidationError({"adjustments": errors})
+
+        try:
+            stock_levels, adjustments = bulk_adjust_stock(rows, user=request.user)
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+        return Response(
+            {
+                "count": len(adjustments),
+                "stock_levels": {
+                    str(sku_id): level for sku_id, level in stock_levels.items()
+                },
+                "adjustments": StockAdjustmentSerializer(adjustments, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
 
 # -----------------------
 # Batch ViewSet
@@ -63,27 +417,193 @@ class BatchViewSet(TenantScopedMixin, viewsets.ModelViewSet):
             qs = qs.filter(sku_id=sku_id)
         return qs
 
+# -----------------------
+# Location ViewSets
+# -----------------------
+class LocationViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    serializer_class = LocationSerializer
+    queryset = Location.objects.all()
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["code", "is_active"]
+
+    def perform_destroy(self, instance):
+        if instance.stock.filter(quantity__gt=0).exists():
+            raise ValidationError(
+                {"detail": "Transfer the stock held here before deleting."}
+            )
+        instance.delete()
+
+    @action(detail=True, methods=["post"])
+    def transfer(self, request, pk=None):
+        if not request.headers.get("X-Tenant-ID"):
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        source = self.get_object()
+        serializer = StockTransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        destination = self.get_queryset().filter(pk=data["to_location_id"]).first()
+        if destination is None or destination.pk == source.pk:
+            raise ValidationError({"to_location_id": ["Choose another location."]})
+        skus = SKU.objects.filter(tenant_id=source.tenant_id).in_bulk(
+            {line["sku_id"] for line in data["lines"]}
+        )
+        errors = {
+            index: {"sku_id": ["SKU not found."]}
+            for index, line in enumerate(data["lines"])
+            if line["sku_id"] not in skus
+        }
+        if errors:
+            raise ValidationError({"lines": errors})
+
+        try:
+            adjustments = transfer_stock(
+                source,
+                destination,
+                [(skus[line["sku_id"]], line["quantity"]) for line in data["lines"]],
+                user=request.user,
+                reference=data.get("reference"),
+                note=data.get("note"),
+            )
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+        return Response(
+            {
+                "reference": adjustments[0].reference,
+                "adjustments": StockAdjustmentSerializer(adjustments, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class LocationStockViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = LocationStockSerializer
+    queryset = LocationStock.objects.order_by("location", "sku")
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["sku", "location"]
+
+
+# -----------------------
+# Reservation ViewSet
+# -----------------------
+class ReservationViewSet(
+    TenantScopedMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Holds are created through SKU reserve/; DELETE releases one."""
+
+    serializer_class = ReservationSerializer
+    queryset = Reservation.objects.order_by("expires_at")
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["sku", "reference"]
+
+    def perform_destroy(self, instance):
+        release_reservation(instance)
+
+    @action(detail=True, methods=["post"])
+    def fulfil(self, request, pk=None):
+        reservation = self.get_object()
+        try:
+            adjustment = fulfil_reservation(reservation, user=request.user)
+        except ReservationExpired as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_410_GONE)
+        except InsufficientStock as exc:
+            return insufficient_stock_response(exc)
+        return Response(
+            StockAdjustmentSerializer(adjustment).data, status=status.HTTP_201_CREATED
+        )
+
+
 # -----------------------
 # StockAdjustment ViewSet
 # -----------------------
-class StockAdjustmentViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+class StockAdjustmentViewSet(
+    TenantScopedMixin,
+    KeysetPaginationMixin,
+    StreamingExportMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     serializer_class = StockAdjustmentSerializer
     queryset = StockAdjustment.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["sku", "created_at"]
+    export_fields = (
+        "adjustment_id",
+        "sku_id",
+        "quantity",
+        "reason",
+        "batch_id",
+        "location_id",
+        "reference",
+        "note",
+        "created_at",
+        "created_by_id",
+    )
+    export_ordering = ("created_at", "adjustment_id")
+    export_filename = "stock-adjustments"
 
 
 # -----------------------
 # Alert ViewSet
 # -----------------------
-class AlertViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class AlertViewSet(
+    TenantScopedMixin,
+    KeysetPaginationMixin,
+    StreamingExportMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = AlertSerializer
     queryset = Alert.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["sku", "type", "acknowledged"]
+    export_fields = (
+        "alert_id",
+        "sku_id",
+        "sku_name",
+        "type",
+        "current_stock",
+        "threshold",
+        "acknowledged",
+        "acknowledged_by_id",
+        "acknowledged_at",
+        "created_at",
+    )
+    export_ordering = ("created_at", "alert_id")
+    export_filename = "alerts"
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        return Response(alert_summary(tenant_id))
 
     @action(detail=True, methods=["post"])
     def acknowledge(self, request, pk=None):
         alert = self.get_object()
         alert.acknowledge(request.user)
         return Response(self.get_serializer(alert).data)
+
+    @action(detail=False, methods=["post"], url_path="bulk-acknowledge")
+    def bulk_acknowledge(self, request):
+        if not request.headers.get("X-Tenant-ID"):
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        serializer = BulkAcknowledgeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        alerts = self.get_queryset()
+        if "alert_ids" in data:
+            alerts = alerts.filter(pk__in=data["alert_ids"])
+        if "type" in data:
+            alerts = alerts.filter(type=data["type"])
+        if "sku" in data:
+            alerts = alerts.filter(sku_id=data["sku"])
+        if "created_after" in data:
+            alerts = alerts.filter(created_at__gte=data["created_after"])
+        if "created_before" in data:
+            alerts = alerts.filter(created_at__lt=data["created_before"])
+        return Response({"acknowledged": acknowledge_alerts(alerts, request.user)})
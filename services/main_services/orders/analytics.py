@@ -0,0 +1,130 @@
+"""
+Daily order rollups for the revenue and status dashboards.
+
+Every order counts towards the OrderRollup row of its tenant and the day it
+was placed, under its current status and payment status. Saves and deletes
+move the order's contribution with F() increments, in the same transaction
+as the write: the stored row is read with SELECT ... FOR UPDATE and its
+state subtracted, then the saved state added. Writers of the same order
+queue on that lock and each moves the counts from the previous one's
+result, however stale their own copy of the order; writers of different
+orders only meet on the rollup row's increments. A dashboard range is then
+a single aggregate over one row per day on the (tenant_id, day) unique
+index.
+
+Writes that bypass the model layer (QuerySet.update, raw SQL) are not
+seen; `rebuild_order_rollups` recomputes the rows from the orders.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+from .models import Order, OrderRollup
+
+STATUS_FIELDS = {
+    status: f"{status}_count" for status, _ in Order._meta.get_field("status").choices
+}
+PAYMENT_FIELDS = {
+    payment: f"{payment}_count"
+    for payment, _ in Order._meta.get_field("payment_status").choices
+}
+AMOUNT_FIELDS = ("order_value", "revenue")
+COUNT_FIELDS = ("order_count", *PAYMENT_FIELDS.values(), *STATUS_FIELDS.values())
+ROLLUP_CHUNK_SIZE = 1000
+
+
+def _contribution(state, sign):
+    tenant_id, day, status, payment_status, amount = state
+    deltas = Counter(
+        {
+            "order_count": sign,
+            "order_value": sign * amount,
+            STATUS_FIELDS[status]: sign,
+            PAYMENT_FIELDS[payment_status]: sign,
+        }
+    )
+    if payment_status == "paid":
+        deltas["revenue"] += sign * amount
+    return (tenant_id, day), deltas
+
+
+def move_order(before, after):
+    """
+    Shift an order's counts from its `before` to its `after`
+    Order.rollup_state() (either may be None for a created or deleted
+    order).
+    """
+    rows = {}
+    for state, sign in ((before, -1), (after, 1)):
+        if state is not None:
+            key, deltas = _contribution(state, sign)
+            rows.setdefault(key, Counter()).update(deltas)
+
+    with transaction.atomic():
+        for (tenant_id, day), deltas in rows.items():
+            changes = {field: delta for field, delta in deltas.items() if delta}
+            if not changes:
+                continue
+            OrderRollup.objects.bulk_create(
+                [OrderRollup(tenant_id=tenant_id, day=day)], ignore_conflicts=True
+            )
+            OrderRollup.objects.filter(tenant_id=tenant_id, day=day).update(
+                **{field: F(field) + delta for field, delta in changes.items()}
+            )
+
+
+def rebuild_order_rollups(tenant_id=None, chunk_size=ROLLUP_CHUNK_SIZE):
+    """
+    Recompute the rollup rows (of one tenant) from the orders with one
+    grouped query. Returns the number of rows written.
+    """
+    orders = Order.objects.order_by()
+    rollups = OrderRollup.objects.all()
+    if tenant_id:
+        orders = orders.filter(tenant_id=tenant_id)
+        rollups = rollups.filter(tenant_id=tenant_id)
+
+    counts = {
+        field: Count("pk", filter=Q(**{name: value}))
+        for name, fields in (
+            ("status", STATUS_FIELDS),
+            ("payment_status", PAYMENT_FIELDS),
+        )
+        for value, field in fields.items()
+    }
+    grouped = (
+        orders.annotate(day=TruncDate("created_at"))
+        .values("tenant_id", "day")
+        .annotate(
+            order_count=Count("pk"),
+            order_value=Sum("total_amount"),
+            revenue=Sum("total_amount", filter=Q(payment_status="paid"), default=0),
+            **counts,
+        )
+    )
+    with transaction.atomic():
+        rollups.delete()
+        written = OrderRollup.objects.bulk_create(
+            [OrderRollup(**row) for row in grouped], batch_size=chunk_size
+        )
+    return len(written)
+
+
+def order_analytics(tenant_id, start, end):
+    """
+    Totals and per-day rows of a tenant's rollups for the days `start` to
+    `end` inclusive; days without orders are left out of `days`.
+    """
+    rows = OrderRollup.objects.filter(
+        tenant_id=tenant_id, day__gte=start, day__lte=end
+    ).order_by("day")
+    fields = [*COUNT_FIELDS, *AMOUNT_FIELDS]
+    totals = rows.aggregate(**{field: Sum(field, default=0) for field in fields})
+    return {
+        "from": start,
+        "to": end,
+        "totals": totals,
+        "days": list(rows.values("day", *fields)),
+    }
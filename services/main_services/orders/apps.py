@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main_services.orders"
+
+    def ready(self):
+        # Import signals so they register when the app is loaded
+        import main_services.orders.signals
@@ -0,0 +1,12 @@
+from django_filters import rest_framework as filters
+
+from .models import Order
+
+
+class OrderFilter(filters.FilterSet):
+    # ?created_after=YYYY-MM-DD&created_before=YYYY-MM-DD, both days included
+    created = filters.DateFromToRangeFilter(field_name="created_at")
+
+    class Meta:
+        model = Order
+        fields = ["status", "payment_status"]
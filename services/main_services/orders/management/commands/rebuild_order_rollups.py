@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from main_services.orders.analytics import ROLLUP_CHUNK_SIZE, rebuild_order_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily order rollups (OrderRollup) from orders. Only "
+        "needed after writes that bypassed the model layer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Limit to one tenant.")
+        parser.add_argument("--chunk-size", type=int, default=ROLLUP_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        written = rebuild_order_rollups(options["tenant"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup row(s)."))
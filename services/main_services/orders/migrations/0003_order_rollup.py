@@ -0,0 +1,79 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:47
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_order_rollups(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderRollup = apps.get_model("orders", "OrderRollup")
+    counts = {
+        f"{value}_count": Count("pk", filter=Q(**{name: value}))
+        for name in ("status", "payment_status")
+        for value, _ in Order._meta.get_field(name).choices
+    }
+    grouped = (
+        Order.objects.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("tenant_id", "day")
+        .annotate(
+            order_count=Count("pk"),
+            order_value=Sum("total_amount"),
+            revenue=Sum("total_amount", filter=Q(payment_status="paid"), default=0),
+            **counts,
+        )
+    )
+    OrderRollup.objects.bulk_create(
+        [OrderRollup(**row) for row in grouped], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_alter_order_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tenant_id", models.UUIDField()),
+                ("day", models.DateField()),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "order_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("unpaid_count", models.IntegerField(default=0)),
+                ("paid_count", models.IntegerField(default=0)),
+                ("refunded_count", models.IntegerField(default=0)),
+                ("pending_count", models.IntegerField(default=0)),
+                ("processing_count", models.IntegerField(default=0)),
+                ("delivered_count", models.IntegerField(default=0)),
+                ("cancelled_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tenant_id", "day"), name="orders_rollup_tenant_day"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_order_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_order_rollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="tenant_id",
+            field=models.UUIDField(),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant_id", "created_at"], name="orders_tenant_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant_id", "status", "created_at"],
+                name="orders_tenant_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant_id", "payment_status", "created_at"],
+                name="orders_tenant_payment_idx",
+            ),
+        ),
+    ]
@@ -1,10 +1,14 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.utils import timezone
 import uuid
 
 
 class Order(models.Model):
     order_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    tenant_id = models.UUIDField(db_index=True)
+    # indexed by the (tenant_id, ..., created_at) indexes below
+    tenant_id = models.UUIDField()
     customer_name = models.CharField(max_length=255)
     total_amount = models.DecimalField(max_digits=12, decimal_places=2)
     status = models.CharField(
@@ -31,6 +35,37 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]  # newest first
+        # a tenant's newest-first list, filtered by status, payment status
+        # and/or a date range, walks one of these without sorting
+        indexes = [
+            models.Index(
+                fields=["tenant_id", "created_at"], name="orders_tenant_created_idx"
+            ),
+            models.Index(
+                fields=["tenant_id", "status", "created_at"],
+                name="orders_tenant_status_idx",
+            ),
+            models.Index(
+                fields=["tenant_id", "payment_status", "created_at"],
+                name="orders_tenant_payment_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the analytics signals lock and read the stored row before the
+        # write and move its counts after it, all in this one transaction
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def rollup_state(self):
+        """(tenant_id, day, status, payment_status, total_amount)."""
+        return (
+            str(self.tenant_id),
+            timezone.localdate(self.created_at),
+            self.status,
+            self.payment_status,
+            Decimal(self.total_amount),
+        )
 
 
 class OrderItem(models.Model):
@@ -71,3 +106,37 @@ class PaystackTransaction(models.Model):
     )
     paid_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+class OrderRollup(models.Model):
+    """
+    One tenant's orders placed on one day, counted by their current status
+    and payment status. Kept current by the Order save signals (see
+    analytics.py) so dashboards read a few rows instead of every order.
+
+    `order_value` totals every order placed; `revenue` only the paid ones.
+    """
+
+    tenant_id = models.UUIDField()
+    day = models.DateField()
+
+    order_count = models.IntegerField(default=0)
+    order_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    unpaid_count = models.IntegerField(default=0)
+    paid_count = models.IntegerField(default=0)
+    refunded_count = models.IntegerField(default=0)
+
+    pending_count = models.IntegerField(default=0)
+    processing_count = models.IntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # upsert key, and the index every date-range read walks
+            models.UniqueConstraint(
+                fields=["tenant_id", "day"], name="orders_rollup_tenant_day"
+            )
+        ]
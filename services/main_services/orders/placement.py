@@ -0,0 +1,78 @@
+"""
+Order placement: price the lines, take the stock and record the order in
+one transaction.
+
+The order's SKU rows are read with one SELECT ... FOR UPDATE in primary key
+order, so two orders sharing SKUs always queue on them in the same order
+and never deadlock, while orders for other SKUs go ahead untouched. Once
+every line is known to be available, stock is taken through
+bulk_adjust_stock(): one grouped UPDATE of the SKUs and one bulk insert of
+SALE adjustments referencing the order.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from main_services.inventory.models import SKU, StockAdjustment
+from main_services.inventory.stock import InsufficientStock, bulk_adjust_stock
+from .models import Order, OrderItem
+
+
+class UnknownSKU(ValueError):
+    """Raised when order lines name SKUs the tenant does not have."""
+
+    def __init__(self, sku_ids):
+        self.sku_ids = sorted(str(sku_id) for sku_id in sku_ids)
+        super().__init__(f"Unknown SKU: {', '.join(self.sku_ids)}")
+
+
+def place_order(tenant_id, items, *, user=None, **fields):
+    """
+    Create an Order for `items` (dicts with `sku_id` and `quantity`) and
+    take their stock. Raises UnknownSKU or InsufficientStock, leaving
+    nothing written, when a line cannot be served.
+    """
+    quantities = defaultdict(int)
+    for item in items:
+        quantities[item["sku_id"]] += item["quantity"]
+
+    with transaction.atomic():
+        skus = (
+            SKU.objects.with_live_stock()
+            .select_for_update()
+            .filter(tenant_id=tenant_id)
+            .order_by("pk")
+            .in_bulk(quantities)
+        )
+        unknown = quantities.keys() - skus.keys()
+        if unknown:
+            raise UnknownSKU(unknown)
+        for sku_id, quantity in quantities.items():
+            available = skus[sku_id].available_to_promise
+            if quantity > available:
+                raise InsufficientStock(quantity, available, "stock", sku_id=sku_id)
+
+        order = Order.objects.create(
+            tenant_id=tenant_id,
+            total_amount=sum(
+                (skus[item["sku_id"]].price * item["quantity"] for item in items),
+                Decimal("0"),
+            ),
+            **fields,
+        )
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, **item) for item in items]
+        )
+        bulk_adjust_stock(
+            [
+                {
+                    "sku": skus[sku_id],
+                    "quantity": -quantity,
+                    "reason": StockAdjustment.Reason.SALE,
+                    "reference": f"order-{order.pk}",
+                }
+                for sku_id, quantity in quantities.items()
+            ],
+            user=user,
+        )
+    return order
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Order, OrderItem, Return, PaystackTransaction
+from .placement import UnknownSKU, place_order
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -27,21 +28,36 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ["total_amount", "tenant_id"]
 
     def create(self, validated_data):
-        items_data = validated_data.pop("items")
-        # create order WITHOUT saving yet
-        order = Order(**validated_data)
+        request = self.context.get("request")
+        try:
+            return place_order(
+                validated_data.pop("tenant_id"),
+                validated_data.pop("items"),
+                user=request.user if request else None,
+                **validated_data,
+            )
+        except UnknownSKU as exc:
+            raise serializers.ValidationError(
+                {"items": [f"Unknown SKU: {sku_id}" for sku_id in exc.sku_ids]}
+            )
 
-        total = 0
-        for item in items_data:
-            total += item["quantity"] * 500  # replace with SKU price lookup
 
-        order.total_amount = total
-        order.save()  # ✅ now save with total included
+class OrderListSerializer(OrderSerializer):
+    """An order without its lines, for listings."""
 
-        for item in items_data:
-            OrderItem.objects.create(order=order, **item)
+    items = None
 
-        return order
+    class Meta(OrderSerializer.Meta):
+        fields = [name for name in OrderSerializer.Meta.fields if name != "items"]
+
+
+class OrderWithItemsSerializer(OrderSerializer):
+    """
+    An order with its lines read from `item_rows`, the plain dicts
+    attached by the view, rather than one `order.items` query per order.
+    """
+
+    items = OrderItemSerializer(many=True, read_only=True, source="item_rows")
 
 
 class OrderUpdateSerializer(serializers.ModelSerializer):
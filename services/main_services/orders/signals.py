@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Order
+from .analytics import move_order
+
+
+def _stored_rollup_state(instance, using):
+    # the row as committed, locked until the save or delete commits, so a
+    # concurrent writer moves the counts from this write's result rather
+    # than from whatever its own copy of the order was loaded with
+    stored = (
+        Order.objects.using(using).select_for_update().filter(pk=instance.pk).first()
+    )
+    return stored.rollup_state() if stored else None
+
+
+# -----------------------
+# Analytics Rollups
+# -----------------------
+@receiver(pre_save, sender=Order)
+def remember_rollup_state(sender, instance, using, **kwargs):
+    # Order.save() runs in a transaction, so the lock is held to post_save
+    if instance._state.adding:
+        instance._rollup_state = None
+    else:
+        instance._rollup_state = _stored_rollup_state(instance, using)
+
+
+@receiver(post_save, sender=Order)
+def roll_up_order(sender, instance, created, **kwargs):
+    before = None if created else instance._rollup_state
+    move_order(before, instance.rollup_state())
+    del instance._rollup_state
+
+
+@receiver(pre_delete, sender=Order)
+def remember_deleted_rollup_state(sender, instance, using, **kwargs):
+    # sent inside the deletion's transaction
+    instance._rollup_state = _stored_rollup_state(instance, using)
+
+
+@receiver(post_delete, sender=Order)
+def roll_up_deleted_order(sender, instance, **kwargs):
+    move_order(instance._rollup_state, None)
+    del instance._rollup_state
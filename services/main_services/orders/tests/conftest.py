@@ -1,6 +1,7 @@
 import pytest
 from rest_framework.test import APIClient
 import uuid
+from main_services.inventory.models import SKU
 
 
 @pytest.fixture
@@ -24,12 +25,26 @@ def auth_client(django_user_model):
 
 
 @pytest.fixture
-def order_payload():
+def skus(db, tenant_id):
+    return [
+        SKU.objects.create(
+            tenant_id=tenant_id,
+            name=name,
+            category="Meals",
+            price=price,
+            stock_level=100,
+        )
+        for name, price in (("Jollof", "1500.00"), ("Water", "250.50"))
+    ]
+
+
+@pytest.fixture
+def order_payload(skus):
     return {
         "customer_name": "John Doe",
         "items": [
-            {"item_id": "item-001", "sku_id": str(uuid.uuid4()), "quantity": 2},
-            {"item_id": "item-002", "sku_id": str(uuid.uuid4()), "quantity": 1},
+            {"item_id": "item-001", "sku_id": str(skus[0].sku_id), "quantity": 2},
+            {"item_id": "item-002", "sku_id": str(skus[1].sku_id), "quantity": 1},
         ],
         "status": "pending",
         "payment_status": "unpaid",
@@ -0,0 +1,201 @@
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from main_services.orders.models import Order, OrderRollup
+from main_services.orders.placement import place_order
+
+URL = "/api/orders/analytics/"
+
+
+def _rollup(tenant_id, day=None):
+    return OrderRollup.objects.get(tenant_id=tenant_id, day=day or timezone.localdate())
+
+
+def _counts(rollup):
+    return {
+        name: getattr(rollup, name)
+        for name in (
+            "order_count",
+            "unpaid_count",
+            "paid_count",
+            "refunded_count",
+            "pending_count",
+            "processing_count",
+            "delivered_count",
+            "cancelled_count",
+        )
+    }
+
+
+@pytest.mark.django_db
+def test_rollups_follow_order_changes(auth_client, tenant_id, order_payload):
+    ids = [
+        auth_client.post(
+            reverse("order-list"),
+            order_payload,
+            format="json",
+            HTTP_X_TENANT_ID=tenant_id,
+        ).data["order_id"]
+        for _ in range(3)
+    ]
+    auth_client.patch(
+        reverse("order-detail", args=[ids[0]]),
+        {"status": "delivered", "payment_status": "paid"},
+        format="json",
+        HTTP_X_TENANT_ID=tenant_id,
+    )
+    auth_client.patch(
+        reverse("order-detail", args=[ids[1]]),
+        {"status": "cancelled", "payment_status": "refunded"},
+        format="json",
+        HTTP_X_TENANT_ID=tenant_id,
+    )
+
+    rollup = _rollup(tenant_id)
+    assert _counts(rollup) == {
+        "order_count": 3,
+        "unpaid_count": 1,
+        "paid_count": 1,
+        "refunded_count": 1,
+        "pending_count": 1,
+        "processing_count": 0,
+        "delivered_count": 1,
+        "cancelled_count": 1,
+    }
+    # three orders of 2 x 1500.00 + 250.50, one of them paid
+    assert rollup.order_value == Decimal("9751.50")
+    assert rollup.revenue == Decimal("3250.50")
+
+    # a partially loaded order is read back before its save is counted
+    order = Order.objects.only("pk").get(pk=ids[2])
+    order.status = "processing"
+    order.save()
+    Order.objects.get(pk=ids[1]).delete()
+    rollup = _rollup(tenant_id)
+    assert rollup.order_count == 2
+    assert (rollup.pending_count, rollup.processing_count) == (0, 1)
+    assert rollup.refunded_count == 0
+
+    # a rebuild from the orders agrees with the incremental counts
+    OrderRollup.objects.update(order_count=99)
+    call_command("rebuild_order_rollups", "--tenant", tenant_id)
+    rebuilt = _rollup(tenant_id)
+    assert _counts(rebuilt) == _counts(rollup)
+    assert (rebuilt.order_value, rebuilt.revenue) == (
+        rollup.order_value,
+        rollup.revenue,
+    )
+
+
+@pytest.mark.django_db
+def test_rollups_survive_stale_copies(tenant_id, skus):
+    lines = [{"sku_id": skus[1].sku_id, "quantity": 1}]
+    order = place_order(tenant_id, lines, customer_name="A")
+    first = Order.objects.get(pk=order.pk)
+    second = Order.objects.get(pk=order.pk)
+
+    # both copies were loaded as pending; the second save moves the order
+    # from processing, as stored, not from its own stale pending
+    first.status = "processing"
+    first.save()
+    second.status = "cancelled"
+    second.save()
+    counts = _counts(_rollup(tenant_id))
+    assert (
+        counts["pending_count"],
+        counts["processing_count"],
+        counts["cancelled_count"],
+    ) == (0, 0, 1)
+
+    first.delete()
+    second.delete()
+    assert _counts(_rollup(tenant_id))["order_count"] == 0
+    call_command("rebuild_order_rollups", "--tenant", tenant_id)
+    assert not OrderRollup.objects.filter(tenant_id=tenant_id).exists()
+
+
+@pytest.mark.django_db
+def test_analytics_endpoint(auth_client, tenant_id, skus):
+    lines = [{"sku_id": skus[1].sku_id, "quantity": 2}]
+    other = place_order(tenant_id, lines, customer_name="A")
+    today = timezone.localdate()
+    for days_ago in (0, 3, 3, 40):
+        order = place_order(tenant_id, lines, customer_name="B")
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+    Order.objects.filter(pk=other.pk).update(tenant_id=uuid.uuid4())
+    call_command("rebuild_order_rollups")
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = auth_client.get(
+            URL,
+            {"from": today - timedelta(days=7), "to": today},
+            HTTP_X_TENANT_ID=tenant_id,
+        )
+    assert resp.status_code == 200
+    assert len(ctx.captured_queries) == 2
+    assert resp.data["totals"]["order_count"] == 3
+    assert resp.data["totals"]["order_value"] == Decimal("1503.00")
+    assert [(row["day"], row["order_count"]) for row in resp.data["days"]] == [
+        (today - timedelta(days=3), 2),
+        (today, 1),
+    ]
+
+    resp = auth_client.get(URL, {"from": "2000-01-01", "to": "2000-01-31"})
+    assert resp.status_code == 400
+    resp = auth_client.get(
+        URL, {"from": "2024-02-30", "to": "2024-03-01"}, HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == 400
+    resp = auth_client.get(
+        URL, {"from": "2024-03-01", "to": "2024-02-01"}, HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_analytics_latency_over_years(auth_client, tenant_id):
+    # five years of days for 50 tenants: the range read touches one
+    # tenant's rows on the (tenant_id, day) index, never the others
+    rng = random.Random(5)
+    start = date(2021, 1, 1)
+    tenants = [tenant_id] + [str(uuid.uuid4()) for _ in range(49)]
+    OrderRollup.objects.bulk_create(
+        [
+            OrderRollup(
+                tenant_id=tenant,
+                day=start + timedelta(days=n),
+                order_count=rng.randint(1, 50),
+                order_value=Decimal(rng.randint(100, 10_000)),
+            )
+            for tenant in tenants
+            for n in range(5 * 365)
+        ],
+        batch_size=5000,
+    )
+
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        resp = auth_client.get(
+            URL,
+            {"from": "2021-01-01", "to": "2025-12-31"},
+            HTTP_X_TENANT_ID=tenant_id,
+        )
+        timings.append(time.perf_counter() - started)
+
+    assert len(resp.data["days"]) == 5 * 365
+    timings.sort()
+    median = timings[len(timings) // 2]
+    assert median < 0.100, f"median {median * 1000:.1f} ms"
@@ -1,8 +1,16 @@
+import threading
+import uuid
 import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from unittest.mock import patch
-from main_services.orders.models import Order, Return, PaystackTransaction
+from main_services.inventory.models import SKU, StockAdjustment
+from main_services.inventory.stock import InsufficientStock
+from main_services.orders.models import Order, OrderItem, Return, PaystackTransaction
+from main_services.orders.placement import place_order
 
 
 @pytest.mark.django_db
@@ -137,3 +145,156 @@ def test_verify_paystack_payment(mock_verify, auth_client, tenant_id, order_payl
     assert resp.status_code == status.HTTP_200_OK
     assert resp.data["status"] == "success"
     assert resp.data["order"] == str(order.order_id)
+
+
+@pytest.mark.django_db
+def test_create_order_prices_items_from_skus(auth_client, tenant_id, order_payload):
+    resp = auth_client.post(
+        reverse("order-list"), order_payload, format="json", HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == status.HTTP_201_CREATED
+    # 2 x 1500.00 + 1 x 250.50
+    assert Order.objects.get().total_amount == Decimal("3250.50")
+
+
+@pytest.mark.django_db
+def test_create_order_rejects_unknown_and_foreign_skus(
+    auth_client, tenant_id, order_payload
+):
+    foreign = SKU.objects.create(
+        tenant_id=uuid.uuid4(), name="Other", category="Meals", price=10
+    )
+    order_payload["items"][1]["sku_id"] = str(foreign.sku_id)
+    resp = auth_client.post(
+        reverse("order-list"), order_payload, format="json", HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["items"] == [f"Unknown SKU: {foreign.sku_id}"]
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_create_order_query_count_is_independent_of_lines(auth_client, tenant_id, skus):
+    def place(lines):
+        payload = {
+            "customer_name": "Bulk Buyer",
+            "items": [
+                {"sku_id": str(skus[i % 2].sku_id), "quantity": 1} for i in range(lines)
+            ],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            resp = auth_client.post(
+                reverse("order-list"),
+                payload,
+                format="json",
+                HTTP_X_TENANT_ID=tenant_id,
+            )
+        assert resp.status_code == status.HTTP_201_CREATED
+        return len(ctx.captured_queries)
+
+    assert place(100) == place(1)
+    assert OrderItem.objects.count() == 101
+
+
+@pytest.mark.django_db
+def test_create_order_takes_stock(auth_client, tenant_id, skus, order_payload):
+    resp = auth_client.post(
+        reverse("order-list"), order_payload, format="json", HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == status.HTTP_201_CREATED
+
+    levels = SKU.objects.order_by("name").values_list("stock_level", flat=True)
+    assert list(levels) == [98, 99]
+    sales = StockAdjustment.objects.filter(reference=f"order-{resp.data['order_id']}")
+    assert sorted(sales.values_list("quantity", "reason")) == [
+        (-2, "sale"),
+        (-1, "sale"),
+    ]
+
+
+@pytest.mark.django_db
+def test_create_order_without_stock_writes_nothing(
+    auth_client, tenant_id, skus, order_payload
+):
+    order_payload["items"][1]["quantity"] = 101
+    resp = auth_client.post(
+        reverse("order-list"), order_payload, format="json", HTTP_X_TENANT_ID=tenant_id
+    )
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    assert resp.data["sku_id"] == skus[1].sku_id
+    assert resp.data["available"] == 100
+    assert not Order.objects.exists()
+    assert not StockAdjustment.objects.exists()
+    assert set(SKU.objects.values_list("stock_level", flat=True)) == {100}
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="needs row-level locking")
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_orders_never_oversell(tenant_id, skus):
+    SKU.objects.update(stock_level=13)
+    results = []
+
+    def worker(n):
+        # half the orders list the SKUs the other way round
+        lines = [{"sku_id": sku.sku_id, "quantity": 1} for sku in skus]
+        try:
+            place_order(tenant_id, lines[:: 1 if n % 2 else -1], customer_name="C")
+            results.append("ok")
+        except InsufficientStock:
+            results.append("short")
+        except Exception as exc:
+            results.append(repr(exc))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(set(results)) == ["ok", "short"]
+    assert results.count("ok") == 13
+    assert set(SKU.objects.values_list("stock_level", flat=True)) == {0}
+    assert OrderItem.objects.count() == 26
+    assert StockAdjustment.objects.count() == 26
+
+
+@pytest.mark.django_db
+def test_order_list_leaves_items_out_unless_expanded(
+    auth_client, tenant_id, order_payload
+):
+    for _ in range(20):
+        auth_client.post(
+            reverse("order-list"),
+            order_payload,
+            format="json",
+            HTTP_X_TENANT_ID=tenant_id,
+        )
+
+    # page count and page rows, however many orders are on the page
+    with CaptureQueriesContext(connection) as ctx:
+        resp = auth_client.get(reverse("order-list"), HTTP_X_TENANT_ID=tenant_id)
+    assert len(ctx.captured_queries) == 2
+    assert len(resp.data["results"]) == 20
+    assert "items" not in resp.data["results"][0]
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = auth_client.get(
+            reverse("order-list"), {"expand": "items"}, HTTP_X_TENANT_ID=tenant_id
+        )
+    assert len(ctx.captured_queries) == 3
+    expected = sorted(
+        (item["sku_id"], item["quantity"]) for item in order_payload["items"]
+    )
+    for order in resp.data["results"]:
+        assert (
+            sorted((str(item["sku_id"]), item["quantity"]) for item in order["items"])
+            == expected
+        )
+
+    order_id = resp.data["results"][0]["order_id"]
+    resp = auth_client.get(
+        reverse("order-detail", args=[order_id]), HTTP_X_TENANT_ID=tenant_id
+    )
+    assert len(resp.data["items"]) == 2
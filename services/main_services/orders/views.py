@@ -1,34 +1,98 @@
+from collections import defaultdict
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from django_filters.rest_framework import DjangoFilterBackend
+from main_services.inventory.stock import InsufficientStock
 
-from .models import Order, Return, PaystackTransaction
+from .models import Order, OrderItem, Return, PaystackTransaction
 from .serializers import (
     OrderSerializer,
+    OrderListSerializer,
+    OrderWithItemsSerializer,
     OrderUpdateSerializer,
     ReturnSerializer,
     PaystackTransactionSerializer,
 )
+from .analytics import order_analytics
+from .filters import OrderFilter
 from .paystack import PaystackClient
 
 
+def attach_item_rows(orders):
+    """
+    Set `order.item_rows` on every order to its lines as plain dicts, read
+    with one query over all the orders.
+    """
+    rows = defaultdict(list)
+    ids = [order.pk for order in orders]
+    for item in OrderItem.objects.filter(order_id__in=ids).values(
+        "order_id", "item_id", "sku_id", "quantity"
+    ):
+        rows[item.pop("order_id")].append(item)
+    for order in orders:
+        order.item_rows = rows[order.pk]
+
+
 class OrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
 
     def get_queryset(self):
         tenant_id = self.request.headers.get("X-Tenant-ID")
         return Order.objects.filter(tenant_id=tenant_id)
 
+    def expand_items(self):
+        return "items" in self.request.query_params.get("expand", "").split(",")
+
+    def get_serializer_class(self):
+        if self.action == "retrieve" or (self.action == "list" and self.expand_items()):
+            return OrderWithItemsSerializer
+        if self.action == "list":
+            return OrderListSerializer
+        return OrderSerializer
+
+    def list(self, request, *args, **kwargs):
+        orders = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(orders)
+        orders = list(orders) if page is None else page
+        if self.expand_items():
+            attach_item_rows(orders)
+        serializer = self.get_serializer(orders, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        order = self.get_object()
+        attach_item_rows([order])
+        return Response(self.get_serializer(order).data)
+
     def create(self, request, *args, **kwargs):
         tenant_id = request.headers.get("X-Tenant-ID")
-        serializer = OrderSerializer(data=request.data)
+        serializer = OrderSerializer(data=request.data, context={"request": request})
         if not serializer.is_valid():
             print("❌ Serializer errors:", serializer.errors)  # DEBUG
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        order = serializer.save(tenant_id=tenant_id)
+        try:
+            order = serializer.save(tenant_id=tenant_id)
+        except InsufficientStock as exc:
+            return Response(
+                {
+                    "detail": str(exc),
+                    "sku_id": exc.sku_id,
+                    "requested": exc.requested,
+                    "available": exc.available,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, *args, **kwargs):
@@ -38,6 +102,23 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(OrderSerializer(order).data)
 
+    @action(detail=False, methods=["get"])
+    def analytics(self, request):
+        tenant_id = request.headers.get("X-Tenant-ID")
+        if not tenant_id:
+            raise ValidationError({"detail": "X-Tenant-ID header required"})
+        period = {}
+        for name in ("from", "to"):
+            try:
+                period[name] = parse_date(request.query_params.get(name, ""))
+            except ValueError:
+                period[name] = None
+            if period[name] is None:
+                raise ValidationError({name: ["Provide a date (YYYY-MM-DD)."]})
+        if period["to"] < period["from"]:
+            raise ValidationError({"to": ["'to' must not be before 'from'."]})
+        return Response(order_analytics(tenant_id, period["from"], period["to"]))
+
     @action(detail=True, methods=["post"], url_path="return", url_name="return")
     def create_return(self, request, pk=None):
         order = self.get_object()  # <--- get the order from the URL